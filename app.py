@@ -8,6 +8,7 @@ from westmarch.agents.perkins import PerkinsAgent
 from westmarch.agents.miss_pennington import MissPenningtonAgent
 from westmarch.agents.lady_hawthorne import LadyHawthorneAgent
 from westmarch.core.models import ModelClient
+from westmarch.core.resilience import ProviderError
 
 # ------------------------------------
 # Configuration
@@ -25,6 +26,26 @@ AGENT_AVATARS = {
 }
 
 
+def render_message(msg: dict) -> None:
+    """Draw one transcript entry as a chat bubble with its speaker's avatar."""
+    role = msg.get("role", "assistant")
+    content = msg.get("content", "")
+    speaker = msg.get("speaker", "user" if role == "user" else "assistant")
+
+    avatar_key = "user" if role == "user" else speaker
+    avatar = AGENT_AVATARS.get(avatar_key, AGENT_AVATARS["assistant"])
+
+    with st.chat_message(role, avatar=avatar):
+        st.markdown(content)
+
+
+def _recording(chunks, streamed: list):
+    """Pass a reply stream through, keeping the chunks shown so far in `streamed`."""
+    for chunk in chunks:
+        streamed.append(chunk)
+        yield chunk
+
+
 # ------------------------------------
 # Initialize Backend Westmarch Agents
 # ------------------------------------
@@ -185,16 +206,22 @@ if mode == "Matters Requiring the Whole Household":
 
     if st.button("▶ Run Demo 9 – A Mystery in the Archives"):
         orchestrator = st.session_state.orchestrator
-        demo9_messages = orchestrator.run("archive_mystery", None)
 
-        # If run() returns a list (Demo 9), use it directly
-        if isinstance(demo9_messages, list):
-            st.session_state.messages = demo9_messages
-        else:
-            # Fallback: wrap as single assistant message
-            st.session_state.messages = [
-                {"role": "assistant", "content": demo9_messages, "speaker": "Jeeves"}
-            ]
+        # Draw each message as soon as it is ready instead of waiting for
+        # the whole demo; the rerun then shows the finished transcript
+        st.session_state.messages = []
+        try:
+            for demo9_message in orchestrator.iter_archive_mystery():
+                st.session_state.messages.append(demo9_message)
+                render_message(demo9_message)
+        except ProviderError as e:
+            apology = {
+                "role": "assistant",
+                "speaker": "Jeeves",
+                "content": orchestrator.provider_apology(e),
+            }
+            st.session_state.messages.append(apology)
+            render_message(apology)
 
         st.rerun()
 
@@ -269,15 +296,7 @@ if mode == "📜 Instructions for Running the Demos":
 # Display Conversation History
 # -----------------------------
 for msg in st.session_state.messages:
-    role = msg.get("role", "assistant")
-    content = msg.get("content", "")
-    speaker = msg.get("speaker", "user" if role == "user" else "assistant")
-    
-    avatar_key = "user" if role == "user" else speaker
-    avatar = AGENT_AVATARS.get(avatar_key, AGENT_AVATARS["assistant"])
-
-    with st.chat_message(role, avatar=avatar):
-        st.markdown(content)
+    render_message(msg)
 
 
 # -----------------------------
@@ -298,11 +317,12 @@ if prompt:
 
     # 2) Dispatch to appropriate workflow with error handling
     orchestrator = st.session_state.orchestrator
+    streamed = []
     
     try:
         if mode == "Parlour Discussions (General Conversation)":
             speaker = "Jeeves"
-            result = orchestrator.run("parlour_discussion", prompt, selected_mode=mode)
+            result = orchestrator.run("parlour_discussion", prompt, selected_mode=mode, stream=True)
 
         elif mode == "Arrangements for the Day":
             speaker = "Jeeves"
@@ -310,11 +330,11 @@ if prompt:
 
         elif mode == "Matters Requiring Investigation":
             speaker = "Perkins"
-            result = orchestrator.run("research", prompt, selected_mode=mode)
+            result = orchestrator.run("research", prompt, selected_mode=mode, stream=True)
 
         elif mode == "Correspondence & Drafting":
             speaker = "Miss Pennington"
-            result = orchestrator.run("drafting", prompt, selected_mode=mode)
+            result = orchestrator.run("drafting", prompt, selected_mode=mode, stream=True)
 
         elif mode == "Records & Summaries from the Archive":
             speaker = "Jeeves"
@@ -322,7 +342,7 @@ if prompt:
 
         elif mode == "Her Ladyship's Critique (Proceed with Caution)":
             speaker = "Lady Hawthorne"
-            result = orchestrator.run("critique", prompt, selected_mode=mode)
+            result = orchestrator.run("critique", prompt, selected_mode=mode, stream=True)
 
         elif mode == "Jeeves Remembers":
             speaker = "Jeeves"
@@ -336,22 +356,36 @@ if prompt:
             speaker = "Jeeves"
             result = "I'm afraid something has gone quite amiss, sir. The household is in disarray."
 
+        # 3) Display the household's reply; single-agent modes stream it in as
+        #    it is written, and their workflow archives it once the stream ends
+        with st.chat_message("assistant", avatar=AGENT_AVATARS.get(speaker, AGENT_AVATARS["assistant"])):
+            if isinstance(result, str):
+                st.markdown(result)
+            else:
+                result = st.write_stream(_recording(result, streamed))
+
     except Exception as e:
+        if streamed:
+            # Keep the part of the reply already on screen in the transcript
+            st.session_state.messages.append(
+                {"role": "assistant", "content": "".join(streamed), "speaker": speaker}
+            )
+
         speaker = "Jeeves"
-        result = f"*Clears throat apologetically* \n\nI do beg your pardon, but it appears we've encountered an unexpected difficulty in the household. Perhaps you might rephrase your request?\n\n"
+        if isinstance(e, ProviderError):
+            result = orchestrator.provider_apology(e)
+        else:
+            result = f"*Clears throat apologetically* \n\nI do beg your pardon, but it appears we've encountered an unexpected difficulty in the household. Perhaps you might rephrase your request?\n\n"
         
         if DEBUG_MODE:
             result += f"\n\n**Technical Details:**\n```\n{traceback.format_exc()}\n```"
         
         st.error(f"Error: {str(e)}")
+        render_message({"role": "assistant", "content": result, "speaker": speaker})
 
-    # 3) Display the household's reply
     if DEBUG_MODE:
         st.write("DEBUG: Orchestrator result:", str(result)[:200])
 
     st.session_state.messages.append(
         {"role": "assistant", "content": result, "speaker": speaker}
-    )
-
-    with st.chat_message("assistant", avatar=AGENT_AVATARS.get(speaker, AGENT_AVATARS["assistant"])):
-        st.markdown(result)
\ No newline at end of file
+    )
\ No newline at end of file
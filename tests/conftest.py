@@ -0,0 +1,22 @@
+import os
+
+from westmarch.core import telemetry
+
+_saved_ledger_setting = None
+
+
+def pytest_configure(config):
+    # Keep test runs out of westmarch/data/llm_calls.jsonl. Set at configure
+    # time, not in a fixture: some test modules call models while collected.
+    global _saved_ledger_setting
+    _saved_ledger_setting = os.environ.get(telemetry.LEDGER_ENV_VAR)
+    os.environ[telemetry.LEDGER_ENV_VAR] = "off"
+    telemetry._default_telemetry = None
+
+
+def pytest_unconfigure(config):
+    if _saved_ledger_setting is None:
+        os.environ.pop(telemetry.LEDGER_ENV_VAR, None)
+    else:
+        os.environ[telemetry.LEDGER_ENV_VAR] = _saved_ledger_setting
+    telemetry._default_telemetry = None
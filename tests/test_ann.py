@@ -0,0 +1,99 @@
+import os
+import tempfile
+
+import numpy as np
+
+from westmarch.agents.miss_pennington import MissPenningtonAgent
+from westmarch.core.ann import IVFIndex
+from westmarch.core.memory import MemoryBank
+from westmarch.core.models import ModelClient
+from westmarch.core.vectors import VectorIndex
+
+
+def _clustered(n=2000, dim=32, clusters=20, seed=3):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    rows = centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows.astype(np.float32)
+
+
+def _recall_at_10(ivf, matrix, queries, nprobe):
+    hits = 0
+    for q in queries:
+        truth = set(np.argsort(-(matrix @ q))[:10].tolist())
+        found, _ = ivf.search(q, k=10, nprobe=nprobe)
+        hits += len(truth & set(found.tolist()))
+    return hits / (10 * len(queries))
+
+
+def test_nprobe_trades_recall_for_work():
+    matrix = _clustered()
+    queries = matrix[:50]
+    ivf = IVFIndex.train(matrix, nlist=40)
+
+    assert _recall_at_10(ivf, matrix, queries, nprobe=ivf.nlist) == 1.0
+    assert _recall_at_10(ivf, matrix, queries, nprobe=4) >= 0.9
+
+
+def test_incremental_insert_and_persistence():
+    matrix = _clustered()
+    ivf = IVFIndex.train(matrix[:1500], nlist=30)
+    for position in range(1500, 2000):
+        ivf.add(position, matrix[position])
+    found, scores = ivf.search(matrix[1999], k=1, nprobe=ivf.nlist)
+    assert found[0] == 1999 and abs(scores[0] - 1.0) < 1e-5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = os.path.join(tmp, "memory.jsonl")
+        ivf.save(ledger, matrix)
+        extra = _clustered(n=10, seed=9)
+        grown = np.vstack([matrix, extra])
+
+        loaded = IVFIndex.load(ledger, grown)
+        assert loaded is not None and loaded.size == 2010
+        assert np.array_equal(loaded.assignments()[:2000], ivf.assignments())
+        assert IVFIndex.load(ledger, grown[::-1].copy()) is None
+
+
+def test_memory_bank_switches_to_ivf():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        for i in range(60):
+            topic = ["gnome in the garden", "mutual funds and etfs", "a sonnet to the moon"][i % 3]
+            mem.save_entry(f"Research performed: note {i} about {topic}", tags=["auto"])
+
+        vectors = mem._current_vectors()
+        assert vectors.ann is None
+        vectors.ann_threshold = 50
+        vectors.refresh_ann()
+        assert vectors.ann is not None and vectors.ann.size == 60
+
+        mem.save_entry("Research performed: the nocturnal ornament again", tags=["auto"])
+        assert vectors.ann.size == 61
+        approx = mem.similar("gnome garden", k=5, nprobe=vectors.ann.nlist)
+        exact = vectors.search("gnome garden", k=5, exact=True)
+        assert [e["content"] for _, e in approx] == [mem.load_all()[i]["content"] for _, i in exact]
+
+        reopened = VectorIndex.load(mem.filepath, list(mem.load_all()), ann_threshold=50)
+        assert reopened.ann is not None and reopened.ann.size == 61
+
+
+def test_search_memory_falls_back_to_similar_notes():
+    with tempfile.TemporaryDirectory() as tmp:
+        pennington = MissPenningtonAgent(
+            ModelClient("Miss Pennington"), memory_path=os.path.join(tmp, "memory.jsonl")
+        )
+        pennington.memory.save_entry("Research performed: the garden gnome moved overnight", tags=["auto"])
+
+        assert pennington.search_memory("nocturnal ornament", semantic_fallback=False) == []
+        found = pennington.search_memory("nocturnal ornament")
+        assert found and "gnome" in found[0]["content"]
+
+
+if __name__ == "__main__":
+    test_nprobe_trades_recall_for_work()
+    test_incremental_insert_and_persistence()
+    test_memory_bank_switches_to_ivf()
+    test_search_memory_falls_back_to_similar_notes()
+    print("ann tests passed")
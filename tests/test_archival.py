@@ -0,0 +1,118 @@
+import os
+import tempfile
+import threading
+
+from westmarch.agents.miss_pennington import MissPenningtonAgent
+from westmarch.core.archival import ArchivalQueue
+from westmarch.core.memory import MemoryBank
+from westmarch.core.models import ModelClient
+
+
+def _tags(user_input, extra_tags):
+    return ["auto"] + list(extra_tags or [])
+
+
+def test_pending_notes_are_committed_together():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.json"))
+        commits = []
+        original = mem.save_entries
+        mem.save_entries = lambda notes: (commits.append(len(notes)), original(notes))
+
+        archivist = ArchivalQueue(mem, tagger=_tags)
+        # Hold the ledger lock so the worker stalls on its first note while
+        # the rest pile up behind it
+        with mem.store.locked():
+            for i in range(10):
+                archivist.submit(f"note {i}", None, ["type:note"])
+        archivist.flush()
+
+        assert archivist.pending == 0
+        assert sum(commits) == 10 and len(commits) <= 2
+        assert [e["content"] for e in mem.load_all()] == [f"note {i}" for i in range(10)]
+        archivist.close()
+
+
+def test_close_flushes_and_failures_are_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        archivist = ArchivalQueue(mem, tagger=_tags, max_pending=4)
+        for i in range(12):
+            archivist.submit(f"note {i}")
+        archivist.close()
+        assert len(MemoryBank(mem.filepath).load_all()) == 12
+
+        def broken(notes):
+            raise OSError("disk full")
+
+        working = mem.save_entries
+        mem.save_entries = broken
+        archivist = ArchivalQueue(mem, tagger=_tags)
+        archivist.submit("lost?")
+        archivist.flush()
+        assert [job[0] for job in archivist.failed] == ["lost?"]
+
+        # The failed note goes out ahead of the next one once the disk recovers
+        mem.save_entries = working
+        archivist.submit("next")
+        archivist.flush()
+        assert not archivist.failed
+        assert [e["content"] for e in mem.load_all()][-2:] == ["lost?", "next"]
+
+        mem.save_entries = broken
+        archivist.submit("still lost")
+        try:
+            archivist.close()
+        except RuntimeError as e:
+            assert isinstance(e.__cause__, OSError)
+        else:
+            raise AssertionError("close() hid a note it could not archive")
+        assert [job[0] for job in archivist.failed] == ["still lost"]
+
+
+def test_submits_racing_close_are_never_stranded():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        archivist = ArchivalQueue(mem, tagger=_tags)
+        accepted = []
+
+        def submitter(n):
+            for i in range(50):
+                try:
+                    archivist.submit(f"note {n}.{i}")
+                except RuntimeError:
+                    return
+                accepted.append(f"note {n}.{i}")
+
+        threads = [threading.Thread(target=submitter, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        archivist.close()
+        for t in threads:
+            t.join()
+
+        archivist.flush()   # returns: nothing was queued behind the stop sentinel
+        assert archivist.pending == 0
+        assert sorted(e["content"] for e in MemoryBank(mem.filepath).load_all()) == sorted(accepted)
+
+
+def test_pennington_reads_her_own_queued_notes():
+    with tempfile.TemporaryDirectory() as tmp:
+        pennington = MissPenningtonAgent(
+            ModelClient("Miss Pennington"), memory_path=os.path.join(tmp, "memory.jsonl")
+        )
+
+        pennington.save_note("Research performed: gnome", raw_user_input="the garden gnome",
+                             extra_tags=["type:research"])
+        notes = pennington.load_all_notes()
+        assert [n["content"] for n in notes] == ["Research performed: gnome"]
+        assert notes[0]["tags"] == ["auto", "domain:gnome", "type:research"]
+        pennington.archivist.close()
+
+
+if __name__ == "__main__":
+    test_pending_notes_are_committed_together()
+    test_close_flushes_and_failures_are_kept()
+    test_submits_racing_close_are_never_stranded()
+    test_pennington_reads_her_own_queued_notes()
+    print("archival tests passed")
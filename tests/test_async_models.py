@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from westmarch.agents.jeeves import JeevesAgent
+from westmarch.core import models
+from westmarch.core.messages import AgentMessage, Context, TaskType
+from westmarch.core.models import ModelClient, run_sync
+
+
+class SlowClient(ModelClient):
+    """Async provider call that sleeps and records how many overlap."""
+
+    def __init__(self, agent_name):
+        super().__init__(agent_name, use_cache=False)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _agenerate(self, system_prompt, user_content):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return f"async reply to {user_content}"
+
+
+def test_acall_respects_provider_concurrency_cap():
+    original = dict(models.PROVIDER_CONCURRENCY)
+    models.PROVIDER_CONCURRENCY["gemini"] = 3
+    try:
+        client = SlowClient("Jeeves")
+
+        async def fan_out():
+            return await asyncio.gather(*(client.acall("sys", f"q{i}") for i in range(10)))
+
+        replies = run_sync(fan_out())
+        assert replies == [f"async reply to q{i}" for i in range(10)]
+        assert client.peak == 3
+
+        # A second loop gets fresh semaphores rather than the first loop's
+        client.peak = 0
+        run_sync(fan_out())
+        assert client.peak == 3
+    finally:
+        models.PROVIDER_CONCURRENCY.update(original)
+
+
+def test_arun_matches_run():
+    jeeves = JeevesAgent(SlowClient("Jeeves"))
+    msg = AgentMessage(
+        sender="Patron",
+        recipient="Jeeves",
+        task_type=TaskType.CONVERSATION,
+        content="Good morning",
+        context=Context(original_user_request="Good morning", previous_outputs=[], metadata={}),
+    )
+    sync_reply = jeeves.run(msg)
+    async_reply = run_sync(jeeves.arun(msg))
+    assert sync_reply == async_reply
+
+
+def test_run_sync_inside_a_running_loop():
+    client = SlowClient("Perkins")
+
+    async def outer():
+        # Legacy sync code reached from async code must not deadlock
+        return run_sync(client.acall("sys", "nested"))
+
+    assert asyncio.run(outer()) == "async reply to nested"
+
+
+def test_call_runs_the_async_path_on_a_shared_loop():
+    client = SlowClient("Jeeves")
+
+    # Blocking callers on several threads overlap on the one call loop
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        replies = list(pool.map(lambda i: client.call("sys", f"q{i}"), range(8)))
+    assert replies == [f"async reply to q{i}" for i in range(8)]
+    assert client.peak > 1
+
+    async def outer():
+        return client.call("sys", "from a loop")
+
+    assert asyncio.run(outer()) == "async reply to from a loop"
+
+
+if __name__ == "__main__":
+    test_acall_respects_provider_concurrency_cap()
+    test_arun_matches_run()
+    test_run_sync_inside_a_running_loop()
+    test_call_runs_the_async_path_on_a_shared_loop()
+    print("Async model tests passed.")
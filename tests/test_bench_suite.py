@@ -0,0 +1,37 @@
+from westmarch.benchmarks.bench_suite import compare, report, run_suite
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = {
+        "memory.search[1000]": {"p50_ms": 10.0, "peak_rss_mb": 100.0},
+        "workflow.drafting": {"p50_ms": 0.4, "peak_rss_mb": 100.0},
+        "memory.to_text[1000]": {"p50_ms": 10.0, "peak_rss_mb": 100.0},
+    }
+    results = {
+        "memory.search[1000]": {"p50_ms": 14.0, "peak_rss_mb": 100.0},
+        # +75%, but well inside the jitter floor
+        "workflow.drafting": {"p50_ms": 0.7, "peak_rss_mb": 100.0},
+        "memory.to_text[1000]": {"p50_ms": 10.0, "peak_rss_mb": 140.0},
+        "memory.load_all[1000]": {"p50_ms": 99.0, "peak_rss_mb": 999.0},
+    }
+    assert compare(results, baseline) == ["memory.search[1000]", "memory.to_text[1000]"]
+    assert compare(results, baseline, tolerance=0.5) == []
+
+
+def test_suite_measures_memory_cases():
+    suite = run_suite([200], iterations=3, only="memory")
+    results = suite["results"]
+    assert set(results) == {
+        "memory.load_all[200]", "memory.search[200]", "memory.to_text[200]", "memory.save_entry[200]"
+    }
+    for r in results.values():
+        assert r["iterations"] == 3 and r["throughput"] > 0
+        assert 0 < r["p50_ms"] <= r["p99_ms"]
+    assert compare(results, results) == []
+    assert "memory.search[200]" in report(results, results)
+
+
+if __name__ == "__main__":
+    test_compare_flags_slowdowns_beyond_tolerance()
+    test_suite_measures_memory_cases()
+    print("Benchmark suite tests passed.")
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import types
+
+import pytest
+
+from westmarch.benchmarks.corpus import WORKFLOWS, CorpusSpec, generate, parse_weights
+from westmarch.core.memory import MemoryBank
+from westmarch.core.storage import ledger_file, write_ledger
+from westmarch.core.tagging import infer_domains
+
+HEADERS = {
+    "type:parlour": "Parlour discussion entry:",
+    "type:planning": "Daily plan created",
+    "type:research": "Research performed",
+    "type:drafting": "Drafted text based",
+    "type:critique": "Critique requested",
+    "type:whole-household": "[Whole Household",
+}
+
+
+def test_entries_follow_the_workflow_formats_and_tag_scheme():
+    stream = generate(CorpusSpec(500))
+    assert isinstance(stream, types.GeneratorType)
+    entries = list(stream)
+    assert entries == list(generate(CorpusSpec(500)))
+    assert entries != list(generate(CorpusSpec(500, seed=8)))
+
+    timestamps = [e["timestamp"] for e in entries]
+    assert timestamps == sorted(timestamps)
+
+    for entry in entries:
+        tags = entry["tags"]
+        assert tags[0] == "auto" and tags[-1].startswith("type:")
+        assert all(t.startswith("domain:") for t in tags[1:-1])
+        assert entry["content"].startswith(HEADERS[tags[-1]])
+        # Domains are inferred from the request section, as Miss Pennington does
+        request = entry["content"].split("\n\n")[1].split("\n", 1)[1]
+        assert tags[1:-1] == [f"domain:{d}" for d in sorted(infer_domains(request))]
+
+    assert {e["tags"][-1] for e in entries} == {t for _, t in WORKFLOWS.values()}
+    assert sum("domain:gnome" in e["tags"] for e in entries) > 50
+
+
+def test_mix_and_lengths_are_configurable():
+    spec = CorpusSpec(
+        300, mix=parse_weights("critique=1", WORKFLOWS), median_words=20, sigma=0.1, max_words=25
+    )
+    entries = list(generate(spec))
+    assert all(e["tags"][-1] == "type:critique" for e in entries)
+    assert all(len(e["content"].rsplit("CRITIQUE:\n", 1)[1].split()) <= 25 for e in entries)
+
+    with pytest.raises(ValueError):
+        parse_weights("gossip=2", WORKFLOWS)
+
+
+def test_ledgers_load_in_every_backend():
+    expected = list(generate(CorpusSpec(50)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        for backend in ("json", "journal", "sqlite"):
+            target, count = write_ledger(path, generate(CorpusSpec(50)), backend=backend)
+            assert target == ledger_file(path, backend) and count == 50
+
+            bank = MemoryBank(path, backend=backend)
+            assert [dict(e) for e in bank.load_all()] == expected
+            assert len(bank.query_tags("domain:gnome AND type:research")) == sum(
+                {"domain:gnome", "type:research"} <= set(e["tags"]) for e in expected
+            )
+            bank.close()
+
+            with pytest.raises(FileExistsError):
+                write_ledger(path, generate(CorpusSpec(1)), backend=backend)
+
+
+if __name__ == "__main__":
+    test_entries_follow_the_workflow_formats_and_tag_scheme()
+    test_mix_and_lengths_are_configurable()
+    test_ledgers_load_in_every_backend()
+    print("Corpus tests passed.")
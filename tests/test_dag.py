@@ -0,0 +1,126 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import pytest
+
+from westmarch.benchmarks.bench_whole_household import household
+from westmarch.orchestrator.dag import Workflow
+
+
+def test_independent_steps_overlap_and_run_once():
+    calls = []
+
+    async def fetch(name):
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        return name
+
+    async def left():
+        return await fetch("left")
+
+    async def right():
+        return await fetch("right")
+
+    def join(left, right, user_input):
+        calls.append("join")
+        return f"{user_input}: {left}+{right}"
+
+    flow = (
+        Workflow("demo")
+        .step("left", left)
+        .step("right", right)
+        .step("join", join, inputs=("left", "right", "user_input"))
+        .step("shout", lambda join: join.upper(), inputs=("join",))
+    )
+    run = flow.run(user_input="q")
+
+    assert run.results["shout"] == "Q: LEFT+RIGHT"
+    assert sorted(calls) == ["join", "left", "right"]
+    assert run.wall_time < 0.09
+    assert run.critical_path()[-2:] == ["join", "shout"]
+
+
+def test_bad_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        Workflow("w").step("a", lambda missing: 1, inputs=("missing",)).run()
+    with pytest.raises(ValueError):
+        Workflow("w").step("a", lambda b: 1, inputs=("b",)).step("b", lambda a: 1, inputs=("a",)).run()
+
+
+def test_whole_household_overlaps_branches():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.05, os.path.join(tmp, "memory.json"))
+
+        orchestrator.workflow_concurrency = 1
+        start = time.perf_counter()
+        sequential = orchestrator.whole_household("The gnome moved again.")
+        sequential_time = time.perf_counter() - start
+
+        orchestrator.workflow_concurrency = None
+        start = time.perf_counter()
+        graph = orchestrator.whole_household("The gnome moved again.")
+        graph_time = time.perf_counter() - start
+
+        assert graph == sequential
+        # Seven calls in series vs a five-call critical path
+        assert graph_time < sequential_time - 0.05
+        assert orchestrator.last_workflow_run.critical_path() == [
+            "pennington_output",
+            "hawthorne_letter_feedback",
+            "pennington_revision",
+            "pennington_summary",
+            "final",
+        ]
+
+        notes = orchestrator.pennington.load_all_notes()
+        assert len(notes) == 2 and "type:whole-household" in notes[0]["tags"]
+        orchestrator.pennington.archivist.close()
+
+
+def test_archive_mystery_fires_calls_together():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.05, os.path.join(tmp, "memory.json"))
+
+        orchestrator.workflow_concurrency = 1
+        sequential = orchestrator.run_archive_mystery()
+
+        orchestrator.workflow_concurrency = None
+        start = time.perf_counter()
+        concurrent = orchestrator.run_archive_mystery()
+        elapsed = time.perf_counter() - start
+
+        assert concurrent == sequential
+        assert all(m["content"] for m in concurrent)
+        assert concurrent[0]["content"].startswith("✒️ Pennington: [miss pennington]")
+        # 21 calls of 50ms each finish in about one call's time
+        assert len(orchestrator.last_workflow_run.results) == 21
+        assert elapsed < 0.5
+        orchestrator.pennington.archivist.close()
+
+
+def test_archive_mystery_streams_in_script_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.1, os.path.join(tmp, "memory.json"))
+        whole = orchestrator.run_archive_mystery()
+
+        start = time.perf_counter()
+        stream = orchestrator.iter_archive_mystery()
+        first = next(stream)
+        first_at = time.perf_counter() - start
+        streamed = [first] + list(stream)
+
+        assert streamed == whole
+        assert first["speaker"] == "Miss Pennington" and first["content"]
+        assert first_at < 0.2
+        orchestrator.pennington.archivist.close()
+
+
+if __name__ == "__main__":
+    test_independent_steps_overlap_and_run_once()
+    test_bad_graphs_are_rejected()
+    test_whole_household_overlaps_branches()
+    test_archive_mystery_fires_calls_together()
+    test_archive_mystery_streams_in_script_order()
+    print("DAG workflow tests passed.")
@@ -1,13 +1,17 @@
 from westmarch.agents.miss_pennington import MissPenningtonAgent
 from westmarch.core.models import ModelClient
+from westmarch.core.resilience import ProviderError
 
 pen = MissPenningtonAgent(ModelClient("Miss Pennington"))
 
 print("Calling Pennington...")
 
-result = pen.model_client.call(
-    system_prompt="You are Miss Pennington.",
-    user_content="Rewrite this into a polite email: I need the report tomorrow."
-)
+try:
+    result = pen.model_client.call(
+        system_prompt="You are Miss Pennington.",
+        user_content="Rewrite this into a polite email: I need the report tomorrow."
+    )
+except ProviderError as e:
+    result = f"[{e}]"
 
 print("RESULT:", result)
\ No newline at end of file
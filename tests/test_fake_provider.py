@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from westmarch.core import fake_provider
+from westmarch.core.fake_provider import (
+    AgentLatency,
+    Cassette,
+    FakeProvider,
+    FixedLatency,
+    LognormalLatency,
+    parse_latency,
+)
+from westmarch.core.models import ModelClient, run_sync
+from westmarch.core.resilience import ProviderError
+
+
+class LiveClient(ModelClient):
+    """Stands in for a live provider while recording."""
+
+    async def _agenerate(self, system_prompt, user_content):
+        return f"Indeed, sir: {user_content.lower()}"
+
+
+def test_latency_specs():
+    assert parse_latency("0.25").sample("jeeves", "0" * 16) == 0.25
+    assert parse_latency("fixed:1").sample("jeeves", "0" * 16) == 1.0
+
+    lognormal = parse_latency("lognormal:0.5,0.6")
+    assert isinstance(lognormal, LognormalLatency)
+    draws = [lognormal.sample("jeeves", f"{i:016x}") for i in range(200)]
+    assert draws == [lognormal.sample("jeeves", f"{i:016x}") for i in range(200)]
+    assert 0.4 < sorted(draws)[100] < 0.6 and max(draws) > 1.0
+
+    profile = parse_latency("agents:lady_hawthorne=fixed:2;*=0.1")
+    assert isinstance(profile, AgentLatency)
+    assert profile.sample("Lady Hawthorne", "0" * 16) == 2.0
+    assert profile.sample("jeeves", "0" * 16) == 0.1
+
+
+def test_record_then_replay_offline():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.jsonl")
+        recorder = LiveClient("Jeeves", use_cache=False)
+        recorder.recorder = Cassette(path)
+        recorded = recorder.call("You are Jeeves.", "Plan my day")
+
+        replay = FakeProvider("replay", cassette=Cassette(path), latency=FixedLatency(0.05), strict=True)
+        client = ModelClient("Jeeves", fake=replay)
+        assert client.cache is None
+
+        start = time.perf_counter()
+        assert client.call("You are Jeeves.", "Plan my day") == recorded
+        assert time.perf_counter() - start >= 0.05
+        assert run_sync(client.acall("You are Jeeves.", "Plan my day")) == recorded
+        assert "".join(client.stream("You are Jeeves.", "Plan my day")) == recorded
+
+        with pytest.raises(ProviderError, match="no recording"):
+            client.call("You are Jeeves.", "Plan my week")
+
+
+def test_environment_selects_synthetic_provider():
+    saved = {k: os.environ.get(k) for k in (fake_provider.MODE_ENV_VAR, fake_provider.LATENCY_ENV_VAR)}
+    os.environ[fake_provider.MODE_ENV_VAR] = "synthetic"
+    os.environ[fake_provider.LATENCY_ENV_VAR] = "agents:lady hawthorne=0.05"
+    fake_provider._default_fake = None
+    try:
+        hawthorne = ModelClient("Lady Hawthorne")
+        assert hawthorne.fake is not None and hawthorne.cache is None
+        start = time.perf_counter()
+        reply = hawthorne.call("You are Lady Hawthorne.", "Critique this sonnet")
+        assert reply == "[lady hawthorne] Critique this sonnet"
+        assert time.perf_counter() - start >= 0.05
+        assert ModelClient("Jeeves").call("sys", "tea?") == "[jeeves] tea?"
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        fake_provider._default_fake = None
+
+
+if __name__ == "__main__":
+    test_latency_specs()
+    test_record_then_replay_offline()
+    test_environment_selects_synthetic_provider()
+    print("Fake provider tests passed.")
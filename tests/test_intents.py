@@ -0,0 +1,60 @@
+from westmarch.core.messages import TaskType
+from westmarch.orchestrator.intents import CLOSURES, INTENTS, REWRITE, IntentEngine
+from westmarch.orchestrator.router import classify_task
+
+
+def test_classify_task_keeps_cue_priority():
+    assert classify_task("Good morning, Jeeves! Plan my day, please.") == TaskType.CONVERSATION
+    assert classify_task("Plan my day around the gnome inquiry") == TaskType.PLANNING
+    assert classify_task("Compare ETFs and index funds") == TaskType.RESEARCH
+    assert classify_task("Draft an email to the vicar") == TaskType.DRAFTING
+    assert classify_task("How does this read?") == TaskType.CRITIQUE
+    assert classify_task("Organise a trip to Bath") == TaskType.MIXED
+    assert classify_task("Tea, please.") == TaskType.UNKNOWN
+
+
+def test_one_pass_finds_overlapping_phrases():
+    # "excellent, thank you" contains "thank you"; "thank you jeeves" starts inside it
+    found = INTENTS.scan("Excellent, thank you Jeeves.")
+    assert {
+        "closure:parlour_discussion",   # "thank you jeeves"
+        "closure:query_archive",        # "excellent, thank you" only
+        "closure:daily_planning",       # "excellent"
+        "closure:critique_text",        # "thank you"
+        "task:conversation",            # "jeeves"
+    } <= found
+    assert "task:planning" not in found
+
+    engine = IntentEngine({"short": ["that will do"], "long": ["that will do nicely"], "tail": ["nicely"]})
+    assert engine.scan("That will do nicely.") == {"short", "long", "tail"}
+    assert engine.scan("That will do.") == {"short"}
+
+
+def test_phrases_match_at_word_starts_only():
+    assert "closure:daily_planning" not in INTENTS.scan("This plan is imperfect")
+    assert not REWRITE.matches("Send my credit note")
+    assert REWRITE.matches("Could you keep editing the letter?")
+    assert CLOSURES["critique_text"].matches("Fine, thank you — that’s enough verse.")
+
+
+def test_drafting_closure_needs_the_whole_message():
+    assert CLOSURES["draft_short_text"].matches("  Thank you, Miss Pennington ")
+    assert not CLOSURES["draft_short_text"].matches("Write a thank you note to the vicar")
+    assert CLOSURES["parlour_discussion"].matches("Write a thank you note to the vicar")
+
+
+def test_match_is_memoized():
+    INTENTS.match.cache_clear()
+    classify_task("Very good, carry on.")
+    assert CLOSURES["parlour_discussion"].matches("Very good, carry on.")
+    info = INTENTS.match.cache_info()
+    assert info.misses == 1 and info.hits == 1
+
+
+if __name__ == "__main__":
+    test_classify_task_keeps_cue_priority()
+    test_one_pass_finds_overlapping_phrases()
+    test_phrases_match_at_word_starts_only()
+    test_drafting_closure_needs_the_whole_message()
+    test_match_is_memoized()
+    print("Intent tests passed.")
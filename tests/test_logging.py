@@ -0,0 +1,144 @@
+import json
+import logging
+
+from westmarch.core import logging as westmarch_logging
+from westmarch.core import telemetry
+from westmarch.core.logging import DEBUG, INFO, WARNING, bind_context, configure, flush, log, log_context
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class Expensive:
+    formatted = 0
+
+    def __str__(self):
+        Expensive.formatted += 1
+        return "expensive"
+
+
+def capture(fmt="json", level=INFO, background=True):
+    # Benchmarks run earlier in the session may have silenced logging
+    westmarch_logging.LOGGING_ENABLED = True
+    handler = Capture()
+    configure(level=level, fmt=fmt, handler=handler, background=background)
+    return handler
+
+
+def restore():
+    westmarch_logging.LOGGING_ENABLED = True
+    configure(level=INFO)
+
+
+def test_levels_filter_before_formatting():
+    handler = capture()
+    try:
+        Expensive.formatted = 0
+        log("debug %s", Expensive(), level=DEBUG)
+        log("info %s", Expensive())
+        log("warning %s", Expensive(), level=WARNING)
+        flush()
+        assert Expensive.formatted == 2
+        assert [json.loads(line)["level"] for line in handler.lines] == ["info", "warning"]
+        assert json.loads(handler.lines[0])["msg"] == "info expensive"
+
+        westmarch_logging.LOGGING_ENABLED = False
+        log("silenced %s", Expensive(), level=WARNING)
+        assert not westmarch_logging.enabled(WARNING)
+    finally:
+        restore()
+    assert Expensive.formatted == 2
+
+
+def test_fields_come_from_context_workflow_and_call():
+    handler = capture()
+    try:
+        with telemetry.workflow_scope("recall_memory"), log_context(request_id="ab12", agent="Jeeves"):
+            log("MEMORY: %d notes", 3, agent="Perkins", hits=1)
+        log("outside")
+        flush()
+    finally:
+        restore()
+
+    inside, outside = map(json.loads, handler.lines)
+    assert inside == {
+        "ts": inside["ts"],
+        "level": "info",
+        "msg": "MEMORY: 3 notes",
+        "workflow": "recall_memory",
+        "request_id": "ab12",
+        "agent": "Perkins",
+        "hits": 1,
+    }
+    assert set(outside) == {"ts", "level", "msg"}
+
+
+def test_text_format_names_level_and_appends_fields():
+    handler = capture(fmt="text", background=False)
+    try:
+        log("WORKFLOW: started")
+        with log_context(request_id="ab12"):
+            log("WORKFLOW: could not save → %s", "disk full", level=WARNING)
+    finally:
+        restore()
+
+    assert handler.lines[0].endswith("] WORKFLOW: started")
+    assert handler.lines[1].endswith("] WARNING WORKFLOW: could not save → disk full | request_id=ab12")
+
+
+def test_sampling_keeps_one_in_every_n_per_template():
+    handler = capture()
+    try:
+        for i in range(10):
+            log("candidate %d", i, every=4)
+            log("other %d", i, every=5)
+        flush()
+    finally:
+        restore()
+
+    messages = [json.loads(line) for line in handler.lines]
+    assert [m["msg"] for m in messages if m["msg"].startswith("candidate")] == [
+        "candidate 0", "candidate 4", "candidate 8",
+    ]
+    assert [m["msg"] for m in messages if m["msg"].startswith("other")] == ["other 0", "other 5"]
+    assert {m["sampled"] for m in messages} == {"1/4", "1/5"}
+
+
+def test_bound_stream_keeps_its_fields_after_the_block():
+    handler = capture()
+
+    def chunks():
+        log("chunk")
+        yield "a"
+        log("done")
+
+    try:
+        with log_context(request_id="ab12"):
+            stream = bind_context(chunks(), agent="Jeeves")
+        log("between")
+        assert list(stream) == ["a"]
+        flush()
+    finally:
+        restore()
+
+    fields = [{k: v for k, v in json.loads(line).items() if k not in ("ts", "level")} for line in handler.lines]
+    assert fields == [
+        {"msg": "between"},
+        {"msg": "chunk", "request_id": "ab12", "agent": "Jeeves"},
+        {"msg": "done", "request_id": "ab12", "agent": "Jeeves"},
+    ]
+
+
+if __name__ == "__main__":
+    test_levels_filter_before_formatting()
+    test_fields_come_from_context_workflow_and_call()
+    test_text_format_names_level_and_appends_fields()
+    test_sampling_keeps_one_in_every_n_per_template()
+    test_bound_stream_keeps_its_fields_after_the_block()
+    print("All logging tests passed.")
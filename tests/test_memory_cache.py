@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+
+from westmarch.core.memory import MemoryBank
+
+
+def test_repeated_reads_hit_the_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.json"))
+        mem.save_entry("Parlour discussion entry: the gnome", tags=["auto"])
+
+        mem.load_all()
+        mem.search("gnome")
+        mem.to_text()
+        mem.rank("the gnome")
+
+        # Own writes keep the resident ledger current without a reparse
+        mem.save_entry("Research performed for user request: tea", tags=["auto"])
+        assert len(mem.load_all()) == 2
+
+        info = mem.cache_info()
+        assert info["misses"] == 1
+        assert info["hits"] == 5
+
+
+def test_external_write_invalidates_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        mem = MemoryBank(path)
+        mem.save_entry("First note.")
+        assert len(mem.load_all()) == 1
+
+        # Another process rewrites the ledger behind our back
+        other = MemoryBank(path)
+        other.save_entry("A much longer second note from elsewhere.")
+
+        assert [e["content"] for e in mem.load_all()] == [
+            "First note.",
+            "A much longer second note from elsewhere.",
+        ]
+        assert mem.cache_info()["misses"] == 2
+
+
+def test_views_are_stable_and_hand_out_copies():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        mem.save_entry("One.", tags=["auto", "type:note"])
+        view = mem.load_all()
+        mem.save_entry("Two.")
+
+        assert len(view) == 1
+        assert len(mem.load_all()) == 2
+
+        entry = view[0]
+        assert isinstance(entry, dict)
+        entry["content"] = "tampered"
+        assert mem.load_all()[0]["content"] == "One."
+        assert json.loads(json.dumps(view[:]))[0]["content"] == "One."
+        for results in (mem.query_tags("type:note"), mem.search("one")):
+            assert all(type(e) is dict for e in results)
+        assert all(type(e) is dict for _, e in mem.rank("one") + mem.similar("one"))
+
+if __name__ == "__main__":
+    test_repeated_reads_hit_the_cache()
+    test_external_write_invalidates_cache()
+    test_views_are_stable_and_hand_out_copies()
+    print("Memory cache tests passed.")
@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+import stat
+import tempfile
+from unittest import mock
+
+import westmarch.core.logging as westmarch_logging
+import westmarch.orchestrator.workflows  # noqa: F401  (save_entry's domain inference; import before forking)
+from westmarch.core.memory import MemoryBank
+from westmarch.core.storage import LedgerCorruptError
+
+
+WRITERS = 6
+NOTES_PER_WRITER = 25
+
+
+def _writer(path, writer_id, start):
+    westmarch_logging.LOGGING_ENABLED = False
+    mem = MemoryBank(path)
+    start.wait()
+    for i in range(NOTES_PER_WRITER):
+        # Interleave reads so each process also works from its cache
+        mem.load_all()
+        mem.save_entry(f"writer {writer_id} note {i}", tags=["auto", f"writer:{writer_id}"])
+    mem.close()
+
+
+def _stress(path):
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    start = ctx.Event()
+    procs = [ctx.Process(target=_writer, args=(path, w, start)) for w in range(WRITERS)]
+    for p in procs:
+        p.start()
+    start.set()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    contents = [e["content"] for e in MemoryBank(path).load_all()]
+    expected = {f"writer {w} note {i}" for w in range(WRITERS) for i in range(NOTES_PER_WRITER)}
+    assert len(contents) == len(expected)
+    assert set(contents) == expected
+
+
+def test_concurrent_writers_lose_nothing_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        _stress(os.path.join(tmp, "memory.json"))
+
+
+def test_concurrent_writers_lose_nothing_journal():
+    with tempfile.TemporaryDirectory() as tmp:
+        _stress(os.path.join(tmp, "memory.jsonl"))
+
+
+def test_interrupted_write_keeps_previous_ledger():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        mem = MemoryBank(path)
+        mem.save_entry("first note", tags=["auto"])
+
+        with mock.patch("westmarch.core.storage.os.replace", side_effect=OSError("disk gone")):
+            try:
+                mem.save_entry("second note", tags=["auto"])
+            except OSError:
+                pass
+
+        with open(path, encoding="utf-8") as f:
+            assert [e["content"] for e in json.load(f)] == ["first note"]
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+
+
+def test_save_keeps_the_ledger_mode():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("memory.json", "memory.jsonl"):
+            path = os.path.join(tmp, name)
+            mem = MemoryBank(path)
+            mem.save_entry("first note", tags=["auto"])
+            os.chmod(path, 0o664)
+            mem.save_entry("second note", tags=["auto"])
+            mem.store.rewrite([dict(e) for e in mem.load_all()])   # the journal's compaction path
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o664
+            mem.close()
+
+
+def test_damaged_ledger_is_never_clobbered():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        damaged = '[\n  {"timestamp": "t1", "content": "kept", "tags": []},\n  {"timestamp": "t2", "cont'
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(damaged)
+
+        mem = MemoryBank(path)
+        assert len(mem.load_all()) == 0
+        try:
+            mem.save_entry("would overwrite history", tags=["auto"])
+        except LedgerCorruptError:
+            pass
+        else:
+            raise AssertionError("save_entry wrote over a damaged ledger")
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == damaged
+
+        assert mem.recover() == 1
+        assert [e["content"] for e in mem.load_all()] == ["kept"]
+        assert any(name.startswith("memory.json.corrupt-") for name in os.listdir(tmp))
+        assert mem.recover() == -1
+
+
+if __name__ == "__main__":
+    test_concurrent_writers_lose_nothing_json()
+    test_concurrent_writers_lose_nothing_journal()
+    test_interrupted_write_keeps_previous_ledger()
+    test_save_keeps_the_ledger_mode()
+    test_damaged_ledger_is_never_clobbered()
+    print("concurrency tests passed")
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+
+from westmarch.core.memory import MemoryBank
+from westmarch.core.storage import JournalStore, migrate_ledger
+
+
+def test_journal_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        mem.save_entry("Research performed for user request: the gnome", tags=["auto", "domain:gnome"])
+        mem.save_entry("Parlour discussion entry: tea", tags=["auto", "auto"])
+
+        notes = mem.load_all()
+        assert [n["tags"] for n in notes] == [["auto", "domain:gnome"], ["auto"]]
+        assert len(mem.search("gnome")) == 1
+        assert "tea" in mem.to_text()
+        mem.close()
+
+
+def test_journal_migrates_array_ledger_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "memory.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([{"timestamp": "2025-01-01T00:00:00", "content": "1066 history", "tags": []}], f)
+
+        mem = MemoryBank(legacy, backend="journal")
+        mem.save_entry("A fresh note.")
+
+        assert os.path.exists(os.path.join(tmp, "memory.jsonl"))
+        assert len(mem.load_all()) == 2
+
+        # The original array file is left untouched
+        with open(legacy, encoding="utf-8") as f:
+            assert len(json.load(f)) == 1
+        assert migrate_ledger(legacy, os.path.join(tmp, "copy.jsonl")) == 1
+
+
+def test_journal_skips_and_compacts_torn_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.jsonl")
+        store = JournalStore(path)
+        store.append({"timestamp": "t", "content": "kept", "tags": []})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "t", "conte')   # interrupted append
+
+        assert [e["content"] for e in store.load()] == ["kept"]
+        store.close()   # waits for the background compaction
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read().count("\n") == 1
+
+
+def test_append_after_torn_line_starts_a_fresh_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.jsonl")
+        store = JournalStore(path)
+        store.append({"timestamp": "t", "content": "kept", "tags": []})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "t", "conte')   # interrupted append, no newline
+
+        store.append({"timestamp": "t", "content": "after", "tags": []})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "t", "content": "whole", "tags": []}')   # only the newline missing
+        store.append({"timestamp": "t", "content": "last", "tags": []})
+
+        assert [e["content"] for e in store.load()] == ["kept", "after", "whole", "last"]
+        assert store.recover() == 4
+        store.close()
+
+
+if __name__ == "__main__":
+    test_journal_roundtrip()
+    test_journal_migrates_array_ledger_once()
+    test_journal_skips_and_compacts_torn_lines()
+    test_append_after_torn_line_starts_a_fresh_line()
+    print("Journal storage tests passed.")
@@ -1,25 +1,28 @@
-from westmarch.core.memory import MemoryBank
+import os
+import tempfile
 
-# Use the same path Pennington uses, so we test the real file
-path = "westmarch/data/memory.json"
+from westmarch.core.memory import MemoryBank
 
 print("\n=== MEMORY LOGGING TEST ===\n")
 
-mem = MemoryBank(path)
+# A scratch ledger, so the test never writes to westmarch/data/memory.json
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "memory.json")
+    mem = MemoryBank(path)
 
-print("\n--- Saving a test entry ---")
-mem.save_entry("This is a logging test entry.", tags=["test", "logging"])
+    print("\n--- Saving a test entry ---")
+    mem.save_entry("This is a logging test entry.", tags=["test", "logging"])
 
-print("\n--- Loading all entries ---")
-notes = mem.load_all()
-print(f"Loaded {len(notes)} entries.\n")
+    print("\n--- Loading all entries ---")
+    notes = mem.load_all()
+    print(f"Loaded {len(notes)} entries.\n")
 
-print("\n--- Searching entries for 'logging' ---")
-results = mem.search("logging")
-print(f"Search returned {len(results)} entries.\n")
+    print("\n--- Searching entries for 'logging' ---")
+    results = mem.search("logging")
+    print(f"Search returned {len(results)} entries.\n")
 
-print("\n--- Converting memory to text ---")
-text = mem.to_text()
-print(text)
+    print("\n--- Converting memory to text ---")
+    text = mem.to_text()
+    print(text)
 
-print("\n=== END OF TEST ===\n")
\ No newline at end of file
+print("\n=== END OF TEST ===\n")
@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+from westmarch.core.memory import MemoryBank
+
+
+NOTES = [
+    ("Parlour discussion entry: the Garden Gnome wandered again.", ["auto", "domain:gnome", "type:parlour"]),
+    ("Research performed for user request: ETFs versus mutual funds.", ["auto", "domain:finance", "type:research"]),
+    ("Critique requested from Lady Hawthorne: O languid moon…", ["auto", "domain:poetry", "type:critique"]),
+    ("A Short History: 1066 — lands granted to Sir Archibald.", ["history", "westmarch"]),
+]
+
+
+def _fill(mem: MemoryBank) -> None:
+    for content, tags in NOTES:
+        mem.save_entry(content, tags=tags)
+
+
+def _strip(entries):
+    return [(e["content"], e["tags"]) for e in entries]
+
+
+def test_sqlite_matches_array_ledger():
+    with tempfile.TemporaryDirectory() as tmp:
+        array = MemoryBank(os.path.join(tmp, "memory.json"))
+        sqlite = MemoryBank(os.path.join(tmp, "ledger.sqlite3"))
+        _fill(array)
+        _fill(sqlite)
+
+        assert _strip(sqlite.load_all()) == _strip(array.load_all())
+
+        for q in ["gnome", "GNOME", "hist", "a", "domain:fin", "no such thing"]:
+            assert _strip(sqlite.search(q)) == _strip(array.search(q)), q
+
+        tags = "domain:gnome OR domain:poetry"
+        assert _strip(sqlite.query_tags(tags)) == _strip(array.query_tags(tags))
+
+        query = "what did the gnome do in the garden"
+        assert [e["content"] for _, e in sqlite.rank(query)] == \
+               [e["content"] for _, e in array.rank(query)]
+        sqlite.close()
+
+
+def test_sqlite_selected_by_env_and_migrates():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "memory.json")
+        _fill(MemoryBank(legacy))
+
+        os.environ["WESTMARCH_MEMORY_BACKEND"] = "sqlite"
+        try:
+            mem = MemoryBank(legacy)
+        finally:
+            del os.environ["WESTMARCH_MEMORY_BACKEND"]
+
+        assert mem.store.name == "sqlite"
+        assert len(mem.load_all()) == len(NOTES)
+        mem.close()
+
+
+if __name__ == "__main__":
+    test_sqlite_matches_array_ledger()
+    test_sqlite_selected_by_env_and_migrates()
+    print("SQLite storage tests passed.")
@@ -1,22 +1,29 @@
 # westmarch/demos/test_models.py
 from westmarch.core.models import ModelClient
+from westmarch.core.resilience import ProviderError
 
 
 def test_gemini():
     client = ModelClient("Jeeves")
-    response = client.call(
-        system_prompt="You are Jeeves, a calm, concise English butler.",
-        user_content="Please greet the user in one short, polite sentence.",
-    )
+    try:
+        response = client.call(
+            system_prompt="You are Jeeves, a calm, concise English butler.",
+            user_content="Please greet the user in one short, polite sentence.",
+        )
+    except ProviderError as e:
+        response = f"[{e}]"
     print("Gemini (Jeeves) response:\n", response)
 
 
 def test_openai():
     client = ModelClient("Lady_Hawthorne")
-    response = client.call(
-        system_prompt="You are Lady Hawthorne, a witty aristocratic critic.",
-        user_content="Offer one short, playful remark about tea.",
-    )
+    try:
+        response = client.call(
+            system_prompt="You are Lady Hawthorne, a witty aristocratic critic.",
+            user_content="Offer one short, playful remark about tea.",
+        )
+    except ProviderError as e:
+        response = f"[{e}]"
     print("OpenAI (Lady Hawthorne) response:\n", response)
 
 
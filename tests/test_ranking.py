@@ -0,0 +1,93 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from westmarch.core.memory import MemoryBank
+from westmarch.core.ranking import BM25Index, tokenize
+
+
+NOW = datetime(2025, 12, 1, 12, 0, 0)
+
+
+def _entry(content, tags=("auto",), days_ago=0):
+    return {
+        "timestamp": (NOW - timedelta(days=days_ago)).isoformat(),
+        "content": content,
+        "tags": list(tags),
+    }
+
+
+def test_tokenize():
+    assert tokenize("The Gnome's hat, again!") == ["the", "gnome", "s", "hat", "again"]
+    assert tokenize(None) == []
+
+
+def test_rare_terms_outweigh_common_ones():
+    entries = [_entry("the the the the cucumber sandwiches the tea") for _ in range(20)]
+    entries.append(_entry("a note about the garden gnome"))
+    index = BM25Index.build(entries, recency_boost=0.0)
+
+    assert index.idf("gnome") > index.idf("the")
+    best = index.search("the gnome", k=3, now=NOW.timestamp())
+    assert best[0][1] == 20
+    assert index.search("zeppelin", now=NOW.timestamp()) == []
+
+
+def test_boosts_and_top_k():
+    entries = [
+        _entry("gnome sighting near the roses", days_ago=300),
+        _entry("gnome sighting near the roses", days_ago=1),
+        _entry("gnome sighting near the roses", tags=["auto", "domain:gnome"], days_ago=300),
+    ]
+    index = BM25Index.build(entries)
+    now = NOW.timestamp()
+
+    ranked = [pos for _, pos in index.search("gnome roses", now=now)]
+    assert ranked[0] == 1  # recency
+    ranked = [pos for _, pos in index.search("gnome roses", domains={"gnome"}, now=now)]
+    assert ranked[0] == 2  # domain tag
+    assert len(index.search("gnome", k=2, now=now)) == 2
+
+
+def test_pruning_matches_exhaustive_scoring():
+    words = ["the", "and", "gnome", "poetry", "ledger", "tea", "finance", "roses"]
+    entries = [
+        _entry(" ".join(words[(i * j) % len(words)] for j in range(1, 3 + i % 7)), days_ago=i % 40)
+        for i in range(400)
+    ]
+    index = BM25Index.build(entries)
+    now = NOW.timestamp()
+
+    for query in ["the gnome", "poetry and tea", "ledger finance roses the"]:
+        pruned = index.search(query, k=5, now=now)
+        exhaustive = index.search(query, k=len(entries), now=now)[:5]
+        assert [round(s, 9) for s, _ in pruned] == [round(s, 9) for s, _ in exhaustive]
+
+
+def test_common_terms_still_match_unless_pruning_is_asked_for():
+    entries = [_entry("the weather and the roses")] + [_entry(f"the gnome {i}") for i in range(5)]
+    assert [pos for _, pos in BM25Index.build(entries).search("the roses weather", k=10)][0] == 0
+    assert len(BM25Index.build(entries).search("the roses", k=10)) == 6
+    assert len(BM25Index.build(entries, max_common_ratio=0.5).search("the roses", k=10)) == 1
+
+
+def test_memory_bank_ranks_incrementally():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        mem.save_entry("Parlour discussion entry: the weather", tags=["auto", "type:parlour"])
+        assert mem.rank("gnome") == []
+
+        mem.save_entry("Research performed: the garden gnome", tags=["auto", "domain:gnome"])
+        ranked = mem.rank("the gnome", domains={"gnome"})
+        assert ranked[0][1]["content"] == "Research performed: the garden gnome"
+        assert mem.cache_info()["misses"] == 1
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_rare_terms_outweigh_common_ones()
+    test_boosts_and_top_k()
+    test_pruning_matches_exhaustive_scoring()
+    test_common_terms_still_match_unless_pruning_is_asked_for()
+    test_memory_bank_ranks_incrementally()
+    print("ranking tests passed")
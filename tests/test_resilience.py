@@ -0,0 +1,145 @@
+import os
+import tempfile
+
+import pytest
+
+from westmarch.benchmarks.bench_whole_household import LatencyModelClient, household
+from westmarch.core.models import run_sync
+from westmarch.core.routing import PINNED
+from westmarch.core.resilience import (
+    CircuitBreaker,
+    ProviderError,
+    ProviderUnavailable,
+    RetryPolicy,
+    is_transient,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class RateLimitError(Exception):
+    """Stands in for openai.RateLimitError, which is matched by name."""
+
+
+class FlakyClient(LatencyModelClient):
+    """Provider that raises each error in `errors` in turn, then answers."""
+
+    def __init__(self, agent_name, errors=(), breaker=None, **kwargs):
+        kwargs.setdefault("routing", PINNED)
+        super().__init__(agent_name, latency=0.0, **kwargs)
+        self.retry = RetryPolicy(max_attempts=3, base_delay=0.0)
+        self.breaker = breaker or CircuitBreaker(self.provider)
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def _agenerate(self, system_prompt, user_content):
+        self._next()
+        return await super()._agenerate(system_prompt, user_content)
+
+    def _stream_generate(self, system_prompt, user_content):
+        self._next()
+        yield from super()._stream_generate(system_prompt, user_content)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_errors_are_classified():
+    assert is_transient(StatusError(429)) and is_transient(StatusError(503))
+    assert is_transient(RateLimitError()) and is_transient(TimeoutError())
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(StatusError(401)) and not is_transient(StatusError(400))
+    assert not is_transient(ValueError("bad request"))
+
+    delays = [RetryPolicy(base_delay=1.0, max_delay=4.0).delay(n) for n in (1, 2, 3, 4, 5)]
+    assert all(0 <= d <= cap for d, cap in zip(delays, (1, 2, 4, 4, 4)))
+
+
+def test_transient_errors_are_retried_and_permanent_ones_are_not():
+    client = FlakyClient("Jeeves", errors=[StatusError(503), RateLimitError()])
+    assert client.call("sys", "tea?").startswith("[jeeves]")
+    assert client.calls == 3
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+    client = FlakyClient("Jeeves", errors=[StatusError(401)])
+    with pytest.raises(ProviderError) as raised:
+        client.call("sys", "tea?")
+    assert client.calls == 1 and not raised.value.transient
+
+    client = FlakyClient("Jeeves", errors=[TimeoutError()] * 3)
+    with pytest.raises(ProviderError) as raised:
+        client.call("sys", "tea?")
+    assert client.calls == 3 and raised.value.attempts == 3
+
+    # acall and stream follow the same policy
+    client = FlakyClient("Jeeves", errors=[StatusError(502)])
+    assert run_sync(client.acall("sys", "tea?")).startswith("[jeeves]")
+    client = FlakyClient("Jeeves", errors=[StatusError(502)])
+    assert "".join(client.stream("sys", "tea?")).startswith("[jeeves]")
+    assert client.calls == 2
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    clock = Clock()
+    breaker = CircuitBreaker("gemini", failure_threshold=3, reset_timeout=10, clock=clock)
+    client = FlakyClient("Jeeves", errors=[StatusError(503)] * 3, breaker=breaker)
+
+    with pytest.raises(ProviderError):
+        client.call("sys", "tea?")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: refused without touching the provider
+    with pytest.raises(ProviderUnavailable):
+        client.call("sys", "tea?")
+    assert client.calls == 3
+
+    # Half-open: one probe; a failure re-opens at once
+    clock.now = 10
+    client.errors = [StatusError(503)]
+    with pytest.raises(ProviderError):
+        client.call("sys", "tea?")
+    assert client.calls == 4 and breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    assert client.call("sys", "tea?").startswith("[jeeves]")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_orchestrator_apologises_and_archives_nothing():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.0, os.path.join(tmp, "memory.json"))
+        pennington = orchestrator.pennington
+        orchestrator.perkins.model_client = FlakyClient("Perkins", errors=[StatusError(401)] * 9)
+
+        reply = orchestrator.run("research", "Compare ETFs and index funds")
+        assert reply.startswith("*Clears throat apologetically*") and "Perkins" in reply
+
+        chunks = "".join(orchestrator.run("research", "Compare ETFs and index funds", stream=True))
+        assert "could not be reached" in chunks
+
+        reply = orchestrator.run("whole_household", "The gnome moved again.")
+        assert "Perkins could not be reached" in reply
+        assert len(pennington.load_all_notes()) == 0
+        pennington.archivist.close()
+
+
+if __name__ == "__main__":
+    test_errors_are_classified()
+    test_transient_errors_are_retried_and_permanent_ones_are_not()
+    test_breaker_opens_fails_fast_and_recovers()
+    test_orchestrator_apologises_and_archives_nothing()
+    print("Resilience tests passed.")
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from westmarch.core.models import ModelClient
+from westmarch.core.resilience import ProviderError
+from westmarch.core.response_cache import ResponseCache, opted_in
+
+
+class CountingClient(ModelClient):
+    """ModelClient whose provider call is local and counted."""
+
+    def __init__(self, agent_name, cache, fail=False, **kwargs):
+        super().__init__(agent_name, cache=cache, **kwargs)
+        self.calls = 0
+        self.fail = fail
+
+    async def _agenerate(self, system_prompt, user_content):
+        self.calls += 1
+        if self.fail:
+            raise PermissionError("API key rejected")
+        return f"reply {self.calls} to {user_content}"
+
+
+def test_identical_requests_are_served_from_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"))
+        client = CountingClient("Jeeves", cache)
+
+        first = client.call("You are Jeeves.", "Plan my day")
+        assert client.call("You are Jeeves.", "  Plan my day  ") == first
+        assert client.call("You are Jeeves.", "Plan my week") != first
+        assert client.calls == 2
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1 and stats["misses"] == 2
+        assert stats["disk_entries"] == 2
+
+
+def test_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm.sqlite3")
+        cache = ResponseCache(path)
+        CountingClient("Perkins", cache).call("sys", "research gnomes")
+        cache.close()
+
+        reopened = ResponseCache(path)
+        client = CountingClient("Perkins", reopened)
+        assert client.call("sys", "research gnomes") == "reply 1 to research gnomes"
+        assert client.calls == 0
+        assert reopened.stats()["disk_hits"] == 1
+
+
+def test_ttl_expiry_and_size_bound():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"), memory_entries=2, ttl_seconds=0.05)
+        cache.put("a", "x" * 10)
+        time.sleep(0.1)
+        assert cache.get("a") is None
+        assert cache.stats()["expired"] == 1
+
+        cache = ResponseCache(os.path.join(tmp, "small.sqlite3"), memory_entries=2, max_disk_bytes=25)
+        for key in "abcd":
+            cache.put(key, key * 10)
+        stats = cache.stats()
+        assert stats["memory_entries"] == 2
+        assert stats["disk_bytes"] <= 25
+        # Each tier counts its own evictions
+        assert stats["memory_evictions"] == 2 and stats["disk_evictions"] == 2
+        assert cache.get("a") is None and cache.get("d") == "d" * 10
+
+
+def test_errors_and_opted_out_agents_are_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"))
+
+        failing = CountingClient("Jeeves", cache, fail=True)
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                failing.call("sys", "hello")
+        assert failing.calls == 2
+
+        fresh = CountingClient("Lady Hawthorne", cache, use_cache=False)
+        fresh.call("sys", "critique")
+        fresh.call("sys", "critique")
+        assert fresh.calls == 2
+        assert cache.stats()["writes"] == 0
+
+        os.environ["WESTMARCH_LLM_CACHE_OPT_OUT"] = "miss_pennington"
+        try:
+            assert CountingClient("Miss Pennington", cache).cache is None
+        finally:
+            del os.environ["WESTMARCH_LLM_CACHE_OPT_OUT"]
+
+
+def test_caching_is_opt_in():
+    assert ModelClient("Jeeves", fake=None).cache is None
+
+    os.environ["WESTMARCH_LLM_CACHE_AGENTS"] = "perkins"
+    try:
+        assert opted_in("Perkins") and not opted_in("Jeeves")
+        assert ModelClient("Jeeves", fake=None).cache is None
+    finally:
+        del os.environ["WESTMARCH_LLM_CACHE_AGENTS"]
+
+
+if __name__ == "__main__":
+    test_identical_requests_are_served_from_cache()
+    test_disk_tier_survives_restart()
+    test_ttl_expiry_and_size_bound()
+    test_errors_and_opted_out_agents_are_not_cached()
+    test_caching_is_opt_in()
+    print("Response cache tests passed.")
@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+
+from tests.clean_memory import CLEANED_MEMORY
+from westmarch.benchmarks.corpus import CorpusSpec, generate
+from westmarch.core import tagging
+from westmarch.core.memory import MemoryBank
+from westmarch.core.retag import retag_entry, retag_ledger
+from westmarch.core.storage import write_ledger
+from westmarch.core.tagging import DOMAIN_KEYWORDS, DomainMatcher
+from westmarch.core.vectors import VectorIndex
+
+
+def with_tea(table):
+    return {**table, "tea": ["tea", "teapot", "earl grey"]}
+
+
+def test_legacy_tags_move_to_the_current_scheme():
+    matcher = DomainMatcher(DOMAIN_KEYWORDS)
+    history, critique, parlour, research, draft = (retag_entry(e, matcher) for e in CLEANED_MEMORY[:5])
+
+    # No request section: the whole note is read, and mentions the gnome
+    assert history["tags"] == ["auto", "domain:gnome", "domain:history"]
+    assert critique["tags"] == ["auto", "domain:critique", "domain:poetry", "type:critique"]
+    assert parlour["tags"] == ["auto", "domain:gnome", "domain:parlour", "type:parlour"]
+    assert research["tags"] == ["auto", "domain:gnome", "domain:research", "type:research"]
+    assert draft["tags"] == ["auto", "domain:drafting", "domain:gnome", "type:drafting"]
+
+    # Already in the current scheme: the very same entry comes back
+    assert retag_entry(draft, matcher) is draft
+
+
+def test_domain_matcher_compiles_the_keyword_table():
+    matcher = DomainMatcher(with_tea(DOMAIN_KEYWORDS))
+    assert matcher.infer("Earl Grey in the conservatory, and the garden gnome.") == {"tea", "gnome"}
+    assert matcher.infer("A garden gnomes' parade") == {"gnome"}
+    assert matcher.infer("Teapots everywhere") == set()
+
+    saved = tagging.PHRASE_AUTOMATON_MIN
+    tagging.PHRASE_AUTOMATON_MIN = 0
+    try:
+        automaton = DomainMatcher(with_tea(DOMAIN_KEYWORDS))
+    finally:
+        tagging.PHRASE_AUTOMATON_MIN = saved
+    for text in ("earl grey with the wandering gnome", "index funds and mutual funds", "languid moonlight"):
+        assert automaton.infer(text) == matcher.infer(text)
+
+
+def test_keyword_file_is_hot_reloaded():
+    saved = (os.environ.get(tagging.KEYWORDS_ENV_VAR), tagging.RELOAD_INTERVAL, dict(DOMAIN_KEYWORDS))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keywords.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(with_tea(DOMAIN_KEYWORDS), f)
+        os.environ[tagging.KEYWORDS_ENV_VAR] = path
+        tagging.RELOAD_INTERVAL = 0
+        try:
+            assert tagging.infer_domains("More tea, Jeeves") == {"tea"}
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"tea": ["tea"], "cake": ["cake", "victoria sponge"]}, f)
+            os.utime(path, ns=(0, 10**9))
+            assert tagging.infer_domains("Victoria sponge and tea in the garden gnome room") == {"tea", "cake"}
+            assert set(DOMAIN_KEYWORDS) == {"tea", "cake"}
+
+            # A broken file keeps the table in use
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{not json")
+            os.utime(path, ns=(0, 2 * 10**9))
+            assert tagging.infer_domains("cake") == {"cake"}
+        finally:
+            if saved[0] is None:
+                os.environ.pop(tagging.KEYWORDS_ENV_VAR, None)
+            else:
+                os.environ[tagging.KEYWORDS_ENV_VAR] = saved[0]
+            tagging.RELOAD_INTERVAL = saved[1]
+            tagging.use_keywords(saved[2])
+            tagging._keywords_path = None
+
+
+def test_retag_ledger_in_every_backend_and_pool_size():
+    table = with_tea(DOMAIN_KEYWORDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        for backend, workers in (("json", 0), ("journal", 2), ("sqlite", 2)):
+            write_ledger(path, generate(CorpusSpec(300)), backend=backend, overwrite=True)
+            with open(VectorIndex.paths(path)[0], "wb"):
+                pass
+
+            stats = retag_ledger(path, backend=backend, workers=workers, chunk_size=50, table=table)
+            assert stats.entries == 300 and stats.changed == 0
+
+            write_ledger(
+                path,
+                ({**e, "content": e["content"].replace("USER SAID:\n", "USER SAID:\nTea, ")}
+                 for e in generate(CorpusSpec(300))),
+                backend=backend,
+                overwrite=True,
+            )
+            stats = retag_ledger(path, backend=backend, workers=workers, chunk_size=50, table=table)
+            parlour = sum(e["content"].startswith("Parlour") for e in generate(CorpusSpec(300)))
+            assert stats.entries == 300 and stats.changed == parlour
+
+            bank = MemoryBank(path, backend=backend)
+            assert len(bank.query_tags("domain:tea AND type:parlour")) == parlour
+            assert [e["timestamp"] for e in bank.load_all()] == [
+                e["timestamp"] for e in generate(CorpusSpec(300))
+            ]
+            bank.close()
+            assert not os.path.exists(VectorIndex.paths(path)[0])
+
+
+def test_retag_keeps_saves_from_an_open_sqlite_ledger():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.sqlite3")
+        write_ledger(path, generate(CorpusSpec(100)), backend="sqlite")
+        app = MemoryBank(path, backend="sqlite")
+        app.save_entry("Before the retag.", tags=["auto"])
+
+        retag_ledger(path, backend="sqlite", workers=0, table=with_tea(DOMAIN_KEYWORDS))
+        app.save_entry("After the retag.", tags=["auto"])
+        app.close()
+
+        bank = MemoryBank(path, backend="sqlite")
+        assert [e["content"] for e in bank.load_all()[-2:]] == ["Before the retag.", "After the retag."]
+        bank.close()
+        assert sorted(os.listdir(tmp)) == ["memory.sqlite3", "memory.sqlite3.lock"]
+
+
+if __name__ == "__main__":
+    test_legacy_tags_move_to_the_current_scheme()
+    test_domain_matcher_compiles_the_keyword_table()
+    test_keyword_file_is_hot_reloaded()
+    test_retag_ledger_in_every_backend_and_pool_size()
+    test_retag_keeps_saves_from_an_open_sqlite_ledger()
+    print("Retag tests passed.")
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from westmarch.benchmarks.bench_whole_household import LatencyModelClient
+from westmarch.core.models import run_sync
+from westmarch.core.resilience import ProviderError, RetryPolicy
+from westmarch.core.response_cache import ResponseCache
+from westmarch.core.routing import LatencyTracker, RoutingPolicy, policy_for
+
+FAST_HEDGE = RoutingPolicy(fallback=True, min_hedge_after=0.05, default_hedge_after=0.05)
+
+
+class DownClient(LatencyModelClient):
+    """Primary provider that refuses every connection."""
+
+    async def _agenerate(self, system_prompt, user_content):
+        raise ConnectionError("connection refused")
+
+
+def test_tracker_percentiles_drive_the_hedge_threshold():
+    tracker = LatencyTracker()
+    policy = RoutingPolicy(fallback=True, min_samples=20, min_hedge_after=0.5, default_hedge_after=8.0)
+    assert policy.hedge_after(tracker, "gemini", "m") == 8.0
+
+    for ms in range(1, 101):
+        tracker.record("gemini", "m", ms / 100)
+    assert tracker.percentile("gemini", "m", 50) == 0.5
+    assert tracker.percentile("gemini", "m", 95) == 0.95
+    assert policy.hedge_after(tracker, "gemini", "m") == 0.95
+    assert tracker.snapshot()["gemini/m"]["count"] == 100
+
+    assert not policy_for("Jeeves").fallback
+    assert policy_for("Jeeves").hedge_after(tracker, "gemini", "m") is None
+
+    os.environ["WESTMARCH_FALLBACK_AGENTS"] = "jeeves, lady_hawthorne"
+    try:
+        assert policy_for("Jeeves").fallback
+        assert policy_for("Lady Hawthorne").fallback
+        assert not policy_for("Perkins").fallback
+    finally:
+        del os.environ["WESTMARCH_FALLBACK_AGENTS"]
+
+
+def test_slow_primary_is_hedged_and_backup_reply_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"))
+        client = LatencyModelClient(
+            "Jeeves", 0.5, backup_latency=0.01, routing=FAST_HEDGE, cache=cache, use_cache=True
+        )
+        client.latencies = LatencyTracker()
+
+        start = time.perf_counter()
+        assert client.call("sys", "tea?").startswith("[jeeves]")
+        assert time.perf_counter() - start < 0.3
+        assert client.latencies.events == {"hedged": 1, "backup_won": 1}
+        assert cache.stats()["writes"] == 0
+
+        # Async likewise; either way the losing primary request is
+        # cancelled, so it never completes and is never timed
+        start = time.perf_counter()
+        assert run_sync(client.acall("sys", "coffee?")).startswith("[jeeves]")
+        assert time.perf_counter() - start < 0.3
+        time.sleep(0.6)
+        snapshot = client.latencies.snapshot()
+        assert "gemini/gemini-2.5-flash-lite" not in snapshot
+        assert snapshot["openai/gpt-4.1-mini"]["count"] == 2
+
+
+def test_fast_primary_is_not_hedged():
+    client = LatencyModelClient("Jeeves", 0.01, backup_latency=0.01, routing=FAST_HEDGE)
+    client.latencies = LatencyTracker()
+    client.call("sys", "tea?")
+    run_sync(client.acall("sys", "tea?"))
+    assert not client.latencies.events
+
+
+def test_outage_fails_over_only_for_opted_in_agents():
+    os.environ["WESTMARCH_FALLBACK_AGENTS"] = "perkins"
+    try:
+        client = DownClient("Perkins", 0.0, retry=RetryPolicy(max_attempts=1))
+    finally:
+        del os.environ["WESTMARCH_FALLBACK_AGENTS"]
+    client.latencies = LatencyTracker()
+    assert client.call("sys", "gnomes?").startswith("[perkins]")
+    assert run_sync(client.acall("sys", "gnomes?")).startswith("[perkins]")
+    assert client.latencies.events["failover"] == 2
+
+    pinned = DownClient("Jeeves", 0.0, retry=RetryPolicy(max_attempts=1))
+    pinned.latencies = LatencyTracker()
+    with pytest.raises(ProviderError):
+        pinned.call("sys", "gnomes?")
+    assert pinned.latencies.events["failover"] == 0
+    client.breaker.reset()
+    pinned.breaker.reset()
+
+
+if __name__ == "__main__":
+    test_tracker_percentiles_drive_the_hedge_threshold()
+    test_slow_primary_is_hedged_and_backup_reply_is_not_cached()
+    test_fast_primary_is_not_hedged()
+    test_outage_fails_over_only_for_opted_in_agents()
+    print("Routing tests passed.")
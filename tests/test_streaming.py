@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+import pytest
+
+from westmarch.benchmarks.bench_whole_household import LatencyModelClient, household
+from westmarch.core.resilience import ProviderError
+from westmarch.core.response_cache import ResponseCache
+
+
+class ChunkedClient(LatencyModelClient):
+    def __init__(self, agent_name, cache, fail=False):
+        super().__init__(agent_name, latency=0.0, cache=cache, use_cache=True)
+        self.fail = fail
+        self.streams = 0
+
+    def _stream_generate(self, system_prompt, user_content):
+        self.streams += 1
+        yield "Very "
+        yield "good, "
+        if self.fail:
+            raise ConnectionError("connection reset")
+        yield "sir."
+
+
+def test_stream_yields_chunks_and_caches_the_whole_reply():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"))
+        client = ChunkedClient("Jeeves", cache)
+
+        assert list(client.stream("sys", "tea?")) == ["Very ", "good, ", "sir."]
+        # Cached afterwards: one chunk, no provider stream, and call() agrees
+        assert list(client.stream("sys", "tea?")) == ["Very good, sir."]
+        assert client.call("sys", "tea?") == "Very good, sir."
+        assert client.streams == 1
+
+        # A failure after the first chunk raises rather than retrying or caching
+        failing = ChunkedClient("Perkins", cache, fail=True)
+        for _ in range(2):
+            received = []
+            with pytest.raises(ProviderError, match="connection reset"):
+                for chunk in failing.stream("sys", "coffee?"):
+                    received.append(chunk)
+            assert received == ["Very ", "good, "]
+        assert failing.streams == 2
+        failing.breaker.reset()
+
+
+def test_streamed_workflow_archives_after_the_last_chunk():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.02, os.path.join(tmp, "memory.json"))
+        pennington = orchestrator.pennington
+
+        chunks = orchestrator.run("research", "Compare ETFs and index funds", stream=True)
+        first = next(chunks)
+        assert len(pennington.load_all_notes()) == 0
+
+        reply = first + "".join(chunks)
+        assert reply.startswith("[perkins]")
+        notes = pennington.load_all_notes()
+        assert len(notes) == 1
+        assert notes[0]["content"].endswith(f"RESEARCH SUMMARY:\n{reply}")
+        assert "type:research" in notes[0]["tags"]
+
+        # Closure phrases still short-circuit, as a one-chunk stream
+        assert list(orchestrator.critique_text("Thank you", stream=True))[0].startswith("As you wish")
+        pennington.archivist.close()
+
+
+if __name__ == "__main__":
+    test_stream_yields_chunks_and_caches_the_whole_reply()
+    test_streamed_workflow_archives_after_the_last_chunk()
+    print("Streaming tests passed.")
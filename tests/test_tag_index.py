@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from westmarch.core.memory import MemoryBank
+from westmarch.core.tag_index import TagIndex, TagQueryError
+
+
+ENTRIES = [
+    {"tags": ["auto", "domain:gnome", "type:research"]},
+    {"tags": ["auto", "domain:gnome", "type:parlour"]},
+    {"tags": ["auto", "domain:poetry", "type:critique"]},
+    {"tags": ["history", "westmarch"]},
+]
+
+
+def _hits(index, expression):
+    return list(TagIndex.positions(index.query(expression)))
+
+
+def test_boolean_tag_queries():
+    index = TagIndex.build(ENTRIES)
+
+    assert _hits(index, "domain:gnome") == [0, 1]
+    assert _hits(index, "domain:gnome AND type:research NOT type:parlour") == [0]
+    assert _hits(index, "domain:gnome type:parlour") == [1]
+    assert _hits(index, "domain:poetry OR history") == [2, 3]
+    assert _hits(index, "NOT auto") == [3]
+    assert _hits(index, "(domain:gnome OR domain:poetry) and not type:critique") == [0, 1]
+    assert _hits(index, "domain:*") == [0, 1, 2]
+    assert _hits(index, "domain:finance") == []
+
+    for bad in ["", "domain:gnome AND", "(auto", "OR auto"]:
+        try:
+            index.query(bad)
+        except TagQueryError:
+            continue
+        raise AssertionError(f"expected a parse error for {bad!r}")
+
+
+def test_memory_bank_keeps_index_current():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = MemoryBank(os.path.join(tmp, "memory.jsonl"))
+        mem.save_entry("Research performed: gnome", tags=["auto", "domain:gnome", "type:research"])
+        assert len(mem.query_tags("domain:gnome")) == 1
+
+        mem.save_entry("Parlour discussion entry: gnome", tags=["auto", "domain:gnome", "type:parlour"])
+        found = mem.query_tags("domain:gnome NOT type:parlour")
+        assert [e["content"] for e in found] == ["Research performed: gnome"]
+        assert len(mem.query_tags("type:parlour OR type:research")) == 2
+        assert mem.cache_info()["misses"] == 1
+
+
+if __name__ == "__main__":
+    test_boolean_tag_queries()
+    test_memory_bank_keeps_index_current()
+    print("Tag index tests passed.")
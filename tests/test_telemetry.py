@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from westmarch.benchmarks.bench_whole_household import LatencyModelClient, household
+from westmarch.core import telemetry
+from westmarch.core.resilience import ProviderError, RetryPolicy
+from westmarch.core.response_cache import ResponseCache
+from westmarch.core.routing import PINNED
+from westmarch.core.telemetry import CallRecord, Histogram, Telemetry
+
+
+class BrokenClient(LatencyModelClient):
+    async def _agenerate(self, system_prompt, user_content):
+        raise ValueError("invalid request")
+
+
+def with_collector(path):
+    collector = Telemetry(path)
+    previous, telemetry._default_telemetry = telemetry._default_telemetry, collector
+    return collector, previous
+
+
+def read_ledger(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_calls_are_tagged_with_agent_workflow_and_usage():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = os.path.join(tmp, "calls.jsonl")
+        collector, previous = with_collector(ledger)
+        try:
+            orchestrator = household(0.01, os.path.join(tmp, "memory.json"))
+            orchestrator.whole_household("The gnome moved again.")
+            reply = "".join(orchestrator.run("research", "Compare ETFs", stream=True))
+            orchestrator.pennington.archivist.close()
+        finally:
+            telemetry._default_telemetry = previous
+
+        records = read_ledger(ledger)
+        household_calls = [r for r in records if r["workflow"] == "whole_household"]
+        assert len(household_calls) == 7
+        assert {r["agent"] for r in household_calls} == {
+            "jeeves", "perkins", "miss pennington", "lady hawthorne"
+        }
+        assert all(r["prompt_tokens"] > 0 and r["cost_usd"] > 0 for r in household_calls)
+        assert all(r["kind"] == "acall" and r["outcome"] == "ok" for r in household_calls)
+
+        research = [r for r in records if r["workflow"] == "quick_research"]
+        assert len(research) == 1 and research[0]["kind"] == "stream"
+        assert 0 < research[0]["ttft"] <= research[0]["wall_time"]
+        assert reply.startswith("[perkins]")
+
+        by_workflow = {row["workflow"]: row for row in collector.summary()}
+        assert by_workflow["whole_household"]["calls"] == 7
+        assert by_workflow["whole_household"]["latency"]["count"] == 7
+        assert by_workflow["quick_research"]["ttft"]["count"] == 1
+
+
+def test_cached_and_failed_calls_are_recorded():
+    with tempfile.TemporaryDirectory() as tmp:
+        collector, previous = with_collector(None)
+        try:
+            cache = ResponseCache(os.path.join(tmp, "llm.sqlite3"))
+            client = LatencyModelClient("Jeeves", 0.0, cache=cache, use_cache=True)
+            client.call("sys", "tea?")
+            client.call("sys", "tea?")
+
+            broken = BrokenClient("Perkins", 0.0, routing=PINNED, retry=RetryPolicy(max_attempts=1))
+            with pytest.raises(ProviderError):
+                broken.call("sys", "gnomes?")
+        finally:
+            telemetry._default_telemetry = previous
+
+        by_agent = {row["agent"]: row for row in collector.summary(by="agent")}
+        assert by_agent["jeeves"]["calls"] == 2 and by_agent["jeeves"]["cached"] == 1
+        assert by_agent["perkins"]["errors"] == 1
+
+
+def test_ledger_rotates_and_histograms_bucket():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "calls.jsonl")
+        collector = Telemetry(path, max_bytes=1000, backups=2)
+        for i in range(30):
+            collector.emit(CallRecord("jeeves", "gemini", "gemini-2.5-flash-lite", "call", wall_time=i))
+        assert os.path.exists(path + ".1") and os.path.exists(path + ".2")
+        assert not os.path.exists(path + ".3")
+        assert os.path.getsize(path) <= 1000
+        assert read_ledger(path)[-1]["wall_time"] == 29
+
+    hist = Histogram()
+    for seconds in (0.05, 0.3, 0.3, 0.4, 3.0):
+        hist.observe(seconds)
+    assert hist.quantile(0.5) == 0.5
+    assert hist.quantile(0.95) == 5.0
+    assert hist.as_dict()["buckets"]["<=0.5s"] == 3
+
+
+if __name__ == "__main__":
+    test_calls_are_tagged_with_agent_workflow_and_usage()
+    test_cached_and_failed_calls_are_recorded()
+    test_ledger_rotates_and_histograms_bucket()
+    print("Telemetry tests passed.")
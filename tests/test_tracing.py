@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+import json
+import os
+import tempfile
+import threading
+
+from westmarch.benchmarks.bench_whole_household import household
+from westmarch.core import tracing
+from westmarch.core.tracing import NULL_SPAN, Tracer
+
+
+def test_spans_nest_and_carry_attributes():
+    with tracing.recording() as tracer:
+        with tracing.span("workflow.test", workflow="test") as outer:
+            with tracing.span("memory.rank", k=10) as inner:
+                inner.set(hits=3)
+            tracing.current().set(done=True)
+        try:
+            with tracing.span("model.call"):
+                raise ValueError("quota")
+        except ValueError:
+            pass
+
+    workflow, rank, call = tracer.finished()
+    assert rank.parent_id == workflow.span_id and rank.trace_id == workflow.trace_id
+    assert call.parent_id is None and call.trace_id != workflow.trace_id
+    assert workflow.attributes == {"workflow": "test", "done": True}
+    assert rank.attributes == {"k": 10, "hits": 3}
+    assert call.error == "ValueError: quota"
+    assert workflow.end_ns >= rank.end_ns > rank.start_ns >= workflow.start_ns
+    assert outer is workflow
+
+
+def test_nothing_is_recorded_while_off():
+    assert not tracing.enabled()
+    with tracing.span("memory.rank") as span:
+        assert span is NULL_SPAN and tracing.current() is NULL_SPAN
+        span.set(hits=1)
+    assert tracing.open_span("model.call") is None
+
+
+def test_context_follows_tasks_threads_and_streams():
+    def in_thread():
+        with tracing.span("thread.child"):
+            pass
+
+    async def in_task(n):
+        with tracing.span(f"task.child{n}"):
+            await asyncio.sleep(0.01)
+
+    async def fan_out():
+        await asyncio.gather(in_task(1), in_task(2))
+
+    def chunks():
+        with tracing.span("stream.chunk"):
+            pass
+        yield "a"
+        yield "b"
+
+    with tracing.recording() as tracer:
+        with tracing.span("root") as root:
+            asyncio.run(fan_out())
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(in_thread,))
+            worker.start()
+            worker.join()
+            stream = tracing.bind(tracing.open_span("stream"), chunks())
+        assert list(stream) == ["a", "b"]
+
+    spans = {s.name: s for s in tracer.finished()}
+    assert {s.parent_id for n, s in spans.items() if n.startswith(("task.", "thread."))} == {root.span_id}
+    assert spans["task.child1"].task != spans["task.child2"].task
+    assert spans["thread.child"].thread_id != root.thread_id
+    # The stream's span stays open until the last chunk has been read
+    assert spans["stream"].end_ns > root.end_ns
+    assert spans["stream.chunk"].parent_id == spans["stream"].span_id
+
+
+def test_whole_household_trace_exports():
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(0.02, os.path.join(tmp, "memory.json"))
+        with tracing.recording() as tracer:
+            orchestrator.whole_household("The gnome moved again.")
+            reply = "".join(orchestrator.run("research", "Compare ETFs", stream=True))
+        orchestrator.pennington.archivist.close()
+
+        spans = tracer.finished()
+        # Write-behind archiving shows up as its own memory.archive traces
+        roots = [s for s in spans if s.parent_id is None and s.name.startswith("workflow.")]
+        assert [s.name for s in roots] == ["workflow.whole_household", "workflow.quick_research"]
+        household_spans = [s for s in spans if s.trace_id == roots[0].trace_id]
+        steps = [s for s in household_spans if s.name.startswith("step.")]
+        # Independent steps run at once, each on its own asyncio task
+        assert len({s.task for s in steps}) == len(steps) > 1
+        assert {s.name for s in household_spans} >= {"agent.Perkins", "model.acall", "provider.generate"}
+        call = next(s for s in household_spans if s.name == "model.acall")
+        assert call.attributes["cache_hit"] is False and call.attributes["prompt_chars"] > 0
+
+        research = [s for s in spans if s.trace_id == roots[1].trace_id]
+        stream = next(s for s in research if s.name == "model.stream")
+        assert reply and roots[1].end_ns >= stream.end_ns
+
+        chrome = json.load(open(tracer.write(os.path.join(tmp, "trace.json"))))
+        complete = [e for e in chrome["traceEvents"] if e["ph"] == "X"]
+        assert len(complete) == len(spans)
+        assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in chrome["traceEvents"])
+
+        otlp = json.load(open(tracer.write(os.path.join(tmp, "trace.otlp.json"))))
+        exported = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ids = {s["spanId"] for s in exported}
+        assert len(exported) == len(spans)
+        assert all(s["parentSpanId"] in ids for s in exported if "parentSpanId" in s)
+
+
+def test_tracer_bounds_its_spans():
+    with tracing.recording(Tracer(max_spans=2)) as tracer:
+        for _ in range(5):
+            with tracing.span("memory.search"):
+                pass
+    assert len(tracer.spans) == 2 and tracer.dropped == 3
+
+
+if __name__ == "__main__":
+    test_spans_nest_and_carry_attributes()
+    test_nothing_is_recorded_while_off()
+    test_context_follows_tasks_threads_and_streams()
+    test_whole_household_trace_exports()
+    test_tracer_bounds_its_spans()
+    print("All tracing tests passed.")
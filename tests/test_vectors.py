@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from westmarch.benchmarks.bench_whole_household import household
+from westmarch.core.memory import MemoryBank
+from westmarch.core.vectors import HashingEmbedder, VectorIndex
+
+SHIPPED_LEDGER = os.path.join(os.path.dirname(__file__), "..", "westmarch", "data", "memory.json")
+
+NOTES = [
+    ("Research performed: the garden gnome moved two paving stones overnight",
+     ["auto", "domain:gnome", "type:research"]),
+    ("Research performed: comparison of ETFs and mutual funds",
+     ["auto", "domain:finance", "type:research"]),
+    ("Critique requested from Lady Hawthorne: O languid moon of yesteryear",
+     ["auto", "domain:poetry", "type:critique"]),
+]
+
+
+def _bank(tmp, name="memory.jsonl"):
+    mem = MemoryBank(os.path.join(tmp, name))
+    for content, tags in NOTES:
+        mem.save_entry(content, tags=tags)
+    return mem
+
+
+def test_embedding_is_stable_and_normalised():
+    embedder = HashingEmbedder(dim=64)
+    assert np.array_equal(embedder.embed("the gnome"), HashingEmbedder(dim=64).embed("the gnome"))
+
+    index = VectorIndex.build([{"content": c, "tags": t} for c, t in NOTES], dim=64)
+    assert index.matrix.dtype == np.float32 and index.matrix.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0, atol=1e-5)
+
+
+def test_finds_notes_without_shared_words():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = _bank(tmp)
+        best = mem.similar("that nocturnal ornament business")
+        assert best and "gnome" in best[0][1]["content"]
+
+        best = mem.similar("my savings and dividends")
+        assert "ETFs" in best[0][1]["content"]
+
+
+def test_vectors_persist_beside_the_ledger():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = _bank(tmp)
+        mem.similar("gnome")
+        mem.save_entry("Parlour discussion entry: the weather", tags=["auto", "type:parlour"])
+
+        saved = mem._current_vectors().matrix.copy()
+        data_path, _ = VectorIndex.paths(mem.filepath)
+        assert os.path.getsize(data_path) == saved.nbytes == 4 * 4 * saved.shape[1]
+
+        # A fresh bank reuses the file; one more note written elsewhere is
+        # embedded on top of it
+        other = MemoryBank(mem.filepath)
+        other.save_entry("Daily plan created: tea at four", tags=["auto"])
+        reopened = MemoryBank(mem.filepath)
+        entries = list(reopened.load_all())
+        loaded = VectorIndex.load(mem.filepath, entries)
+        assert loaded is not None and loaded.size == 5
+        assert np.array_equal(loaded.matrix[:4], saved)
+
+        # A rewritten ledger no longer matches the file
+        reopened._save([dict(e) for e in entries[1:]])
+        assert VectorIndex.load(mem.filepath, list(reopened.load_all())) is None
+
+
+def test_semantic_candidates_join_the_ranking():
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = _bank(tmp)
+        assert mem.rank("nocturnal ornament") == []
+        fused = mem.rank("nocturnal ornament", semantic=True)
+        assert "gnome" in fused[0][1]["content"]
+
+
+
+def test_unrelated_query_gets_no_recollection():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.json")
+        shutil.copy(SHIPPED_LEDGER, path)
+        orchestrator = household(0.0, path)
+        try:
+            assert orchestrator.pennington.rank_notes("xyzzy quantum blockchain", semantic=True) == []
+            reply = orchestrator.run("recall_memory", "xyzzy quantum blockchain")
+            assert "no relevant recollection" in reply
+        finally:
+            orchestrator.pennington.archivist.close()
+
+
+if __name__ == "__main__":
+    test_embedding_is_stable_and_normalised()
+    test_finds_notes_without_shared_words()
+    test_vectors_persist_beside_the_ledger()
+    test_semantic_candidates_join_the_ranking()
+    test_unrelated_query_gets_no_recollection()
+    print("vector index tests passed")
@@ -1,11 +1,13 @@
 # westmarch/agents/base_agent.py
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Iterator
 
+from westmarch.core import tracing
 from westmarch.core.messages import AgentMessage, TaskType
 from westmarch.core.models import ModelClient
 
-from westmarch.core.logging import log
+from westmarch.core.logging import DEBUG, bind_context, log, log_context
 from westmarch.agents.prompts_jeeves import JEEVES_SYSTEM_PROMPT_PARLOUR
 
 
@@ -63,22 +65,65 @@ class BaseAgent(ABC):
     #                  RUN
     # -----------------------------------------
     def run(self, message: AgentMessage) -> str:
+        with log_context(agent=self.name), self._span("run", message):
+            system_prompt, user_content = self._prepare_call(message)
 
-        log(f"{self.name}: RECEIVED task '{message.task_type.name}' from {message.sender}")
+            response = self.model_client.call(
+                system_prompt=system_prompt,
+                user_content=user_content,
+            )
 
-        # Build full content
-        user_content = self.build_user_content(message)
+            log("%s: completed task, returning response", self.name)
 
-        log(f"{self.name}: preparing model call")
+        return response
 
-        # >>> Use dynamic system prompt <<<
-        system_prompt = self.build_system_prompt(message)
+    async def arun(self, message: AgentMessage) -> str:
+        """Async counterpart of run(), for workflows that fan out model calls."""
+        with log_context(agent=self.name), self._span("arun", message):
+            system_prompt, user_content = self._prepare_call(message)
+
+            response = await self.model_client.acall(
+                system_prompt=system_prompt,
+                user_content=user_content,
+            )
 
-        response = self.model_client.call(
+            log("%s: completed task, returning response", self.name)
+
+        return response
+
+    def stream(self, message: AgentMessage) -> Iterator[str]:
+        """Like run(), but yields the reply in chunks as the model writes it."""
+        span = tracing.open_span(f"agent.{self.name}", **self._span_attributes("stream", message))
+        return bind_context(tracing.bind(span, self._stream(message)), agent=self.name)
+
+    def _stream(self, message: AgentMessage) -> Iterator[str]:
+        system_prompt, user_content = self._prepare_call(message)
+
+        yield from self.model_client.stream(
             system_prompt=system_prompt,
             user_content=user_content,
         )
 
-        log(f"{self.name}: completed task, returning response")
+        log("%s: completed task, stream finished", self.name)
+
+    def _span_attributes(self, method: str, message: AgentMessage) -> dict:
+        return {"agent": self.name, "method": method, "task": message.task_type.name, "sender": message.sender}
+
+    def _span(self, method: str, message: AgentMessage):
+        if not tracing.enabled():
+            return tracing.span(f"agent.{self.name}")
+        return tracing.span(f"agent.{self.name}", **self._span_attributes(method, message))
+
+    def _prepare_call(self, message: AgentMessage) -> tuple[str, str]:
+
+        log("%s: RECEIVED task '%s' from %s", self.name, message.task_type.name, message.sender)
+
+        # Build full content
+        user_content = self.build_user_content(message)
+
+        log("%s: preparing model call", self.name, level=DEBUG)
+
+        # >>> Use dynamic system prompt <<<
+        system_prompt = self.build_system_prompt(message)
 
-        return response
\ No newline at end of file
+        return system_prompt, user_content
@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 from westmarch.agents.base_agent import BaseAgent
+from westmarch.core.archival import ArchivalQueue
 from westmarch.core.messages import AgentMessage, TaskType
-from westmarch.core.memory import MemoryBank
+from westmarch.core.memory import SEMANTIC_MIN_SCORE, MemoryBank
 from westmarch.core.messages import Context
 
 from westmarch.core.tagging import infer_tags_from_user_input
@@ -64,7 +65,12 @@ Outside those explicit cases, do not mention them.
 """
 
 class MissPenningtonAgent(BaseAgent):
-    def __init__(self, model_client):
+    def __init__(
+        self,
+        model_client,
+        background_archival: bool = True,
+        memory_path: str = "westmarch/data/memory.json",
+    ):
         super().__init__(
             name="Miss Pennington",
             model_client=model_client,
@@ -72,13 +78,27 @@ class MissPenningtonAgent(BaseAgent):
         )
 
         # Attach the Memory Bank
-        self.memory = MemoryBank("westmarch/data/memory.json")
+        self.memory = MemoryBank(memory_path)
+
+        # Notes are tagged and written by a background worker, so a
+        # workflow's reply is not held up by archiving
+        self.archivist = (
+            ArchivalQueue(self.memory, tagger=self._note_tags) if background_archival else None
+        )
 
     def run(self, message: AgentMessage) -> str:
       # Remember the user's original request for tagging
       self.last_user_input = message.context.original_user_request
       return super().run(message)
 
+    async def arun(self, message: AgentMessage) -> str:
+        self.last_user_input = message.context.original_user_request
+        return await super().arun(message)
+
+    def stream(self, message: AgentMessage):
+        self.last_user_input = message.context.original_user_request
+        return super().stream(message)
+
     def build_user_content(self, message: AgentMessage) -> str:
         original = message.context.original_user_request or ""
         return (
@@ -98,6 +118,9 @@ class MissPenningtonAgent(BaseAgent):
         - otherwise from self.last_user_input (for backward compatibility)
         - workflow-specific extra_tags (e.g. ['type:parlour'])
         - the universal 'auto' tag
+
+        With background archival (the default) the note is queued and the
+        archivist thread tags and writes it; flush_notes() waits for it.
         """
 
         # Prefer explicit raw_user_input; fall back to last_user_input only if needed
@@ -106,6 +129,12 @@ class MissPenningtonAgent(BaseAgent):
         else:
             user_input = getattr(self, "last_user_input", None)
 
+        if self.archivist is not None:
+            self.archivist.submit(content, user_input, extra_tags)
+        else:
+            self.memory.save_entry(content, tags=self._note_tags(user_input, extra_tags))
+
+    def _note_tags(self, user_input: Optional[str], extra_tags: Optional[list[str]]) -> list[str]:
         inferred_tags = infer_tags_from_user_input(user_input)
 
         # Combine inferred domain tags with workflow tags
@@ -113,19 +142,52 @@ class MissPenningtonAgent(BaseAgent):
         final_tags.extend(inferred_tags)
         if extra_tags:
             final_tags.extend(extra_tags)
+        return final_tags
 
-        self.memory.save_entry(content, tags=final_tags)
+    def flush_notes(self) -> None:
+        """Wait until every note handed to save_note() is in the ledger."""
+        if self.archivist is not None:
+            self.archivist.flush()
 
     def recall_all(self):
+        self.flush_notes()
         return self.memory.load_all()
 
-    def search_memory(self, query: str):
-        return self.memory.search(query)
+    def search_memory(self, query: str, semantic_fallback: bool = True, k: int = 10):
+        """
+        Entries containing the query text. If none do, fall back to the k
+        notes closest to it in the vector index (approximate nearest
+        neighbours once the ledger is large).
+        """
+        self.flush_notes()
+        matches = self.memory.search(query)
+        if matches or not semantic_fallback:
+            return matches
+        return [entry for _, entry in self.memory.similar(query, k=k, min_score=SEMANTIC_MIN_SCORE)]
+
+    def query_notes(self, expression: str):
+        """Return memory entries matching a boolean tag query (see TagIndex)."""
+        self.flush_notes()
+        return self.memory.query_tags(expression)
+
+    def rank_notes(self, query: str, k: int = 10, domains=None, semantic: bool = False):
+        """
+        Return the k best (score, entry) pairs for the query, BM25-ranked,
+        optionally fused with the semantic vector index.
+        """
+        self.flush_notes()
+        return self.memory.rank(query, k=k, domains=domains, semantic=semantic)
+
+    def similar_notes(self, query: str, k: int = 10, min_score: float = 0.05):
+        """Return (cosine, entry) pairs for notes semantically close to the query."""
+        self.flush_notes()
+        return self.memory.similar(query, k=k, min_score=min_score)
 
     def summarize_memory(self) -> str:
         """
         Summarize the contents of the memory bank in Miss Pennington's voice.
         """
+        self.flush_notes()
         notes_text = self.memory.to_text()
         return self.summarize_text(notes_text)
 
@@ -134,6 +196,7 @@ class MissPenningtonAgent(BaseAgent):
         Return the raw list of memory entries as stored by MemoryBank.
         Each entry is typically a dict with keys like 'timestamp', 'content', 'tags'.
         """
+        self.flush_notes()
         return self.memory.load_all()
 
     def summarize_text(self, text: str, context: Context | None = None) -> str:
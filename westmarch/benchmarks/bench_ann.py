@@ -0,0 +1,79 @@
+# westmarch/benchmarks/bench_ann.py
+"""
+Measure recall@10 and latency of the IVF index against exact vector search.
+
+    python -m westmarch.benchmarks.bench_ann --sizes 100000,300000 --nprobe 1,4,8,16,32,64
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+
+import westmarch.core.logging as westmarch_logging
+from westmarch.benchmarks.bench_recall_ranking import synthetic_entries
+from westmarch.core.ann import IVFIndex
+from westmarch.core.vectors import VectorIndex
+
+
+def sample_queries(entries, count: int, seed: int = 11) -> List[str]:
+    """Short fragments of stored notes, the way people half-remember them."""
+    rng = random.Random(seed)
+    queries = []
+    for entry in rng.sample(entries, count):
+        words = entry["content"].split()
+        start = rng.randrange(max(1, len(words) - 6))
+        queries.append(" ".join(words[start:start + 6]))
+    return queries
+
+
+def run(sizes: List[int], nprobes: List[int], queries: int = 200) -> None:
+    westmarch_logging.LOGGING_ENABLED = False
+
+    for n in sizes:
+        entries = synthetic_entries(n)
+        vectors = VectorIndex.build(entries)
+        matrix = vectors.matrix
+
+        start = time.perf_counter()
+        ivf = IVFIndex.train(matrix)
+        train = time.perf_counter() - start
+
+        qvecs = [vectors.query_vector(q) for q in sample_queries(entries, queries)]
+
+        start = time.perf_counter()
+        exact = []
+        for q in qvecs:
+            scores = matrix @ q
+            top = np.argpartition(-scores, 9)[:10]
+            exact.append(set(top.tolist()))
+        exact_ms = (time.perf_counter() - start) / len(qvecs) * 1e3
+
+        print(f"\n{n} entries, nlist={ivf.nlist}, trained in {train:.2f}s, exact {exact_ms:.2f}ms/query")
+        print(f"{'nprobe':>8} {'recall@10':>10} {'latency':>10} {'speedup':>8}")
+        for nprobe in nprobes:
+            start = time.perf_counter()
+            found = [ivf.search(q, k=10, nprobe=nprobe)[0] for q in qvecs]
+            ann_ms = (time.perf_counter() - start) / len(qvecs) * 1e3
+            recall = np.mean([len(truth & set(hit.tolist())) / 10 for truth, hit in zip(exact, found)])
+            print(f"{nprobe:>8} {recall:>10.3f} {ann_ms:>8.2f}ms {exact_ms / ann_ms:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100000")
+    parser.add_argument("--nprobe", default="1,4,8,16,32,64")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    run(
+        [int(s) for s in args.sizes.split(",")],
+        [int(p) for p in args.nprobe.split(",")],
+        queries=args.queries,
+    )
+
+
+if __name__ == "__main__":
+    main()
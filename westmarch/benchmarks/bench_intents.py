@@ -0,0 +1,75 @@
+# westmarch/benchmarks/bench_intents.py
+"""
+Time the compiled intent engine against the per-list phrase scans it replaced.
+
+"legacy" runs `any(p in lower for p in phrases)` over each phrase list in
+turn; "scan" is one pass of the compiled automaton over the same lists.
+"request" is what one orchestrator request costs: classify_task plus the
+routed workflow's closure check, which share a memoized scan.
+
+    python -m westmarch.benchmarks.bench_intents
+    python -m westmarch.benchmarks.bench_intents --number 20000
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Dict, List
+
+from westmarch.orchestrator.intents import CLOSURES, INTENTS, TASK_CUES
+from westmarch.orchestrator.router import classify_task
+
+INPUTS: Dict[str, str] = {
+    "closure": "Splendid, thank you Jeeves.",
+    "request": "Jeeves, could you plan my day tomorrow? Letters in the morning, then the gnome.",
+    "draft": "Please draft a short, extremely polite note to the neighbours about the garden gnome.",
+    "poem": (
+        "O languid moon of yesteryear, why do you hang so low and tired above the wilted "
+        "hopes I've scattered on the garden path of memory? "
+    ) * 12,
+}
+
+
+def legacy_all(text: str) -> List[bool]:
+    lower = text.lower()
+    return [any(p in lower for p in phrases) for phrases in INTENTS.phrases.values()]
+
+
+def legacy_request(text: str) -> bool:
+    lower = text.lower()
+    for cues in TASK_CUES.values():
+        if any(p in lower for p in cues):
+            break
+    return any(p in lower for p in INTENTS.phrases["closure:parlour_discussion"])
+
+
+def engine_request(text: str) -> bool:
+    INTENTS.match.cache_clear()
+    classify_task(text)
+    return CLOSURES["parlour_discussion"].matches(text)
+
+
+def run(number: int) -> None:
+    phrases = sum(len(p) for p in INTENTS.phrases.values())
+    print(f"{len(INTENTS.phrases)} intents, {phrases} phrases")
+    print(f"{'input':>8} {'chars':>6} {'legacy all':>11} {'scan':>8} {'legacy req':>11} {'request':>8}")
+    for name, text in INPUTS.items():
+
+        def per_call(fn) -> float:
+            return min(timeit.repeat(lambda: fn(text), number=number, repeat=3)) / number * 1e6
+
+        print(
+            f"{name:>8} {len(text):>6} {per_call(legacy_all):>9.2f}us {per_call(INTENTS.scan):>6.2f}us "
+            f"{per_call(legacy_request):>9.2f}us {per_call(engine_request):>6.2f}us"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
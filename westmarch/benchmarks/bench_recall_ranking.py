@@ -0,0 +1,126 @@
+# westmarch/benchmarks/bench_recall_ranking.py
+"""
+Compare the BM25 recall ranker with the original keyword-overlap scorer.
+
+    python -m westmarch.benchmarks.bench_recall_ranking --sizes 1000,100000,1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+import westmarch.core.logging as westmarch_logging
+from westmarch.core.ranking import BM25Index
+
+
+QUERIES = [
+    "what did we learn about the gnome yesterday",
+    "remind me of the poem about the languid moon",
+    "the research on etfs and mutual funds",
+    "what did lady hawthorne say in her critique",
+]
+
+_PREFIXES = [
+    "Parlour discussion entry:",
+    "Research performed for user request:",
+    "Drafted text based on user request:",
+    "Critique requested from Lady Hawthorne:",
+    "[Whole Household Workflow Summary]",
+]
+
+_TOPICAL = (
+    "gnome garden waistcoat paving stones moon languid poem verse stanza "
+    "finance fund etf portfolio market weather rain forecast schedule "
+    "letter neighbours draft critique hawthorne perkins pennington jeeves "
+    "archive chamber iron door rattling parchment estate history tea"
+).split()
+
+_COMMON = "the a of and to in that it with as for was on be by at this from".split()
+
+# Filler vocabulary with a Zipf-like frequency profile, as in real prose
+_FILLER = [f"word{i}" for i in range(5000)]
+_FILLER_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(_FILLER))]
+
+
+def synthetic_entries(n: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        length = rng.randint(20, 60)
+        words = rng.choices(_FILLER, weights=_FILLER_WEIGHTS, k=length)
+        for slot in rng.sample(range(length), k=min(length, 12)):
+            words[slot] = rng.choice(_COMMON)
+        for slot in rng.sample(range(length), k=3):
+            words[slot] = rng.choice(_TOPICAL)
+        entries.append({
+            "timestamp": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00",
+            "content": f"{rng.choice(_PREFIXES)}\n\n{' '.join(words)}",
+            "tags": ["auto", f"domain:{rng.choice(['gnome', 'poetry', 'finance'])}"],
+        })
+    return entries
+
+
+def legacy_score_entry(content: str, query: str) -> int:
+    """The original recall_memory scorer: raw substring hits per query word."""
+    q_words = set(query.split())
+    score = 0
+    for w in q_words:
+        if w and w in content.lower():
+            score += 1
+    return score
+
+
+def legacy_top10(entries: List[Dict], query: str):
+    candidates = []
+    for entry in entries:
+        s = legacy_score_entry(entry.get("content", "") or "", query)
+        if s > 0:
+            candidates.append((s, entry))
+    candidates.sort(key=lambda pair: pair[0], reverse=True)
+    return candidates[:10]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: List[int], repeat: int = 3) -> None:
+    westmarch_logging.LOGGING_ENABLED = False
+
+    print(f"{'entries':>10} {'bm25 build':>12} {'bm25 query':>12} {'legacy query':>13} {'speedup':>8}")
+    for n in sizes:
+        entries = synthetic_entries(n)
+
+        start = time.perf_counter()
+        index = BM25Index.build(entries)
+        build = time.perf_counter() - start
+
+        bm25 = sum(_time(lambda q=q: index.search(q, k=10, domains={"gnome"}), repeat) for q in QUERIES)
+        legacy_repeat = repeat if n <= 100_000 else 1
+        legacy = sum(_time(lambda q=q: legacy_top10(entries, q), legacy_repeat) for q in QUERIES)
+
+        bm25 /= len(QUERIES)
+        legacy /= len(QUERIES)
+        print(
+            f"{n:>10} {build:>11.2f}s {bm25 * 1e3:>10.2f}ms "
+            f"{legacy * 1e3:>11.2f}ms {legacy / bm25:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
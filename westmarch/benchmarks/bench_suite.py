@@ -0,0 +1,239 @@
+# westmarch/benchmarks/bench_suite.py
+"""
+Regression suite: every orchestrator task and the MemoryBank hot paths.
+
+Workflows run against the synthetic FakeProvider (zero latency by default,
+so the numbers are orchestration overhead); MemoryBank operations run over
+synthetic ledgers of each --sizes. Each case reports throughput, p50/p99
+latency and the process's peak RSS, and is compared with a stored baseline;
+the exit status is 1 if any case regressed beyond --tolerance, so the suite
+can gate merges.
+
+    python -m westmarch.benchmarks.bench_suite
+    python -m westmarch.benchmarks.bench_suite --sizes 1000,100000,1000000 --only memory
+    python -m westmarch.benchmarks.bench_suite --save-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows: peak RSS is not reported
+    resource = None
+
+import westmarch.core.logging as westmarch_logging
+from westmarch.benchmarks.bench_recall_ranking import QUERIES
+from westmarch.benchmarks.corpus import CorpusSpec, generate, write_ledger
+from westmarch.benchmarks.bench_whole_household import household
+from westmarch.core.memory import MemoryBank
+from westmarch.core.telemetry import LEDGER_ENV_VAR
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Every task WestmarchOrchestrator.run() dispatches, with a representative request
+WORKFLOW_TASKS: Dict[str, str] = {
+    "parlour_discussion": "Shall we have tea in the conservatory this afternoon?",
+    "daily_planning": "Plan my Tuesday: letters in the morning, the gnome inquiry after lunch.",
+    "research": "Compare ETFs and index funds for a modest estate.",
+    "drafting": "Write a polite note declining the Pemberton garden party.",
+    "archive": "What do we know about the garden gnome?",
+    "critique": "The moon hung languid o'er the hedgerow, pale as unbuttered toast.",
+    "whole_household": "The garden gnome moved again overnight.",
+    "recall_memory": "What did Lady Hawthorne say about my poem?",
+    "archive_mystery": "",
+}
+
+# Ledger entries behind the workflow cases, so archive and recall do real work
+WORKFLOW_LEDGER_SIZE = 1000
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """Time `fn` `iterations` times after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "throughput": iterations / total if total else float("inf"),
+        "p50_ms": samples[len(samples) // 2] * 1e3,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e3,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def seed_ledger(path: str, n: int, backend: Optional[str] = None) -> None:
+    write_ledger(path, generate(CorpusSpec(n)), backend=backend, overwrite=True)
+
+
+def workflow_cases(iterations: int, latency: str) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = os.path.join(tmp, "memory.json")
+        seed_ledger(ledger, WORKFLOW_LEDGER_SIZE)
+        orchestrator = household(latency, ledger)
+        for task, prompt in WORKFLOW_TASKS.items():
+            results[f"workflow.{task}"] = measure(lambda: orchestrator.run(task, prompt), iterations)
+            # Archived notes land in the background; keep them out of the next case
+            orchestrator.pennington.flush_notes()
+        orchestrator.pennington.archivist.close()
+    return results
+
+
+def memory_cases(sizes: List[int], iterations: int, backend: Optional[str]) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for n in sizes:
+        # Whole-ledger operations get fewer rounds on the big ledgers
+        rounds = max(3, min(iterations, iterations * 10_000 // n))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "memory.json")
+            seed_ledger(path, n, backend)
+
+            results[f"memory.load_all[{n}]"] = measure(
+                lambda: MemoryBank(path, backend=backend).load_all(), rounds, warmup=0
+            )
+            bank = MemoryBank(path, backend=backend)
+            queries = iter(QUERIES * (rounds + 1))
+            results[f"memory.search[{n}]"] = measure(lambda: bank.search(next(queries).split()[-1]), rounds)
+            results[f"memory.to_text[{n}]"] = measure(bank.to_text, rounds)
+            results[f"memory.save_entry[{n}]"] = measure(
+                lambda: bank.save_entry("Parlour discussion entry:\n\nbenchmark note", ["auto"]), rounds
+            )
+            bank.close()
+    return results
+
+
+def run_suite(
+    sizes: List[int],
+    iterations: int = 50,
+    latency: str = "0",
+    only: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> Dict:
+    westmarch_logging.LOGGING_ENABLED = False
+    os.environ.setdefault(LEDGER_ENV_VAR, "off")
+
+    results: Dict[str, Dict[str, float]] = {}
+    if only in (None, "workflow"):
+        results.update(workflow_cases(iterations, latency))
+    if only in (None, "memory"):
+        results.update(memory_cases(sizes, iterations, backend))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": latency,
+            "backend": backend or "default",
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 0.25,
+    min_delta_ms: float = 2.0,
+) -> List[str]:
+    """
+    Names of cases slower than the baseline: p50 up by more than
+    `tolerance` (and by at least `min_delta_ms`, so jitter on the
+    sub-millisecond cases does not fail the gate), or peak RSS up by more than
+    `tolerance`.
+    """
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        slower = now["p50_ms"] - before["p50_ms"]
+        if slower > min_delta_ms and now["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(name)
+        elif now.get("peak_rss_mb") and before.get("peak_rss_mb") and (
+            now["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance)
+        ):
+            regressions.append(name)
+    return regressions
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    width = max(len(name) for name in results)
+    lines = [f"{'case':<{width}} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'rss MB':>7} {'vs base':>8}"]
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name]["p50_ms"]:
+            delta = f"{(r['p50_ms'] / baseline[name]['p50_ms'] - 1) * 100:+.0f}%"
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        lines.append(
+            f"{name:<{width}} {r['throughput']:>10.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {rss:>7} {delta:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency", default="0", help="fake provider latency spec, e.g. lognormal:0.5,0.6")
+    parser.add_argument("--only", choices=["workflow", "memory"])
+    parser.add_argument("--backend", help="MemoryBank backend: json, journal or sqlite")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p50 changes smaller than this")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    suite = run_suite(
+        [int(s) for s in args.sizes.split(",")],
+        iterations=args.iterations,
+        latency=args.latency,
+        only=args.only,
+        backend=args.backend,
+    )
+    results = suite["results"]
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print(report(results, baseline))
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nResults written to {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, tolerance=args.tolerance, min_delta_ms=args.min_delta_ms)
+        if regressions:
+            print(f"\nREGRESSED beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# westmarch/benchmarks/bench_whole_household.py
+"""
+Wall-clock time of the Whole Household workflow, sequential vs dependency graph.
+
+Model calls are answered by the synthetic FakeProvider, which sleeps for a
+latency drawn from --latency (any fake_provider.parse_latency spec), so the
+numbers measure orchestration only.
+
+    python -m westmarch.benchmarks.bench_whole_household --latency 0.5
+    python -m westmarch.benchmarks.bench_whole_household --latency lognormal:0.5,0.6
+    python -m westmarch.benchmarks.bench_whole_household --trace whole_household.json
+
+--trace writes the graph run as Chrome trace events (open it in
+ui.perfetto.dev or chrome://tracing), or as OTLP JSON if the name ends
+in .otlp.json.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+from typing import Optional, Union
+
+import westmarch.core.logging as westmarch_logging
+from westmarch.agents.jeeves import JeevesAgent
+from westmarch.agents.lady_hawthorne import LadyHawthorneAgent
+from westmarch.agents.miss_pennington import MissPenningtonAgent
+from westmarch.agents.perkins import PerkinsAgent
+from westmarch.core import telemetry, tracing
+from westmarch.core.fake_provider import FakeProvider, Latency, as_latency
+from westmarch.core.models import ModelClient
+from westmarch.core.routing import PINNED
+from westmarch.orchestrator.workflows import WestmarchOrchestrator
+
+
+class LatencyModelClient(ModelClient):
+    """
+    ModelClient answered offline by a synthetic FakeProvider whose calls
+    take `latency` (seconds, a latency spec or a Latency). Its backup
+    route (see routing.py) is another fake, taking `backup_latency`.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        latency: Union[float, str, Latency] = 0.2,
+        backup_latency: Union[float, str, Latency, None] = None,
+        **kwargs,
+    ):
+        kwargs.setdefault("use_cache", False)
+        kwargs.setdefault("fake", FakeProvider(latency=as_latency(latency)))
+        super().__init__(agent_name, **kwargs)
+        self.latency = latency
+        self.backup_latency = latency if backup_latency is None else backup_latency
+
+    def _make_backup(self, provider, model_name):
+        return LatencyModelClient(
+            self.agent_name, self.backup_latency, routing=PINNED,
+            provider=provider, model_name=model_name,
+        )
+
+
+def household(latency: Union[float, str, Latency], ledger_path: str) -> WestmarchOrchestrator:
+    """An orchestrator wired to latency-injected clients and a scratch ledger."""
+    pennington = MissPenningtonAgent(LatencyModelClient("Miss Pennington", latency), memory_path=ledger_path)
+    return WestmarchOrchestrator(
+        jeeves=JeevesAgent(LatencyModelClient("Jeeves", latency)),
+        perkins=PerkinsAgent(LatencyModelClient("Perkins", latency)),
+        pennington=pennington,
+        hawthorne=LadyHawthorneAgent(LatencyModelClient("Lady Hawthorne", latency)),
+    )
+
+
+def run(latency: str, request: str, trace: Optional[str] = None) -> None:
+    westmarch_logging.LOGGING_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = household(latency, os.path.join(tmp, "memory.json"))
+
+        orchestrator.workflow_concurrency = 1
+        start = time.perf_counter()
+        orchestrator.whole_household(request)
+        sequential = time.perf_counter() - start
+
+        orchestrator.workflow_concurrency = None
+        with tracing.recording() if trace else contextlib.nullcontext() as tracer:
+            start = time.perf_counter()
+            orchestrator.whole_household(request)
+            graph = time.perf_counter() - start
+
+        print(orchestrator.last_workflow_run.trace())
+        print()
+        print(telemetry.default_telemetry().report(by="both"))
+        print(
+            f"\nlatency {latency}: sequential {sequential:.2f}s, "
+            f"graph {graph:.2f}s, saved {sequential - graph:.2f}s ({sequential / graph:.2f}x)"
+        )
+        orchestrator.pennington.archivist.close()
+        if trace:
+            print(f"Wrote {len(tracer.spans)} spans to {tracer.write(trace)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", default="0.2", help="seconds, or e.g. lognormal:0.5,0.6")
+    parser.add_argument("--request", default="The garden gnome moved again overnight.")
+    parser.add_argument("--trace", help="write a trace of the graph run to this file")
+    args = parser.parse_args()
+    run(args.latency, args.request, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# westmarch/benchmarks/corpus.py
+"""
+Generate synthetic memory ledgers for scale testing.
+
+Entries look like the notes the orchestrator archives: each workflow's
+header and sections, a lognormal body length, and the tags Miss
+Pennington attaches ("auto", domain:* inferred from the request, the
+workflow's type:* tag). Entries are streamed straight into the ledger
+file in any storage format (storage.write_ledger), so 10^7-entry
+ledgers never sit in memory.
+
+    python -m westmarch.benchmarks.corpus ledger.json --entries 100000
+    python -m westmarch.benchmarks.corpus ledger.jsonl --entries 10000000 --mix research=3,parlour=1
+    python -m westmarch.benchmarks.corpus ledger.sqlite3 --entries 1000000 --median-words 150
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from westmarch.core.storage import write_ledger
+from westmarch.core.tagging import DOMAIN_KEYWORDS, infer_domains
+
+# Each workflow's archived note, as workflows.py writes it: (template, type tag)
+WORKFLOWS: Dict[str, Tuple[str, str]] = {
+    "parlour": (
+        "Parlour discussion entry:\n\nUSER SAID:\n{request}\n\nJEEVES REPLIED:\n{body}",
+        "type:parlour",
+    ),
+    "planning": (
+        "Daily plan created based on user request:\n\nREQUEST:\n{request}\n\nPLAN:\n{body}",
+        "type:planning",
+    ),
+    "research": (
+        "Research performed for user request:\n\nREQUEST:\n{request}\n\nRESEARCH SUMMARY:\n{body}",
+        "type:research",
+    ),
+    "drafting": (
+        "Drafted text based on user request:\n\nREQUEST:\n{request}\n\nDRAFT:\n{body}",
+        "type:drafting",
+    ),
+    "critique": (
+        "Critique requested from Lady Hawthorne:\n\nTEXT:\n{request}\n\nCRITIQUE:\n{body}",
+        "type:critique",
+    ),
+    "whole_household": (
+        "[Whole Household Workflow Summary]\n\nUSER REQUEST:\n{request}\n\nFINAL SUMMARY:\n{body}",
+        "type:whole-household",
+    ),
+}
+
+DEFAULT_MIX = {
+    "parlour": 4, "research": 2, "drafting": 2, "critique": 1, "whole_household": 1, "planning": 1,
+}
+
+# How often each domain comes up in requests; the gnome dominates, as it does
+DEFAULT_DOMAINS = {
+    "gnome": 4, "poetry": 2, "finance": 2, "schedule": 2, "drafting": 2, "weather": 1,
+    "research": 1, "history": 1, "parlour": 1, "critique": 1, "sports": 1,
+}
+
+_COMMON = (
+    "the a of and to in that it with as for was on be by at this from "
+    "sir madam indeed quite rather most shall would one's household"
+).split()
+
+# Filler vocabulary with a Zipf-like frequency profile, as in real prose
+_FILLER = [f"word{i}" for i in range(20_000)]
+_VOCABULARY = _COMMON + _FILLER
+_CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(_VOCABULARY))))
+
+# Prose is cut from one pre-drawn run of words this long, which is far
+# cheaper than a weighted draw per word
+_POOL_WORDS = 1 << 18
+
+
+@dataclass
+class CorpusSpec:
+    """
+    Shape of a synthetic ledger. `mix` and `domains` are relative weights;
+    body lengths are lognormal around `median_words`, clipped to
+    [min_words, max_words]; timestamps advance from `start` by exponential
+    gaps averaging `mean_gap` seconds. A request names no domain with
+    probability `untagged`, and two with probability `two_domains`.
+    """
+
+    entries: int
+    seed: int = 7
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    domains: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_DOMAINS))
+    median_words: float = 80.0
+    sigma: float = 0.6
+    min_words: int = 5
+    max_words: int = 2000  # at most _POOL_WORDS
+    request_words: float = 14.0
+    untagged: float = 0.1
+    two_domains: float = 0.25
+    start: str = "2025-01-01T08:00:00"
+    mean_gap: float = 900.0
+
+
+def parse_weights(spec: str, known: Iterable[str]) -> Dict[str, float]:
+    """"research=3,parlour=1" → {"research": 3.0, "parlour": 1.0}."""
+    known = set(known)
+    weights = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise ValueError(f"Unknown name '{name}' (expected one of {', '.join(sorted(known))})")
+        weights[name] = float(weight or 1)
+    if not weights:
+        raise ValueError(f"Empty weight spec '{spec}'")
+    return weights
+
+
+def _weighted_picker(weights: Dict[str, float]) -> Callable[[random.Random], str]:
+    names = list(weights)
+    cum = list(itertools.accumulate(weights[n] for n in names))
+    return lambda rng: rng.choices(names, cum_weights=cum)[0]
+
+
+def _lognormal_words(rng: random.Random, median: float, sigma: float, low: int, high: int) -> int:
+    return max(low, min(high, round(rng.lognormvariate(math.log(median), sigma))))
+
+
+def _prose(rng: random.Random, pool: List[str], length: int, keywords: List[str]) -> str:
+    start = rng.randrange(len(pool) - length + 1)
+    words = pool[start:start + length]
+    # Roughly one topical word in twenty-five, at least one
+    for slot in rng.sample(range(length), k=min(length, max(1, length // 25))):
+        words[slot] = rng.choice(keywords)
+    return " ".join(words)
+
+
+def generate(spec: CorpusSpec) -> Iterator[Dict]:
+    """Yield `spec.entries` ledger entries, deterministically for a given seed."""
+    rng = random.Random(spec.seed)
+    pool = rng.choices(_VOCABULARY, cum_weights=_CUM_WEIGHTS, k=_POOL_WORDS)
+    pick_workflow = _weighted_picker(spec.mix)
+    pick_domain = _weighted_picker(spec.domains)
+    neutral = list(_COMMON)
+    moment = datetime.fromisoformat(spec.start)
+
+    for _ in range(spec.entries):
+        workflow = pick_workflow(rng)
+        template, type_tag = WORKFLOWS[workflow]
+
+        roll = rng.random()
+        if roll < spec.untagged:
+            topics: List[str] = []
+        elif roll < spec.untagged + spec.two_domains:
+            topics = [pick_domain(rng), pick_domain(rng)]
+        else:
+            topics = [pick_domain(rng)]
+        keywords = [kw for d in topics for kw in DOMAIN_KEYWORDS[d]] or neutral
+
+        request = _prose(rng, pool, _lognormal_words(rng, spec.request_words, 0.4, 3, 80), keywords)
+        body_words = _lognormal_words(
+            rng, spec.median_words, spec.sigma, spec.min_words, min(spec.max_words, _POOL_WORDS)
+        )
+        body = _prose(rng, pool, body_words, keywords)
+
+        # Miss Pennington's tags: domains from the raw request, then the workflow tag
+        tags = ["auto"] + [f"domain:{d}" for d in sorted(infer_domains(request))] + [type_tag]
+
+        moment += timedelta(seconds=rng.expovariate(1.0 / spec.mean_gap))
+        yield {
+            "timestamp": moment.isoformat(timespec="microseconds"),
+            "content": template.format(request=request, body=body),
+            "tags": tags,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="ledger to create; the extension picks the format unless --backend is given")
+    parser.add_argument("--entries", type=lambda s: int(float(s)), default=10_000, help="e.g. 1e6")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite"])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mix", help="workflow weights, e.g. parlour=4,research=2,critique=1")
+    parser.add_argument("--domains", help="domain weights, e.g. gnome=3,finance=1")
+    parser.add_argument("--median-words", type=float, default=80.0)
+    parser.add_argument("--sigma", type=float, default=0.6, help="spread of the body-length lognormal")
+    parser.add_argument("--force", action="store_true", help="replace an existing ledger")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(args.entries, seed=args.seed, median_words=args.median_words, sigma=args.sigma)
+    if args.mix:
+        spec.mix = parse_weights(args.mix, WORKFLOWS)
+    if args.domains:
+        spec.domains = parse_weights(args.domains, DOMAIN_KEYWORDS)
+
+    start = time.perf_counter()
+    target, count = write_ledger(args.path, generate(spec), backend=args.backend, overwrite=args.force)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(target) / (1024 * 1024)
+    print(f"Wrote {count} entries to {target} ({size:.1f} MB) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
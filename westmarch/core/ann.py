@@ -0,0 +1,200 @@
+# westmarch/core/ann.py
+from __future__ import annotations
+
+import math
+import os
+import zlib
+from array import array
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over unit vectors.
+
+    Spherical k-means picks `nlist` centroids; every vector is filed under
+    its nearest one. A query ranks the centroids, then scores only the
+    vectors filed under the best `nprobe` of them. `nprobe` is the
+    recall/latency knob: nprobe == nlist is exact search.
+
+    Each list keeps its own contiguous copy of its vectors, so probing a
+    list is one small matrix-vector product with no gather. That doubles
+    the memory spent on vectors in exchange for the query speed.
+    """
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 32):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        dim = self.centroids.shape[1]
+        self._lists: List[array] = [array("i") for _ in range(len(self.centroids))]
+        self._blocks: List[np.ndarray] = [np.empty((0, dim), dtype=np.float32) for _ in self._lists]
+        self.size = 0
+        self.trained_size = 0
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @staticmethod
+    def default_nlist(n: int) -> int:
+        return max(1, int(round(math.sqrt(n))))
+
+    @classmethod
+    def train(
+        cls,
+        matrix: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 32,
+        iterations: int = 10,
+        sample_per_list: int = 32,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Cluster `matrix` (unit rows) and file every row."""
+        n = len(matrix)
+        nlist = min(nlist or cls.default_nlist(n), n)
+        rng = np.random.default_rng(seed)
+
+        sample = matrix
+        if n > nlist * sample_per_list:
+            sample = matrix[rng.choice(n, nlist * sample_per_list, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            if empty.any():
+                # Re-seed empty clusters from random sample points
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            centroids = sums / np.maximum(norms, 1e-12)[:, None]
+
+        index = cls(centroids, nprobe=nprobe)
+        index.extend(matrix)
+        index.trained_size = n
+        return index
+
+    def assign(self, rows: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        """Nearest centroid for each row."""
+        out = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), chunk):
+            out[start:start + chunk] = np.argmax(rows[start:start + chunk] @ self.centroids.T, axis=1)
+        return out
+
+    def extend(self, rows: np.ndarray, assignments: Optional[np.ndarray] = None) -> None:
+        """File rows that sit at positions size, size + 1, ... of the matrix."""
+        if assignments is None:
+            assignments = self.assign(rows)
+        order = np.argsort(assignments, kind="stable")
+        positions = (order + self.size).astype(np.int32)
+        bounds = np.searchsorted(assignments[order], np.arange(self.nlist + 1))
+        for c in range(self.nlist):
+            lo, hi = bounds[c], bounds[c + 1]
+            if hi > lo:
+                self._lists[c].frombytes(positions[lo:hi].tobytes())
+                self._append_block(c, rows[order[lo:hi]])
+        self.size += len(rows)
+
+    def _append_block(self, c: int, rows: np.ndarray) -> None:
+        block = self._blocks[c]
+        used = len(self._lists[c]) - len(rows)
+        if len(block) < used + len(rows):
+            grown = np.empty((max(used + len(rows), 2 * len(block), 8), block.shape[1]), dtype=np.float32)
+            grown[:used] = block[:used]
+            block = self._blocks[c] = grown
+        block[used:used + len(rows)] = rows
+
+    def add(self, position: int, row: np.ndarray) -> None:
+        if position != self.size:
+            raise ValueError(f"IVFIndex expected position {self.size}, got {position}")
+        self.extend(row[None, :])
+
+    def search(
+        self,
+        q: np.ndarray,
+        k: int = 10,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (positions, scores) of up to k best rows, best first."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        near = self.centroids @ q
+        probes = np.argpartition(-near, nprobe - 1)[:nprobe] if nprobe < self.nlist else range(self.nlist)
+
+        ids, parts = [], []
+        for c in probes:
+            members = self._lists[c]
+            if members:
+                ids.append(np.frombuffer(members, dtype=np.int32))
+                parts.append(self._blocks[c][:len(members)] @ q)
+        if not ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        candidates = np.concatenate(ids)
+        scores = np.concatenate(parts)
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], scores[top]
+
+    # ---------- persistence ----------
+
+    @staticmethod
+    def path(ledger_path: str) -> str:
+        return os.path.splitext(ledger_path)[0] + ".ivf.npz"
+
+    def assignments(self) -> np.ndarray:
+        out = np.empty(self.size, dtype=np.int32)
+        for c, members in enumerate(self._lists):
+            out[np.frombuffer(members, dtype=np.int32)] = c
+        return out
+
+    def save(self, ledger_path: str, matrix: np.ndarray) -> None:
+        """Write centroids and list assignments for the rows filed so far."""
+        path = self.path(ledger_path)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            centroids=self.centroids,
+            assignments=self.assignments(),
+            trained_size=self.trained_size,
+            check=_row_check(matrix, self.size),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, ledger_path: str, matrix: np.ndarray, nprobe: int = 32) -> Optional["IVFIndex"]:
+        """
+        Load a saved index for `matrix`, filing any rows added since.
+        Returns None if the file is missing or belongs to other vectors.
+        """
+        try:
+            with np.load(cls.path(ledger_path)) as data:
+                centroids = data["centroids"]
+                assignments = data["assignments"]
+                trained_size = int(data["trained_size"])
+                check = int(data["check"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+        saved = len(assignments)
+        if (
+            saved > len(matrix)
+            or centroids.shape[1] != matrix.shape[1]
+            or check != _row_check(matrix, saved)
+        ):
+            return None
+
+        index = cls(centroids.astype(np.float32), nprobe=nprobe)
+        index.extend(matrix[:saved], assignments)
+        index.extend(matrix[saved:])
+        index.trained_size = trained_size
+        return index
+
+
+def _row_check(matrix: np.ndarray, rows: int) -> int:
+    """Checksum of the last of the first `rows` vectors."""
+    return zlib.crc32(matrix[rows - 1].tobytes()) if rows else 0
@@ -0,0 +1,151 @@
+# westmarch/core/archival.py
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from westmarch.core import tracing
+from westmarch.core.logging import DEBUG, WARNING, log
+
+
+# (content, raw_user_input, extra_tags) as handed to save_note
+ArchivalJob = Tuple[str, Optional[str], Optional[List[str]]]
+
+# Turns a job's raw_user_input and extra_tags into its final tag list
+Tagger = Callable[[Optional[str], Optional[List[str]]], List[str]]
+
+
+class ArchivalQueue:
+    """
+    Write-behind archival for Miss Pennington.
+
+    Workflows hand notes over with `submit()` and return to the patron at
+    once; a background thread does the tagging and the ledger write. Notes
+    that pile up while a write is in progress are committed together in a
+    single `MemoryBank.save_entries()` call.
+
+    - the queue is bounded: when `max_pending` notes are waiting, `submit`
+      blocks until the worker catches up rather than growing without limit
+    - `flush()` waits until every submitted note has been committed (or
+      has failed; see below)
+    - notes whose commit fails are kept in `failed` and go out first with
+      the next commit
+    - `close()` flushes, stops the worker and makes a last attempt at any
+      failed notes, raising if they still cannot be written; it is
+      registered with atexit so notes queued at shutdown are not lost
+    """
+
+    def __init__(
+        self,
+        memory,
+        tagger: Tagger,
+        max_pending: int = 256,
+        max_batch: int = 64,
+    ):
+        self.memory = memory
+        self.tagger = tagger
+        self.max_batch = max_batch
+        self.failed: List[ArchivalJob] = []
+        self.last_error: Optional[Exception] = None
+
+        self._queue: "queue.Queue[Optional[ArchivalJob]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        # Orders submits against close(), so no note lands behind the stop sentinel
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        """Notes submitted but not yet committed."""
+        return self._queue.unfinished_tasks
+
+    def submit(
+        self,
+        content: str,
+        raw_user_input: Optional[str] = None,
+        extra_tags: Optional[List[str]] = None,
+    ) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ArchivalQueue is closed")
+            self._ensure_worker()
+            self._queue.put((content, raw_user_input, list(extra_tags or [])))
+        log("MEMORY: Note queued for archiving (%d pending)", self.pending, level=DEBUG)
+
+    def flush(self) -> None:
+        """Block until every note submitted so far has been committed or has failed."""
+        if self._thread is None or threading.current_thread() is self._thread:
+            return
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush outstanding notes, stop the worker and retry failed notes."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+        atexit.unregister(self.close)
+
+        if self.failed:
+            self._commit([])
+        if self.failed:
+            raise RuntimeError(
+                f"ArchivalQueue closed with {len(self.failed)} note(s) that could not be archived"
+            ) from self.last_error
+
+    # ---------- worker ----------
+
+    def _ensure_worker(self) -> None:
+        # Caller holds self._lock
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="westmarch-archivist",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            batch = [job]
+            # Sweep up whatever else is already waiting
+            while job is not None and len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(job)
+
+            stop = batch[-1] is None
+            jobs = [j for j in batch if j is not None]
+            try:
+                if jobs:
+                    self._commit(jobs)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    @tracing.traced("memory.archive")
+    def _commit(self, jobs: List[ArchivalJob]) -> None:
+        # Notes from a failed commit go out first, in their original order
+        jobs, self.failed = self.failed + jobs, []
+        tracing.current().set(notes=len(jobs))
+        try:
+            notes = [(content, self.tagger(user_input, tags)) for content, user_input, tags in jobs]
+            self.memory.save_entries(notes)
+            if len(jobs) > 1:
+                log("MEMORY: Archived %d queued notes in one commit", len(jobs))
+        except Exception as e:
+            self.failed = jobs
+            self.last_error = e
+            log("MEMORY: Background archiving failed for %d note(s) → %s", len(jobs), e, level=WARNING)
@@ -0,0 +1,267 @@
+# westmarch/core/fake_provider.py
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Union
+
+from westmarch.core import telemetry
+from westmarch.core.resilience import ProviderError
+from westmarch.core.response_cache import ResponseCache
+
+MODE_ENV_VAR = "WESTMARCH_PROVIDER_MODE"
+CASSETTE_ENV_VAR = "WESTMARCH_CASSETTE"
+LATENCY_ENV_VAR = "WESTMARCH_FAKE_LATENCY"
+DEFAULT_CASSETTE_PATH = "westmarch/data/cassette.jsonl"
+MODES = ("live", "record", "replay", "synthetic")
+
+
+# ------- Latency distributions -------
+
+class Latency(ABC):
+    """Seconds a fake call takes. Draws are seeded by the request key, so reruns repeat."""
+
+    @abstractmethod
+    def sample(self, agent: str, key: str) -> float:
+        """Seconds for `agent`'s request `key`."""
+        raise NotImplementedError
+
+
+class FixedLatency(Latency):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def sample(self, agent: str, key: str) -> float:
+        return self.seconds
+
+
+class LognormalLatency(Latency):
+    """Lognormal around `median` seconds; `sigma` sets the tail (0.5 is a mild one)."""
+
+    def __init__(self, median: float, sigma: float = 0.5, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self.seed = seed
+
+    def sample(self, agent: str, key: str) -> float:
+        rng = random.Random(int(key[:16], 16) ^ self.seed)
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class AgentLatency(Latency):
+    """A latency distribution per agent, with a default for the rest."""
+
+    def __init__(self, profile: Dict[str, Latency], default: Optional[Latency] = None):
+        self.profile = {_norm(agent): latency for agent, latency in profile.items()}
+        self.default = default or FixedLatency(0.0)
+
+    def sample(self, agent: str, key: str) -> float:
+        return self.profile.get(_norm(agent), self.default).sample(agent, key)
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    "0.5" or "fixed:0.5", "lognormal:<median>,<sigma>", or
+    "agents:<agent>=<spec>;...;*=<spec>" for a per-agent profile.
+    """
+    spec = spec.strip()
+    kind, _, args = spec.partition(":")
+    if not args:
+        return FixedLatency(float(kind or 0))
+    kind = kind.lower()
+    if kind == "fixed":
+        return FixedLatency(float(args))
+    if kind == "lognormal":
+        median, _, sigma = args.partition(",")
+        return LognormalLatency(float(median), float(sigma or 0.5))
+    if kind == "agents":
+        profile: Dict[str, Latency] = {}
+        default = None
+        for part in filter(None, (p.strip() for p in args.split(";"))):
+            agent, _, sub = part.partition("=")
+            if agent.strip() == "*":
+                default = parse_latency(sub)
+            else:
+                profile[agent.strip()] = parse_latency(sub)
+        return AgentLatency(profile, default)
+    raise ValueError(f"Unknown latency spec '{spec}'")
+
+
+def as_latency(value: Union[float, str, Latency]) -> Latency:
+    """A Latency from seconds, a parse_latency() spec, or a Latency."""
+    if isinstance(value, Latency):
+        return value
+    if isinstance(value, str):
+        return parse_latency(value)
+    return FixedLatency(float(value))
+
+
+def _norm(agent: str) -> str:
+    return agent.strip().lower().replace("_", " ")
+
+
+# ------- Cassettes -------
+
+class Cassette:
+    """
+    Recorded replies keyed by request hash (ResponseCache.key), stored as
+    JSONL: one {"key", "agent", "model", "response"} object per line,
+    later lines winning.
+    """
+
+    def __init__(self, path: str = DEFAULT_CASSETTE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        return None if entry is None else entry["response"]
+
+    def record(self, key: str, agent: str, model: str, response: str) -> None:
+        entry = {"key": key, "agent": agent, "model": model, "response": response}
+        with self._lock:
+            if self._entries.get(key) == entry:
+                return
+            self._entries[key] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# ------- The provider -------
+
+class FakeProvider:
+    """
+    Offline stand-in for the Gemini and OpenAI APIs.
+
+    Answers ModelClient calls from a cassette of recorded responses
+    ("replay") or with deterministic synthetic text ("synthetic"), after
+    sleeping for a latency drawn from `latency`. Agents keep their
+    provider and model names, so routing and telemetry behave as they
+    would live. In replay mode a request missing from the cassette is
+    synthesized, or raises a permanent ProviderError if `strict`.
+    """
+
+    def __init__(
+        self,
+        mode: str = "synthetic",
+        cassette: Optional[Cassette] = None,
+        latency: Optional[Latency] = None,
+        strict: bool = False,
+    ):
+        if mode not in {"replay", "synthetic"}:
+            raise ValueError(f"FakeProvider mode must be 'replay' or 'synthetic', not '{mode}'")
+        self.mode = mode
+        self.cassette = cassette
+        self.latency = latency or FixedLatency(0.0)
+        self.strict = strict
+
+    def reply(self, client: Any, system_prompt: str, user_content: str) -> str:
+        key = request_key(client, system_prompt, user_content)
+        text = None
+        if self.mode == "replay" and self.cassette is not None:
+            text = self.cassette.get(key)
+            if text is None and self.strict:
+                raise ProviderError(client.provider, client.agent_name, f"no recording for request {key[:12]}")
+        if text is None:
+            text = synthesize(client.agent_name, user_content)
+        # Word counts stand in for the token usage a real provider reports
+        telemetry.note_usage(len(f"{system_prompt} {user_content}".split()), len(text.split()))
+        return text
+
+    def delay(self, client: Any, system_prompt: str, user_content: str) -> float:
+        return self.latency.sample(client.agent_name, request_key(client, system_prompt, user_content))
+
+    def generate(self, client: Any, system_prompt: str, user_content: str) -> str:
+        time.sleep(self.delay(client, system_prompt, user_content))
+        return self.reply(client, system_prompt, user_content)
+
+    async def agenerate(self, client: Any, system_prompt: str, user_content: str) -> str:
+        await asyncio.sleep(self.delay(client, system_prompt, user_content))
+        return self.reply(client, system_prompt, user_content)
+
+    def stream_generate(self, client: Any, system_prompt: str, user_content: str) -> Iterator[str]:
+        """The same reply a word at a time, spread over the same latency."""
+        delay = self.delay(client, system_prompt, user_content)
+        words = self.reply(client, system_prompt, user_content).split(" ")
+        for i, word in enumerate(words):
+            time.sleep(delay / len(words))
+            yield word if i == 0 else " " + word
+
+
+def request_key(client: Any, system_prompt: str, user_content: str) -> str:
+    return ResponseCache.key(
+        client.provider, client.model_name, system_prompt, user_content, client.generation_params
+    )
+
+
+def synthesize(agent_name: str, user_content: str) -> str:
+    """Deterministic stand-in reply: the agent's name and the tail of the request."""
+    return f"[{agent_name}] {user_content[-60:]}"
+
+
+# ------- Environment configuration -------
+
+def provider_mode() -> str:
+    mode = os.getenv(MODE_ENV_VAR, "live").strip().lower() or "live"
+    if mode not in MODES:
+        raise ValueError(f"{MODE_ENV_VAR} must be one of {', '.join(MODES)}, not '{mode}'")
+    return mode
+
+
+_default_cassette: Optional[Cassette] = None
+_default_fake: Optional[FakeProvider] = None
+_default_lock = threading.Lock()
+
+
+def default_cassette() -> Cassette:
+    global _default_cassette
+    with _default_lock:
+        if _default_cassette is None:
+            _default_cassette = Cassette(os.getenv(CASSETTE_ENV_VAR, DEFAULT_CASSETTE_PATH))
+        return _default_cassette
+
+
+def default_fake() -> Optional[FakeProvider]:
+    """
+    The FakeProvider selected by the environment, or None when calls go live:
+
+        WESTMARCH_PROVIDER_MODE=live|record|replay|synthetic   (default live)
+        WESTMARCH_CASSETTE=westmarch/data/cassette.jsonl
+        WESTMARCH_FAKE_LATENCY=fixed:0.5
+                              =lognormal:0.8,0.6
+                              =agents:lady hawthorne=lognormal:2,0.4;*=fixed:0.3
+
+    "record" makes live calls and appends each successful reply to the
+    cassette for later replay.
+    """
+    global _default_fake
+    mode = provider_mode()
+    if mode not in {"replay", "synthetic"}:
+        return None
+    cassette = default_cassette() if mode == "replay" else None
+    with _default_lock:
+        if _default_fake is None or _default_fake.mode != mode:
+            latency = parse_latency(os.getenv(LATENCY_ENV_VAR, "0"))
+            _default_fake = FakeProvider(mode, cassette=cassette, latency=latency)
+        return _default_fake
@@ -1,14 +1,273 @@
 # westmarch/core/logging.py
 from __future__ import annotations
+
+import atexit
+import contextvars
 import datetime
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, Optional
+
+from westmarch.core.telemetry import current_workflow
 
 LOGGING_ENABLED = True   # flip to False to silence logs
 
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+# Lowest level written: debug, info (default), warning or error
+LEVEL_ENV_VAR = "WESTMARCH_LOG_LEVEL"
+
+# "text" (default): [12:00:00] message | key=value ...; "json": one object per line
+FORMAT_ENV_VAR = "WESTMARCH_LOG_FORMAT"
+
+_LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+
+_level = _LEVELS.get(os.getenv(LEVEL_ENV_VAR, "info").strip().lower(), INFO)
+
+_fields: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("westmarch_log_fields", default={})
+
+# Occurrence counters of sampled messages, by message template
+_samples: Dict[str, Iterator[int]] = {}
 
-def log(message: str):
-    """Simple timestamped logger."""
-    if not LOGGING_ENABLED:
+_logger = logging.getLogger("westmarch")
+_logger.setLevel(DEBUG)
+_logger.propagate = False
+
+
+def log(message: str, *args: Any, level: int = INFO, every: int = 1, **fields: Any) -> None:
+    """
+    Write `message % args` at `level`, with structured `fields` plus those
+    of the enclosing log_context() and the current workflow.
+
+    Below the threshold level (or with LOGGING_ENABLED off) this returns
+    before formatting anything, so hot paths should pass their values as
+    args rather than pre-formatting an f-string. With every=N only one in
+    N calls with this message template is written.
+    """
+    if not LOGGING_ENABLED or level < _level:
         return
+    if every > 1:
+        counter = _samples.get(message)
+        if counter is None:
+            counter = _samples.setdefault(message, itertools.count())
+        if next(counter) % every:
+            return
+        fields["sampled"] = f"1/{every}"
+
+    context = _fields.get()
+    workflow = current_workflow()
+    if context or workflow:
+        fields = {**({"workflow": workflow} if workflow else {}), **context, **fields}
+
+    record = logging.LogRecord(_logger.name, level, "", 0, message, args or None, None)
+    record.fields = fields
+    _logger.handle(record)
+
+
+def enabled(level: int = INFO) -> bool:
+    """True if a log() at `level` would be written; guards costly log-only work."""
+    return LOGGING_ENABLED and level >= _level
+
+
+def set_level(level: int | str) -> None:
+    global _level
+    _level = _LEVELS[level.lower()] if isinstance(level, str) else level
+
+
+# ------- Structured context -------
+
+@contextmanager
+def log_context(**fields: Any):
+    """Attach `fields` (agent=, request_id=, ...) to every log line in the block."""
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+def bind_context(iterator: Iterator, **extra: Any) -> Iterator:
+    """
+    Keep the current log fields (plus `extra`) on lines logged while
+    `iterator` is consumed, which for a stream is after its caller returned.
+    """
+    return _with_fields({**_fields.get(), **extra}, iterator)
+
+
+def _with_fields(fields: Dict[str, Any], iterator: Iterator) -> Iterator:
+    try:
+        while True:
+            token = _fields.set(fields)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _fields.reset(token)
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+# ------- Output -------
+
+class TextFormatter(logging.Formatter):
+    """[12:00:00] message | key=value ..., with the level named unless INFO."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+        level = "" if record.levelno == INFO else f"{record.levelname} "
+        line = f"[{ts}] {level}{record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, msg, then the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time, as print() did."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. Only the message text is resolved
+    here (args may be mutated later); timestamps, fields and the line
+    layout are formatted on the writer thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class _FlushMarker:
+    def __init__(self):
+        self.written = threading.Event()
+
+
+class _Writer(QueueListener):
+    """The background thread: writes queued records, and signals flush markers."""
+
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushMarker):
+            record.written.set()
+        else:
+            super().handle(record)
+
+
+_lock = threading.Lock()
+_listener: Optional[_Writer] = None
+_queue: Optional[queue.SimpleQueue] = None
+_target: Optional[logging.Handler] = None
+
+
+def configure(
+    level: Optional[int | str] = None,
+    fmt: Optional[str] = None,
+    handler: Optional[logging.Handler] = None,
+    background: bool = True,
+) -> None:
+    """
+    (Re)build the output pipeline: `handler` (default stdout) with the
+    text or json formatter, written by a background thread through a
+    QueueHandler unless background=False.
+    """
+    global _listener, _queue, _target
+    if level is not None:
+        set_level(level)
+    fmt = (fmt or os.getenv(FORMAT_ENV_VAR, "text")).strip().lower()
+    target = handler or _StdoutHandler()
+    target.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    with _lock:
+        _stop_listener()
+        _target = target
+        for old in list(_logger.handlers):
+            _logger.removeHandler(old)
+        if background:
+            _queue = queue.SimpleQueue()
+            _listener = _Writer(_queue, target, respect_handler_level=True)
+            _listener.start()
+            _logger.addHandler(_DeferredQueueHandler(_queue))
+        else:
+            _logger.addHandler(target)
+
+
+def flush(timeout: Optional[float] = 5.0) -> None:
+    """Wait (up to `timeout` seconds) until every queued line is written."""
+    q = _queue
+    if q is not None and _listener is not None:
+        marker = _FlushMarker()
+        q.put(marker)
+        marker.written.wait(timeout)
+
+
+def _stop_listener() -> None:
+    global _listener, _queue
+    if _listener is not None:
+        _listener.stop()
+    _listener = _queue = None
+
+
+def _shutdown() -> None:
+    with _lock:
+        _stop_listener()
+
+
+def _after_fork_in_child() -> None:
+    # The writer thread does not survive fork(); children write directly
+    global _listener, _queue, _lock
+    _lock = threading.Lock()
+    _listener = _queue = None
+    for old in list(_logger.handlers):
+        _logger.removeHandler(old)
+    if _target is not None:
+        _logger.addHandler(_target)
+
 
-    ts = datetime.datetime.now().strftime("%H:%M:%S")
-    print(f"[{ts}] {message}")
\ No newline at end of file
+configure()
+atexit.register(_shutdown)
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,49 +1,220 @@
 # westmarch/core/memory.py
 from __future__ import annotations
 
-import json
-import os
+import threading
+from collections.abc import Sequence
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from westmarch.core.logging import log
+from westmarch.core import tracing
+from westmarch.core.logging import DEBUG, ERROR, enabled, log
+from westmarch.core.ranking import BM25Index
+from westmarch.core.storage import LedgerCorruptError, open_store
+from westmarch.core.tag_index import TagIndex
+from westmarch.core.vectors import VectorIndex
+
+
+# Cosine below which a semantic match is treated as unrelated to the query
+SEMANTIC_MIN_SCORE = 0.2
+
+
+class LedgerView(Sequence):
+    """
+    Read-only window onto MemoryBank's resident entry list.
+
+    The bank only ever appends to that list (a rewrite swaps in a new one),
+    so a view fixes its length when handed out and stays stable while
+    later notes are saved. The list itself cannot be changed through the
+    view, and entries come back as shallow dict copies, so callers can
+    serialise or edit them without touching the resident ledger.
+    """
+
+    __slots__ = ("_entries", "_length")
+
+    def __init__(self, entries: List[Dict], length: int):
+        self._entries = entries
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [dict(e) for e in self._entries[:self._length][index]]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ledger index out of range")
+        return dict(self._entries[index])
+
+    def __repr__(self) -> str:
+        return f"LedgerView({self._length} entries)"
 
 
 class MemoryBank:
     """
-    A simple persistent JSON-based memory store for Miss Pennington.
+    A simple persistent memory store for Miss Pennington.
     Stores entries with timestamp, content, and optional tags.
+
+    The storage engine is pluggable (see storage.py):
+    - "json"    → the original memory.json array (default)
+    - "journal" → append-only memory.jsonl, constant-cost saves
+    - "sqlite"  → memory.sqlite3 with FTS5 and tag indexes, so search,
+                  tag filtering and recall scoring are indexed queries
+    Choose via the `backend` argument or WESTMARCH_MEMORY_BACKEND.
     """
 
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, backend: Optional[str] = None, **store_options):
         self.filepath = filepath
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-        # Ensure file exists
-        if not os.path.exists(filepath):
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump([], f)
+        self.store = open_store(filepath, backend, **store_options)
+
+        # Resident parsed ledger. `_generation` moves on every write made
+        # through this bank; `_signature` is the store's change marker
+        # (file mtime/size, or SQLite data_version) when the cache was
+        # filled, which catches writes made by other processes.
+        self._entries: Optional[List[Dict]] = None
+        self._signature = None
+        self._generation = 0
+        self._tag_index: Optional[TagIndex] = None
+        self._ranker: Optional[BM25Index] = None
+        self._vectors: Optional[VectorIndex] = None
+        # Guards the resident ledger and its indexes, which a background
+        # archival thread may extend while the UI thread reads them
+        self._lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # -----------------------------------------
+    #   Parsed-ledger cache
+    # -----------------------------------------
+
+    def _cache_is_fresh(self) -> bool:
+        return self._entries is not None and self.store.signature() == self._signature
+
+    def _cached_entries(self) -> List[Dict]:
+        """Return the resident entry list, reparsing only if it is stale."""
+        with self._lock:
+            if self._cache_is_fresh():
+                self.cache_hits += 1
+                return self._entries
+
+            self.cache_misses += 1
+            signature = self.store.signature()
+            try:
+                entries = self._load()
+            except LedgerCorruptError:
+                # Serve an empty ledger to readers, but cache nothing: writes
+                # then go through the store, which refuses to overwrite it.
+                self._invalidate()
+                return []
+            self._entries = entries
+            self._signature = signature
+            self._generation += 1
+            self._tag_index = None
+            self._ranker = None
+            self._vectors = None
+            return self._entries
+
+    def _invalidate(self) -> None:
+        self._entries = None
+        self._generation += 1
+        self._tag_index = None
+        self._ranker = None
+        self._vectors = None
+
+    def _current_tag_index(self) -> TagIndex:
+        with self._lock:
+            entries = self._cached_entries()
+            if self._tag_index is None:
+                self._tag_index = TagIndex.build(entries)
+            return self._tag_index
+
+    def _current_ranker(self) -> BM25Index:
+        with self._lock:
+            entries = self._cached_entries()
+            if self._ranker is None:
+                self._ranker = BM25Index.build(entries)
+            return self._ranker
+
+    def _current_vectors(self) -> VectorIndex:
+        with self._lock:
+            entries = self._cached_entries()
+            if self._vectors is None:
+                # Reuse the vectors persisted beside the ledger; only notes
+                # saved since they were written need embedding.
+                vectors = VectorIndex.load(self.filepath, entries)
+                if vectors is None:
+                    log("MEMORY: Building semantic vector index")
+                    with tracing.span("memory.build_vectors", entries=len(entries)):
+                        vectors = VectorIndex.build(entries)
+                vectors.refresh_ann()
+                vectors.persist(self.filepath, entries)
+                self._vectors = vectors
+            return self._vectors
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters for the parsed-ledger cache."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "generation": self._generation,
+            "entries": len(self._entries) if self._entries is not None else 0,
+        }
 
+    @tracing.traced("memory.load")
     def _load(self) -> List[Dict]:
-        log("MEMORY: Loading all notes")  # <<< ADDED
+        log("MEMORY: Loading all notes", level=DEBUG)  # <<< ADDED
 
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                log(f"MEMORY: Loaded {len(data)} notes")  # <<< ADDED
-                return data
-        except json.JSONDecodeError:
-            log("MEMORY: JSON decode error — returning empty list")  # <<< ADDED
-            return []
-
+            data = self.store.load()
+            tracing.current().set(entries=len(data))
+            log("MEMORY: Loaded %d notes", len(data))  # <<< ADDED
+            return data
+        except LedgerCorruptError as e:
+            log("MEMORY: JSON decode error — %s", e, level=ERROR)  # <<< ADDED
+            log("MEMORY: Ledger left untouched; writes are refused until recover() is run", level=ERROR)
+            raise
+
+    @tracing.traced("memory.rewrite")
     def _save(self, data: List[Dict]):
-        log(f"MEMORY: Saving file with {len(data)} entries")  # <<< ADDED
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        log("MEMORY: Save complete")  # <<< ADDED
+        log("MEMORY: Saving file with %d entries", len(data), level=DEBUG)  # <<< ADDED
+        with self.store.locked():
+            self.store.rewrite(data)
+            self._invalidate()
+        log("MEMORY: Save complete", level=DEBUG)  # <<< ADDED
+
+    def recover(self) -> int:
+        """
+        Repair a damaged ledger (see JsonArrayStore.recover). Returns the
+        number of entries kept, or -1 if the ledger was already sound.
+        """
+        recovered = self.store.recover() if hasattr(self.store, "recover") else -1
+        self._invalidate()
+        return recovered
 
     def save_entry(self, content: str, tags: Optional[List[str]] = None):
-        log(f"MEMORY: Saving note ({len(content.split())} words)")
+        self.save_entries([(content, tags)])
+
+    @tracing.traced("memory.save")
+    def save_entries(self, notes: Iterable[Tuple[str, Optional[List[str]]]]) -> None:
+        """
+        Save several (content, tags) notes with a single store write — one
+        rewrite or one append, under one acquisition of the ledger lock.
+        """
+        entries = [self._make_entry(content, tags) for content, tags in notes]
+        if not entries:
+            return
+        tracing.current().set(notes=len(entries))
+
+        with self._lock:
+            self._commit(entries)
+
+        for _ in entries:
+            log("MEMORY: Note saved successfully")
+
+    def _make_entry(self, content: str, tags: Optional[List[str]] = None) -> Dict:
+        if enabled(DEBUG):
+            log("MEMORY: Saving note (%d words)", len(content.split()), level=DEBUG)
 
         # ---------- AUTO-TAGGING ----------
         auto_tags = ["auto"]
@@ -95,8 +266,6 @@ class MemoryBank:
         final_tags = auto_tags + domain_tags + (tags or [])
         # ------------------------------------
 
-        data = self._load()
-
         # Normalise and deduplicate tags while preserving order
         unique_tags = []
         if tags:
@@ -106,40 +275,155 @@ class MemoryBank:
                     unique_tags.append(t)
                     seen.add(t)
 
-        entry = {
+        return {
             "timestamp": datetime.utcnow().isoformat(),
             "content": content.strip(),
             "tags": unique_tags,
         }
 
-        data.append(entry)
-        self._save(data)
-
-        log("MEMORY: Note saved successfully")
+    def _commit(self, entries: List[Dict]) -> None:
+        # The store decides the write cost: a full rewrite for the JSON
+        # array, a single appended line for the journal. The ledger lock
+        # spans the freshness check and the write, so a note saved by
+        # another process in between is never written over.
+        with self.store.locked():
+            fresh = self._cache_is_fresh()
+            if fresh and getattr(self.store, "rewrites_on_append", False):
+                self.store.rewrite(self._entries + entries)
+            else:
+                self.store.append_many(entries)
+            if fresh:
+                self._signature = self.store.signature()
+
+        # Keep the resident ledger (and its tag index) in step rather than
+        # reparsing it later
+        if fresh:
+            for entry in entries:
+                self._entries.append(entry)
+                position = len(self._entries) - 1
+                if self._tag_index is not None:
+                    self._tag_index.add(position, entry["tags"])
+                if self._ranker is not None:
+                    self._ranker.add(position, entry)
+                if self._vectors is not None:
+                    self._vectors.add(position, entry)
+            if self._vectors is not None:
+                self._vectors.refresh_ann()
+                self._vectors.persist(self.filepath, self._entries)
+            self._generation += 1
+        else:
+            self._invalidate()
 
-    def load_all(self) -> List[Dict]:
-        return self._load()
+    def load_all(self) -> LedgerView:
+        entries = self._cached_entries()
+        return LedgerView(entries, len(entries))
 
+    @tracing.traced("memory.search")
     def search(self, query: str) -> List[Dict]:
-        log(f"MEMORY: Searching for '{query}'")  # <<< ADDED
+        log("MEMORY: Searching for '%s'", query, level=DEBUG)  # <<< ADDED
         q = query.lower()
 
-        data = self._load()
-        results = [
-            e for e in data
-            if q in e["content"].lower()
-            or any(q in tag.lower() for tag in e["tags"])
-        ]
-
-        log(f"MEMORY: Found {len(results)} matching entries")  # <<< ADDED
+        if hasattr(self.store, "search"):
+            results = self.store.search(query)
+        else:
+            results = [
+                dict(e) for e in self._cached_entries()
+                if q in e["content"].lower()
+                or any(q in tag.lower() for tag in e["tags"])
+            ]
+
+        tracing.current().set(hits=len(results))
+        log("MEMORY: Found %d matching entries", len(results))  # <<< ADDED
         return results
 
+    @tracing.traced("memory.query_tags")
+    def query_tags(self, expression: str) -> List[Dict]:
+        """
+        Return entries matching a boolean tag query, oldest first, e.g.
+        "domain:gnome AND type:research NOT type:parlour". See TagIndex.
+        """
+        log("MEMORY: Tag query '%s'", expression, level=DEBUG)
+        return self._entries_at(self.tag_bitmap(expression))
+
+    def tag_bitmap(self, expression: str) -> int:
+        """Evaluate a tag query to a bitmap of ledger positions."""
+        with self._lock:
+            return self._current_tag_index().query(expression)
+
+    def _entries_at(self, bitmap: int) -> List[Dict]:
+        with self._lock:
+            view = self.load_all()
+            return [view[i] for i in TagIndex.positions(bitmap)]
+
+    @tracing.traced("memory.rank")
+    def rank(
+        self,
+        query: str,
+        k: int = 10,
+        domains: Optional[Iterable[str]] = None,
+        semantic: bool = False,
+        min_similarity: float = SEMANTIC_MIN_SCORE,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        BM25-ranked (score, entry) pairs for the query, best first, with
+        boosts for recent notes and for notes tagged with any of `domains`.
+
+        With `semantic=True` the vector index contributes candidates too,
+        and the two rankings are merged by reciprocal rank fusion: each list
+        awards 60 / (60 + rank), so a note near the top of both scores ~2.
+        Only notes at least `min_similarity` (cosine) from the query join
+        from the vector side, so an unrelated query still finds nothing.
+        """
+        with self._lock:
+            ranker = self._current_ranker()
+            view = self.load_all()
+            hits = ranker.search(query, k=k, domains=set(domains or ()))
+
+            if semantic:
+                fused: Dict[int, float] = {}
+                similar = self._current_vectors().search(query, k=k, min_score=min_similarity)
+                for ranking in (hits, similar):
+                    for rank, (_, position) in enumerate(ranking):
+                        fused[position] = fused.get(position, 0.0) + 60.0 / (61.0 + rank)
+                hits = sorted(
+                    ((score, position) for position, score in fused.items()),
+                    key=lambda pair: (pair[0], pair[1]),
+                    reverse=True,
+                )[:k]
+
+            tracing.current().set(k=k, semantic=semantic, hits=len(hits))
+            log("MEMORY: Ranked %d entries for '%s'", len(hits), query)
+            return [(score, view[position]) for score, position in hits]
+
+    @tracing.traced("memory.similar")
+    def similar(
+        self,
+        query: str,
+        k: int = 10,
+        min_score: float = 0.05,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        (cosine, entry) pairs from the offline vector index, best first.
+        Finds notes that share no words with the query but talk about the
+        same thing (see vectors.py). On large ledgers the search is
+        approximate; raise `nprobe` for better recall at some latency.
+        """
+        with self._lock:
+            vectors = self._current_vectors()
+            view = self.load_all()
+            hits = vectors.search(query, k=k, min_score=min_score, nprobe=nprobe)
+            tracing.current().set(k=k, hits=len(hits))
+            log("MEMORY: %d semantically similar entries for '%s'", len(hits), query)
+            return [(score, view[position]) for score, position in hits]
+
+    @tracing.traced("memory.to_text")
     def to_text(self) -> str:
-        log("MEMORY: Converting memory entries to text")  # <<< ADDED
+        log("MEMORY: Converting memory entries to text", level=DEBUG)  # <<< ADDED
 
-        entries = self._load()
+        entries = self._cached_entries()
         if not entries:
-            log("MEMORY: No entries to convert")  # <<< ADDED
+            log("MEMORY: No entries to convert", level=DEBUG)  # <<< ADDED
             return "No memory entries available."
 
         lines = []
@@ -149,5 +433,9 @@ class MemoryBank:
             tags = ", ".join(e.get("tags", [])) if e.get("tags") else "none"
             lines.append(f"- [{ts}] ({tags}) {content}")
 
-        log(f"MEMORY: Prepared text for {len(entries)} entries")  # <<< ADDED
-        return "\n".join(lines)
\ No newline at end of file
+        log("MEMORY: Prepared text for %d entries", len(entries), level=DEBUG)  # <<< ADDED
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Let the storage engine finish any background work."""
+        self.store.close()
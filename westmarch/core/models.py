@@ -1,14 +1,47 @@
 # westmarch/core/models.py
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import os
-from typing import Optional
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine, Dict, Iterator, Optional, Tuple, TypeVar
 
 from dotenv import load_dotenv
 import google.generativeai as genai
-from openai import OpenAI
+from google.generativeai import client as genai_client
+from openai import AsyncOpenAI, OpenAI
 
-from westmarch.core.logging import log
+from westmarch.core import telemetry, tracing
+from westmarch.core.fake_provider import (
+    Cassette,
+    FakeProvider,
+    default_cassette,
+    default_fake,
+    provider_mode,
+)
+from westmarch.core.logging import DEBUG, WARNING, log
+from westmarch.core.resilience import (
+    CircuitBreaker,
+    ProviderError,
+    ProviderUnavailable,
+    RetryPolicy,
+    circuit_breaker,
+    is_transient,
+)
+from westmarch.core.response_cache import ResponseCache, default_cache, opted_in, opted_out
+from westmarch.core.routing import (
+    ALTERNATES,
+    PINNED,
+    LatencyTracker,
+    RoutingPolicy,
+    arace,
+    latency_tracker,
+    policy_for,
+)
 
 # Load .env variables
 load_dotenv()
@@ -25,6 +58,123 @@ openai_client: Optional[OpenAI] = None
 if OPENAI_API_KEY:
     openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
+# Cap on in-flight async requests per provider, per event loop
+PROVIDER_CONCURRENCY: Dict[str, int] = {
+    "gemini": int(os.getenv("WESTMARCH_GEMINI_CONCURRENCY", "24")),
+    "openai": int(os.getenv("WESTMARCH_OPENAI_CONCURRENCY", "8")),
+}
+
+
+class _LoopResources:
+    """
+    Async clients and semaphores for one event loop.
+
+    Semaphores, httpx and grpc.aio connections are all bound to the loop
+    that first uses them, and run_sync() may start a fresh loop per
+    workflow, so nothing async is shared between loops.
+    """
+
+    def __init__(self):
+        self.semaphores = {
+            provider: asyncio.Semaphore(limit) for provider, limit in PROVIDER_CONCURRENCY.items()
+        }
+        self.openai: Optional[AsyncOpenAI] = (
+            AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        )
+        self._gemini_client = None
+        self._gemini_models: Dict[str, genai.GenerativeModel] = {}
+
+    def gemini_model(self, model_name: str) -> genai.GenerativeModel:
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            # The SDK's public generate_content_async() shares one process-wide
+            # grpc.aio client, which breaks once a second loop uses it. Build
+            # one per loop through its client manager instead. These are
+            # private names: google-generativeai is pinned (==0.8.5) in
+            # requirements.txt for them; re-check this on any upgrade.
+            if self._gemini_client is None:
+                self._gemini_client = genai_client._client_manager.make_client("generative_async")
+            model._async_client = self._gemini_client
+            self._gemini_models[model_name] = model
+        return model
+
+
+_loop_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopResources]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_resources_lock = threading.Lock()
+
+
+def _resources() -> _LoopResources:
+    loop = asyncio.get_running_loop()
+    with _loop_resources_lock:
+        res = _loop_resources.get(loop)
+        if res is None:
+            res = _loop_resources[loop] = _LoopResources()
+        return res
+
+
+T = TypeVar("T")
+
+
+def _note_gemini_usage(response: Any) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        telemetry.note_usage(usage.prompt_token_count, usage.candidates_token_count)
+
+
+def _note_openai_usage(usage: Any) -> None:
+    if usage is not None:
+        telemetry.note_usage(usage.prompt_tokens, usage.completion_tokens)
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code, e.g. a Streamlit
+    callback driving an async workflow. If this thread already has a
+    running loop, the coroutine gets its own loop on a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Carry the caller's context (e.g. the telemetry workflow tag) across
+        return pool.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+# The loop behind call(): one daemon thread for the process, so blocking
+# callers share its clients, connections and concurrency caps.
+_call_loop: Optional[asyncio.AbstractEventLoop] = None
+_call_loop_lock = threading.Lock()
+
+
+def _blocking_loop() -> asyncio.AbstractEventLoop:
+    global _call_loop
+    with _call_loop_lock:
+        if _call_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="westmarch-calls", daemon=True).start()
+            _call_loop = loop
+        return _call_loop
+
+
+def _run_blocking(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the shared call loop and wait for it, in the
+    caller's context. On that loop's own thread this would deadlock, so
+    there the coroutine gets a loop of its own (see run_sync()).
+    """
+    loop = _blocking_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return run_sync(coro)
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 
 class ModelClient:
     """
@@ -32,79 +182,390 @@ class ModelClient:
 
     - Jeeves, Perkins, Miss Pennington -> Gemini (gemini-1.5-flash)
     - Lady Hawthorne                   -> OpenAI GPT (gpt-4.1)
+
+    `acall()` makes the request, with at most PROVIDER_CONCURRENCY[provider]
+    requests in flight per event loop; `call()` blocks on the same coroutine,
+    run on a shared background loop, so retries, routing and telemetry have
+    one implementation. `stream()` yields the reply in chunks as the
+    provider produces them. All three share the same request preparation
+    and response cache.
+
+    With a ResponseCache, successful responses are kept keyed by the full
+    request, so an identical call is answered without a model round trip.
+    Caching is opt-in, since most replies are conversational: pass
+    use_cache=True or a cache, or list the agent in
+    WESTMARCH_LLM_CACHE_AGENTS. WESTMARCH_LLM_CACHE_OPT_OUT overrides both.
+
+    Transient provider errors (rate limits, timeouts, 5xx) are retried with
+    jittered exponential backoff; repeated ones open the provider's circuit
+    breaker so later calls fail fast. A call that cannot succeed raises
+    ProviderError rather than returning error text, and nothing is cached.
+
+    If the agent's RoutingPolicy allows it (WESTMARCH_FALLBACK_AGENTS),
+    call() and acall() may be answered by the alternate provider in
+    ALTERNATES: as a failover when the primary is down, or as a hedge when
+    it runs past its recent p95 latency (see routing.py). Other agents only
+    retry their own provider. Backup replies are not cached, so the cache
+    only ever holds the agent's own model's words.
+
+    With WESTMARCH_PROVIDER_MODE=replay or synthetic (or fake=...), replies
+    come from a FakeProvider instead of the network; "record" appends live
+    replies to the cassette it replays from.
     """
 
-    def __init__(self, agent_name: str):
+    def __init__(
+        self,
+        agent_name: str,
+        cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
+        retry: Optional[RetryPolicy] = None,
+        routing: Optional[RoutingPolicy] = None,
+        provider: Optional[str] = None,
+        model_name: Optional[str] = None,
+        fake: Optional[FakeProvider] = None,
+    ):
         self.agent_name = agent_name.lower()
 
-        if self.agent_name in {"lady_hawthorne", "lady hawthorne"}:
+        if provider is not None:
+            self.provider = provider
+            self.model_name = model_name
+        elif self.agent_name in {"lady_hawthorne", "lady hawthorne"}:
             self.provider = "openai"
             self.model_name = "gpt-4.1"          # adjust if you prefer gpt-4o / gpt-4o-mini
         else:
             self.provider = "gemini"
             self.model_name = "gemini-2.5-flash-lite"  # current fast, cost-effective model
 
+        # Everything besides the prompts that shapes a response; part of the cache key
+        self.generation_params = {"max_tokens": 800} if self.provider == "openai" else {}
+
+        # Offline provider (see fake_provider.py); None means live API calls
+        self.fake = fake if fake is not None else default_fake()
+        self.recorder: Optional[Cassette] = default_cassette() if provider_mode() == "record" else None
+
+        # Fake replies stay out of the shared cache unless a cache is passed in
+        self.cache: Optional[ResponseCache] = None
+        if use_cache is None:
+            use_cache = cache is not None or opted_in(self.agent_name)
+        if use_cache and not opted_out(self.agent_name):
+            if cache is not None:
+                self.cache = cache
+            elif self.fake is None:
+                self.cache = default_cache()
+
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker: CircuitBreaker = circuit_breaker(self.provider)
+
+        self.routing = routing if routing is not None else policy_for(self.agent_name)
+        self.latencies: LatencyTracker = latency_tracker()
+        self._backup: Optional[ModelClient] = None
+        self.role = "primary"  # "backup" when standing in for another client
+
     def call(self, system_prompt: str, user_content: str) -> str:
         """
         Main entry point used by all agents.
         Combines the agent's system prompt and the constructed user content,
-        and routes the call to Gemini or OpenAI.
+        and routes the call to Gemini or OpenAI. Blocks until acall()'s
+        request completes; raises ProviderError if no provider can produce
+        a reply (see _attempts()).
+        """
+        return _run_blocking(self._complete("call", system_prompt, user_content))
+
+    async def acall(self, system_prompt: str, user_content: str) -> str:
+        """
+        Async counterpart of call(). Cache hits return without waiting for
+        a concurrency slot, and the slot is given back during backoff. A
+        hedged call cancels whichever request loses.
+        """
+        return await self._complete("acall", system_prompt, user_content)
+
+    async def _complete(self, kind: str, system_prompt: str, user_content: str) -> str:
+        """The request behind call() and acall(); `kind` labels its telemetry and span."""
+        traced = self._span(f"model.{kind}", system_prompt, user_content)
+        with telemetry.track(self, kind) as record, traced as span:
+            system_prompt, user_content, key, cached = self._prepare(system_prompt, user_content)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                record.outcome = "cached"
+                return cached
+
+            backup = self._backup_client()
+            text, own = await arace(
+                lambda: self._acall_provider(system_prompt, user_content),
+                backup and (lambda: backup.acall(system_prompt, user_content)),
+                self._hedge_after(),
+                self.latencies,
+            )
+            if not own:
+                record.outcome = "backup"
+                span.set(served_by="backup")
+                return text
+            return self._finish(key, text)
+
+    async def _acall_provider(self, system_prompt: str, user_content: str) -> str:
+        """This client's own provider, with retries; times successful attempts."""
+        for attempt in self._attempts():
+            try:
+                async with _resources().semaphores[self.provider]:
+                    start = time.perf_counter()
+                    with self._span("provider.generate", attempt=attempt):
+                        text = await self._agenerate(system_prompt, user_content)
+            except Exception as e:
+                await asyncio.sleep(self._failed(e, attempt))
+                continue
+            self._succeeded(time.perf_counter() - start)
+            return text
+
+    def _backup_client(self) -> Optional["ModelClient"]:
+        """The same agent on the alternate provider, if its policy allows one."""
+        if not self.routing.fallback or self.provider not in ALTERNATES:
+            return None
+        if self._backup is None:
+            provider, model_name = ALTERNATES[self.provider]
+            self._backup = self._make_backup(provider, model_name)
+            self._backup.latencies = self.latencies
+            self._backup.role = "backup"
+        return self._backup
+
+    def _make_backup(self, provider: str, model_name: str) -> "ModelClient":
+        return ModelClient(
+            self.agent_name, use_cache=False, retry=self.retry, routing=PINNED,
+            provider=provider, model_name=model_name, fake=self.fake,
+        )
+
+    def _hedge_after(self) -> Optional[float]:
+        return self.routing.hedge_after(self.latencies, self.provider, self.model_name)
+
+    def stream(self, system_prompt: str, user_content: str) -> Iterator[str]:
+        """
+        Like call(), but yields the reply in chunks as they are generated.
+        A cached reply arrives as a single chunk; a streamed reply is cached
+        once it has completed. A failure before the first chunk is retried;
+        one part-way through raises, since the reader already has half a
+        reply. Streams always stay on the agent's own provider.
+        """
+        record = telemetry.begin(self, "stream")
+        span = tracing.open_span("model.stream", **self._span_attributes(system_prompt, user_content))
+        started = time.perf_counter()
+        try:
+            for chunk in tracing.bind(span, self._stream(record, system_prompt, user_content)):
+                if record.ttft is None:
+                    record.ttft = time.perf_counter() - started
+                yield chunk
+        except BaseException as e:
+            telemetry.end(record, started, e)
+            raise
+        telemetry.end(record, started)
+
+    def _stream(self, record: telemetry.CallRecord, system_prompt: str, user_content: str) -> Iterator[str]:
+        system_prompt, user_content, key, cached = self._prepare(system_prompt, user_content)
+        tracing.current().set(cache_hit=cached is not None)
+        if cached is not None:
+            record.outcome = "cached"
+            yield cached
+            return
+
+        for attempt in self._attempts():
+            parts = []
+            try:
+                stream = self._stream_generate(system_prompt, user_content)
+                generate = tracing.open_span("provider.generate", **self._span_attributes(attempt=attempt))
+                for chunk in tracing.bind(generate, telemetry.bind(record, stream)):
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                time.sleep(self._failed(e, attempt, retryable=not parts))
+                continue
+            self._succeeded()
+            self._finish(key, "".join(parts))
+            return
+
+    def _span_attributes(self, system_prompt: str = "", user_content: str = "", **extra: Any) -> Dict[str, Any]:
+        attributes = {
+            "agent": self.agent_name, "provider": self.provider, "model": self.model_name, "role": self.role,
+        }
+        if system_prompt or user_content:
+            attributes["prompt_chars"] = len(system_prompt or "") + len(user_content or "")
+        attributes.update(extra)
+        return attributes
+
+    def _span(self, name: str, system_prompt: str = "", user_content: str = "", **extra: Any):
+        """A tracing span for this client's work, tagged with agent, provider and model."""
+        if not tracing.enabled():
+            return tracing.span(name)
+        return tracing.span(name, **self._span_attributes(system_prompt, user_content, **extra))
+
+    def _attempts(self) -> Iterator[int]:
+        """
+        Attempt numbers 1..retry.max_attempts, each admitted by the
+        provider's circuit breaker. An open circuit raises
+        ProviderUnavailable straight away instead of calling the provider.
+        """
+        for attempt in range(1, self.retry.max_attempts + 1):
+            if not self.breaker.allow():
+                log("%s: %s circuit open, not calling", self.agent_name, self.provider, level=WARNING)
+                raise ProviderUnavailable(
+                    self.provider, self.agent_name, "circuit open after repeated failures",
+                    transient=True, attempts=attempt - 1,
+                )
+            yield attempt
+
+    def _succeeded(self, seconds: Optional[float] = None) -> None:
+        self.breaker.record_success()
+        if seconds is not None:
+            self.latencies.record(self.provider, self.model_name, seconds)
+
+    def _failed(self, error: Exception, attempt: int, retryable: bool = True) -> float:
+        """
+        Handle a failed attempt: returns the backoff before the next one,
+        or raises ProviderError if the error is permanent, this was the
+        last attempt, or the caller cannot retry. Only transient failures
+        count against the breaker.
         """
+        transient = is_transient(error)
+        if transient:
+            self.breaker.record_failure()
+        log(
+            "%s: ERROR during %s call (attempt %d/%d, %s) → %s",
+            self.agent_name, self.provider, attempt, self.retry.max_attempts,
+            "transient" if transient else "permanent", error,
+            level=WARNING,
+        )
+        if isinstance(error, ProviderError):
+            error.attempts = attempt
+            raise error
+        if not transient or not retryable or attempt >= self.retry.max_attempts:
+            raise ProviderError(
+                self.provider, self.agent_name, str(error), transient=transient, attempts=attempt
+            ) from error
+        return self.retry.delay(attempt)
+
+    def _prepare(
+        self, system_prompt: str, user_content: str
+    ) -> Tuple[str, str, str, Optional[str]]:
+        """Normalise the prompts and consult the cache: (system, user, key, cached)."""
         system_prompt = (system_prompt or "").strip()
         user_content = (user_content or "").strip()
 
+        key = ResponseCache.key(
+            self.provider, self.model_name, system_prompt, user_content, self.generation_params
+        )
+        if self.cache is None:
+            return system_prompt, user_content, key, None
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            log("%s: response served from cache", self.agent_name)
+        return system_prompt, user_content, key, cached
+
+    def _finish(self, key: str, text: str) -> str:
+        """Keep an own-provider reply: in the cache, and on the cassette when recording."""
+        if self.cache is not None:
+            self.cache.put(key, text, agent=self.agent_name, model=self.model_name)
+        if self.recorder is not None:
+            self.recorder.record(key, self.agent_name, self.model_name, text)
+        return text
+
+    def _missing_key(self) -> ProviderError:
+        name = "GOOGLE_API_KEY" if self.provider == "gemini" else "OPENAI_API_KEY"
+        return ProviderError(self.provider, self.agent_name, f"{name} not set in .env")
+
+    def _stream_generate(self, system_prompt: str, user_content: str) -> Iterator[str]:
+        """Streaming provider call. Yields text chunks; errors propagate to stream()."""
+        if self.fake is not None:
+            yield from self.fake.stream_generate(self, system_prompt, user_content)
+            return
+
         if self.provider == "gemini":
             if not GOOGLE_API_KEY:
-                return "[Gemini Error: GOOGLE_API_KEY not set in .env]"
+                raise self._missing_key()
 
-            try:
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: calling GEMINI model '{self.model_name}'")
-                log(f"System prompt: {system_prompt[:80]}...")
-                log(f"User content: {user_content[:80]}...")
-
-                model = genai.GenerativeModel(self.model_name)
-                # For Gemini we just send one combined prompt
-                full_prompt = f"{system_prompt}\n\n{user_content}".strip()
-                response = model.generate_content(full_prompt)
+            log("%s: streaming GEMINI model '%s'", self.agent_name, self.model_name)
+            log("System prompt: %.80s...", system_prompt, level=DEBUG)
+            log("User content: %.80s...", user_content, level=DEBUG)
 
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: model call completed")
+            model = genai.GenerativeModel(self.model_name)
+            full_prompt = f"{system_prompt}\n\n{user_content}".strip()
+            for chunk in model.generate_content(full_prompt, stream=True):
+                # Usage counts are cumulative; the last chunk's are the totals
+                _note_gemini_usage(chunk)
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
 
-                return getattr(response, "text", str(response))
-            
-            except Exception as e:
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: ERROR during Gemini call → {e}")
-                return f"[Gemini Error: {e}]"
+            log("%s: model stream completed", self.agent_name)
+            return
 
         if self.provider == "openai":
             if not OPENAI_API_KEY or openai_client is None:
-                return "[OpenAI Error: OPENAI_API_KEY not set in .env]"
+                raise self._missing_key()
 
-            try:
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: calling OPENAI model '{self.model_name}'")
-                log(f"System prompt: {system_prompt[:80]}...")
-                log(f"User content: {user_content[:80]}...")
-
-                response = openai_client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_content},
-                    ],
-                    max_tokens=800,
-                )
+            log("%s: streaming OPENAI model '%s'", self.agent_name, self.model_name)
+            log("System prompt: %.80s...", system_prompt, level=DEBUG)
+            log("User content: %.80s...", user_content, level=DEBUG)
 
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: model call completed")
-                
-                return response.choices[0].message.content
-            
-            except Exception as e:
-                # >>> LOGGING INSERTED HERE <<<
-                log(f"{self.agent_name}: ERROR during OpenAI call → {e}")
-                return f"[OpenAI Error: {e}]"
+            events = openai_client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                stream=True,
+                stream_options={"include_usage": True},
+                **self.generation_params,
+            )
+            for event in events:
+                if event.usage is not None:
+                    _note_openai_usage(event.usage)
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+
+            log("%s: model stream completed", self.agent_name)
+            return
+
+        raise ProviderError(self.provider, self.agent_name, "unknown provider")
+
+    async def _agenerate(self, system_prompt: str, user_content: str) -> str:
+        """Make one provider call; provider errors propagate to acall()."""
+        if self.fake is not None:
+            return await self.fake.agenerate(self, system_prompt, user_content)
+
+        if self.provider == "gemini":
+            if not GOOGLE_API_KEY:
+                raise self._missing_key()
+
+            log("%s: calling GEMINI model '%s' (async)", self.agent_name, self.model_name)
+            log("System prompt: %.80s...", system_prompt, level=DEBUG)
+            log("User content: %.80s...", user_content, level=DEBUG)
+
+            model = _resources().gemini_model(self.model_name)
+            full_prompt = f"{system_prompt}\n\n{user_content}".strip()
+            response = await model.generate_content_async(full_prompt)
+            _note_gemini_usage(response)
+
+            log("%s: model call completed", self.agent_name)
+            return getattr(response, "text", str(response))
+
+        if self.provider == "openai":
+            client = _resources().openai
+            if client is None:
+                raise self._missing_key()
+
+            log("%s: calling OPENAI model '%s' (async)", self.agent_name, self.model_name)
+            log("System prompt: %.80s...", system_prompt, level=DEBUG)
+            log("User content: %.80s...", user_content, level=DEBUG)
+
+            response = await client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                **self.generation_params,
+            )
+            _note_openai_usage(response.usage)
+
+            log("%s: model call completed", self.agent_name)
+            return response.choices[0].message.content
 
-        return "[Error: Unknown provider]"
\ No newline at end of file
+        raise ProviderError(self.provider, self.agent_name, "unknown provider")
@@ -0,0 +1,189 @@
+# westmarch/core/ranking.py
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation and apostrophes split words."""
+    return _WORD.findall((text or "").lower())
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 ranking for "Jeeves Remembers".
+
+    - postings are kept per term as parallel arrays of (position, tf),
+      appended to as new notes are saved
+    - IDF weighting means "the" counts for almost nothing and "gnome"
+      for a great deal
+    - document length is normalised against the ledger average
+    - recent notes and notes whose domain:* tags match the query get a
+      multiplicative boost
+    - top-k selection uses a heap rather than sorting every candidate, and
+      MaxScore-style pruning stops common terms from dragging every note
+      into contention
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        domain_boost: float = 0.5,
+        recency_boost: float = 0.2,
+        recency_half_life_days: float = 30.0,
+        max_common_ratio: Optional[float] = None,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.domain_boost = domain_boost
+        self.recency_boost = recency_boost
+        self.recency_half_life_days = recency_half_life_days
+        # Opt-in and approximate: terms found in more than this share of
+        # notes are skipped when the query has rarer terms to go on. Off by
+        # default, since it changes which notes match at all; IDF weighting
+        # and MaxScore pruning already keep common terms cheap.
+        self.max_common_ratio = max_common_ratio
+
+        self._docs: Dict[str, array] = {}
+        self._tfs: Dict[str, array] = {}
+        self._lengths = array("I")
+        self._times = array("d")
+        self._domains: List[frozenset] = []
+        self._total_length = 0
+
+    @classmethod
+    def build(cls, entries: Iterable[Dict], **options) -> "BM25Index":
+        index = cls(**options)
+        for position, entry in enumerate(entries):
+            index.add(position, entry)
+        return index
+
+    @property
+    def size(self) -> int:
+        return len(self._lengths)
+
+    def add(self, position: int, entry: Dict) -> None:
+        """Index the entry stored at `position` (positions arrive in order)."""
+        if position != self.size:
+            raise ValueError(f"BM25Index expected position {self.size}, got {position}")
+
+        terms = Counter(tokenize(entry.get("content", "")))
+        for term, tf in terms.items():
+            docs = self._docs.get(term)
+            if docs is None:
+                docs = self._docs[term] = array("I")
+                self._tfs[term] = array("I")
+            docs.append(position)
+            self._tfs[term].append(tf)
+
+        length = sum(terms.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self._times.append(_epoch(entry.get("timestamp")))
+        self._domains.append(frozenset(
+            t.split(":", 1)[1] for t in entry.get("tags") or [] if t.startswith("domain:")
+        ))
+
+    def idf(self, term: str) -> float:
+        n = self.size
+        df = len(self._docs.get(term, ()))
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        domains: Optional[Set[str]] = None,
+        now: Optional[float] = None,
+    ) -> List[Tuple[float, int]]:
+        """Return up to k (score, position) pairs, best first."""
+        n = self.size
+        if n == 0:
+            return []
+
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._docs]
+        if not terms:
+            return []
+
+        # Rarest terms first, so MaxScore can stop admitting new notes early
+        terms.sort(key=lambda t: len(self._docs[t]))
+        if self.max_common_ratio is not None:
+            rare = [t for t in terms if len(self._docs[t]) <= self.max_common_ratio * n]
+            if rare:
+                terms = rare
+
+        k1, b = self.k1, self.b
+        avg_length = self._total_length / n or 1.0
+        lengths = self._lengths
+        base = k1 * (1.0 - b)
+        slope = k1 * b / avg_length
+
+        # A term can add at most idf * (k1 + 1) to any note, and boosts can
+        # multiply a score by at most `max_boost`. Once the remaining terms
+        # cannot lift an unseen note past the current k-th score, they only
+        # need to update notes already in play (MaxScore pruning).
+        weights = [self.idf(t) * (k1 + 1.0) for t in terms]
+        max_boost = (1.0 + (self.domain_boost if domains else 0.0)) * (1.0 + self.recency_boost)
+
+        scores: Dict[int, float] = {}
+        get = scores.get
+
+        for i, term in enumerate(terms):
+            weight = weights[i]
+            docs, tfs = self._docs[term], self._tfs[term]
+
+            if len(scores) >= k:
+                kth = heapq.nlargest(k, scores.values())[-1]
+                if sum(weights[i:]) * max_boost < kth:
+                    for doc in list(scores):
+                        j = bisect_left(docs, doc)
+                        if j < len(docs) and docs[j] == doc:
+                            tf = tfs[j]
+                            scores[doc] += weight * tf / (tf + base + slope * lengths[doc])
+                    continue
+
+            for doc, tf in zip(docs, tfs):
+                scores[doc] = get(doc, 0.0) + weight * tf / (tf + base + slope * lengths[doc])
+
+        if not scores:
+            return []
+
+        # Boosts only matter for notes that could still reach the top k
+        if max_boost > 1.0 and len(scores) > k:
+            kth = heapq.nlargest(k, scores.values())[-1]
+            scores = {doc: s for doc, s in scores.items() if s * max_boost >= kth}
+
+        if domains:
+            boost = 1.0 + self.domain_boost
+            for doc in scores:
+                if self._domains[doc] & domains:
+                    scores[doc] *= boost
+
+        if self.recency_boost:
+            now = now if now is not None else datetime.utcnow().timestamp()
+            half_life = self.recency_half_life_days * 86400.0
+            for doc in scores:
+                age = max(0.0, now - self._times[doc])
+                scores[doc] *= 1.0 + self.recency_boost * 0.5 ** (age / half_life)
+
+        # Ties go to the more recent (later) note
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(score, doc) for doc, score in best]
+
+
+def _epoch(timestamp: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
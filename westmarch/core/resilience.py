@@ -0,0 +1,175 @@
+# westmarch/core/resilience.py
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class ProviderError(RuntimeError):
+    """
+    A model call that failed for good: retries were exhausted, the error
+    was permanent (bad key, invalid request), or the provider's circuit is
+    open. Workflows let it propagate instead of passing error text on to
+    the next agent or into the ledger.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        agent: str,
+        message: str,
+        transient: bool = False,
+        attempts: int = 1,
+    ):
+        super().__init__(f"{provider} call for {agent} failed: {message}")
+        self.provider = provider
+        self.agent = agent
+        self.transient = transient
+        self.attempts = attempts
+
+
+class ProviderUnavailable(ProviderError):
+    """Raised without calling the provider while its circuit is open."""
+
+
+# HTTP statuses worth another try; everything else is the request's fault
+TRANSIENT_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# SDK exception types (openai, google.api_core) that signal a passing outage.
+# Matched by name so neither SDK has to be imported here.
+TRANSIENT_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "InternalServerError",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "ResourceExhausted",
+    "TooManyRequests",
+    "BadGateway",
+    "GatewayTimeout",
+    "Aborted",
+}
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True if retrying the same request could plausibly succeed."""
+    if isinstance(exc, ProviderError):
+        return exc.transient
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    if isinstance(status, int) and status >= 400:
+        return status in TRANSIENT_STATUS or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the wait before retry n is drawn
+    uniformly from [0, min(max_delay, base_delay * 2**(n-1))].
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    - closed: calls flow; `failure_threshold` consecutive transient
+      failures open the circuit
+    - open: calls are refused at once until `reset_timeout` has passed
+    - half-open: a single probe call is let through; success closes the
+      circuit, failure opens it again
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """May a call go to the provider now?"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(provider: str) -> CircuitBreaker:
+    """The process-wide breaker shared by every client of `provider`."""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
@@ -0,0 +1,270 @@
+# westmarch/core/response_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from westmarch.core.logging import log
+
+
+# Set to "off" to disable response caching altogether
+CACHE_ENV_VAR = "WESTMARCH_LLM_CACHE"
+
+# Comma-separated agent names whose ModelClients use the cache by default.
+# None do: the household's replies are conversational, and replaying one
+# word for word is only right where the caller has asked for it.
+OPT_IN_ENV_VAR = "WESTMARCH_LLM_CACHE_AGENTS"
+
+# Comma-separated agent names that should never be served from the cache
+OPT_OUT_ENV_VAR = "WESTMARCH_LLM_CACHE_OPT_OUT"
+
+DEFAULT_CACHE_PATH = "westmarch/data/llm_cache.sqlite3"
+
+
+class ResponseCache:
+    """
+    Two-tier cache of model responses, keyed by a hash of the full request.
+
+    - memory tier: an LRU of the `memory_entries` most recently used
+      responses
+    - disk tier: a SQLite table that survives restarts, bounded by
+      `max_disk_bytes` (least recently used rows are evicted first)
+    - entries older than `ttl_seconds` are treated as misses and dropped
+    - `stats()` reports hits and evictions per tier, misses, expired
+      lookups and writes
+
+    Only successful responses should be stored; a ModelClient call that
+    raises ProviderError caches nothing.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        memory_entries: int = 256,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_disk_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def key(
+        provider: str,
+        model: str,
+        system_prompt: str,
+        user_content: str,
+        params: Optional[Dict] = None,
+    ) -> str:
+        """SHA-256 over everything that shapes the response."""
+        blob = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "system": system_prompt,
+                "user": user_content,
+                "params": params or {},
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    # ---------- lookups ----------
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        expired = False
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                response, created = hit
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+                expired = True
+
+            conn = self._disk(create=False)
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created = row
+                    if now - created <= self.ttl_seconds:
+                        with conn:
+                            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                        self._remember(key, response, created)
+                        self._stats["disk_hits"] += 1
+                        return response
+                    with conn:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    expired = True
+
+            self._stats["expired" if expired else "misses"] += 1
+            return None
+
+    def put(self, key: str, response: str, agent: str = "", model: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            self._stats["writes"] += 1
+
+            conn = self._disk(create=True)
+            if conn is None:
+                return
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, agent, model, response, size, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, agent, model, response, len(response.encode("utf-8")), now, now),
+                )
+                self._evict_disk(conn)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._disk(create=False)
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring, plus the current size of each tier."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"] + stats["expired"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            conn = self._disk(create=False)
+            if conn is not None:
+                count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            else:
+                count, size = 0, 0
+            stats["disk_entries"] = count
+            stats["disk_bytes"] = size
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- internals (caller holds the lock) ----------
+
+    def _remember(self, key: str, response: str, created: float) -> None:
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _disk(self, create: bool) -> Optional[sqlite3.Connection]:
+        # The file is only created once there is something to put in it
+        if self._conn is None and self.path:
+            if not create and not os.path.exists(self.path):
+                return None
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key       TEXT PRIMARY KEY,
+                    agent     TEXT,
+                    model     TEXT,
+                    response  TEXT NOT NULL,
+                    size      INTEGER NOT NULL,
+                    created   REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)"
+            )
+        return self._conn
+
+    def _evict_disk(self, conn: sqlite3.Connection) -> None:
+        stale = conn.execute(
+            "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self._stats["disk_evictions"] += max(stale, 0)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+
+        # Drop least recently used rows until back under the bound
+        excess = total - self.max_disk_bytes
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._stats["disk_evictions"] += len(doomed)
+        log("LLM-CACHE: Evicted %d responses to stay under %d bytes", len(doomed), self.max_disk_bytes)
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """
+    The process-wide cache shared by every ModelClient, or None when
+    WESTMARCH_LLM_CACHE=off.
+    """
+    global _default_cache
+    if os.getenv(CACHE_ENV_VAR, "").lower() in {"off", "0", "false", "no"}:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def opted_in(agent_name: str) -> bool:
+    """True if the agent is listed in WESTMARCH_LLM_CACHE_AGENTS."""
+    return _listed(OPT_IN_ENV_VAR, agent_name)
+
+
+def opted_out(agent_name: str) -> bool:
+    """True if the agent is listed in WESTMARCH_LLM_CACHE_OPT_OUT."""
+    return _listed(OPT_OUT_ENV_VAR, agent_name)
+
+
+def _listed(env_var: str, agent_name: str) -> bool:
+    names = os.getenv(env_var, "")
+    wanted = {n.strip().lower().replace("_", " ") for n in names.split(",") if n.strip()}
+    return agent_name.lower().replace("_", " ") in wanted
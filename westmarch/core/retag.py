@@ -0,0 +1,237 @@
+# westmarch/core/retag.py
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from westmarch.core import tagging
+from westmarch.core.logging import log
+from westmarch.core.storage import (
+    FileLock,
+    SqliteStore,
+    iter_ledger,
+    ledger_file,
+    resolve_backend,
+    write_ledger,
+)
+from westmarch.core.vectors import VectorIndex
+
+# Workflow notes by header, with the type tag each workflow files them under
+TYPE_PREFIXES: List[Tuple[str, str]] = [
+    ("parlour discussion entry", "type:parlour"),
+    ("daily plan", "type:planning"),
+    ("research performed", "type:research"),
+    ("drafted text based", "type:drafting"),
+    ("critique requested", "type:critique"),
+    ("[whole household", "type:whole-household"),
+]
+
+# Section headers holding the raw request Miss Pennington tags from
+REQUEST_HEADERS = ("USER SAID:", "REQUEST:", "USER REQUEST:", "TEXT:", "USER APPROVAL:")
+
+
+@dataclass
+class RetagStats:
+    entries: int = 0
+    changed: int = 0
+    seconds: float = 0.0
+
+
+def request_text(content: str) -> str:
+    """
+    The part of a workflow note that holds the user's request (domain tags
+    are inferred from that alone when a note is saved), or the whole note.
+    """
+    for header in REQUEST_HEADERS:
+        start = content.find(header + "\n")
+        if start != -1:
+            section = content[start + len(header) + 1:]
+            return section.split("\n\n", 1)[0]
+    return content
+
+
+def retag_entry(entry: Dict, matcher: tagging.DomainMatcher, prune: bool = False) -> Dict:
+    """
+    The entry with its tags in the current scheme:
+
+        auto, domain:* (sorted), type:*, then any other tags as they were
+
+    Domains are inferred afresh from the request with the current keyword
+    table. Legacy bare tags naming a domain or one of its keywords ("gnome",
+    "letter") become domain:* tags. Existing domain:* tags are kept unless
+    `prune`, or their domain is no longer in the table. A note without a
+    type:* tag gets one from its workflow header. Returns the same dict if
+    nothing changed.
+    """
+    content = entry.get("content", "") or ""
+    tags = list(entry.get("tags") or [])
+
+    domains = matcher.infer(request_text(content))
+    types: List[str] = []
+    others: List[str] = []
+    for tag in tags:
+        if tag == "auto" or tag in types or tag in others:
+            continue
+        if tag.startswith("domain:"):
+            if not prune and tag[len("domain:"):] in matcher.table:
+                domains.add(tag[len("domain:"):])
+        elif tag.startswith("type:"):
+            types.append(tag)
+        elif tag in matcher.table:
+            domains.add(tag)
+        else:
+            legacy = matcher.infer(tag)
+            if legacy:
+                domains |= legacy
+            else:
+                others.append(tag)
+
+    if not types:
+        header = content.lstrip().lower()
+        types = [t for prefix, t in TYPE_PREFIXES if header.startswith(prefix)][:1]
+
+    new_tags = ["auto"] + [f"domain:{d}" for d in sorted(domains)] + types + others
+    if new_tags == tags:
+        return entry
+    return {**entry, "tags": new_tags}
+
+
+# ------- Process pool plumbing -------
+
+_worker_matcher: Optional[tagging.DomainMatcher] = None
+_worker_prune = False
+
+
+def _init_worker(table: Mapping[str, List[str]], prune: bool) -> None:
+    global _worker_matcher, _worker_prune
+    _worker_matcher = tagging.DomainMatcher(table)
+    _worker_prune = prune
+
+
+def _retag_chunk(chunk: List[Dict]) -> Tuple[List[Dict], int]:
+    out = [retag_entry(entry, _worker_matcher, _worker_prune) for entry in chunk]
+    return out, sum(new is not old for new, old in zip(out, chunk))
+
+
+def _chunks(entries: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk: List[Dict] = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ordered_map(executor: Executor, chunks: Iterator[List[Dict]], window: int):
+    """executor.map, but never more than `window` chunks read ahead of the writer."""
+    pending: Deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_retag_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def retag_ledger(
+    path: str,
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    prune: bool = False,
+    table: Optional[Mapping[str, List[str]]] = None,
+) -> RetagStats:
+    """
+    Re-tag every entry of a ledger with the current keyword table (or
+    `table`), streaming it through a pool of `workers` processes (default:
+    one per CPU; 0 or 1 retags in this process) and writing the result
+    back in one atomic step: a file swap for json and journal ledgers, a
+    single transaction for SQLite (swapping the database file would leave
+    connections the app has open writing to the replaced one). Holds the
+    ledger lock throughout, which every backend's saves also take, so
+    saves from the app wait rather than being lost. Persisted vectors
+    embed the tags, so they are dropped and rebuilt on next use.
+    """
+    started = time.perf_counter()
+    table = dict(table if table is not None else tagging.domain_matcher().table)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    stats = RetagStats()
+
+    target = ledger_file(path, backend)
+    kind = resolve_backend(path, backend)
+
+    # SQLite is rewritten in place through a store whose saves share the lock
+    store = SqliteStore(target) if kind == "sqlite" else None
+    lock = store.locked() if store is not None else FileLock(f"{target}.lock")
+
+    try:
+        with lock:
+            chunks = _chunks(iter_ledger(path, backend), chunk_size)
+            if workers > 1:
+                executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(table, prune))
+                results = _ordered_map(executor, chunks, window=2 * workers)
+            else:
+                executor = None
+                _init_worker(table, prune)
+                results = map(_retag_chunk, chunks)
+
+            def retagged() -> Iterator[Dict]:
+                for out, changed in results:
+                    stats.entries += len(out)
+                    stats.changed += changed
+                    yield from out
+
+            try:
+                if store is not None:
+                    store.rewrite(retagged())
+                else:
+                    write_ledger(path, retagged(), backend=backend, overwrite=True)
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+    finally:
+        if store is not None:
+            store.close()
+
+    for stale in VectorIndex.paths(path):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(stale)
+
+    stats.seconds = time.perf_counter() - started
+    log("MEMORY: Re-tagged %d of %d entries in %.1fs", stats.changed, stats.entries, stats.seconds)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-tag a memory ledger with the current domain keywords.")
+    parser.add_argument("path", help="ledger to re-tag in place")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite"])
+    parser.add_argument("--keywords", help=f"JSON keyword table (default: ${tagging.KEYWORDS_ENV_VAR} or built-in)")
+    parser.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="drop domain tags the keyword table no longer infers",
+    )
+    args = parser.parse_args()
+
+    stats = retag_ledger(
+        args.path,
+        backend=args.backend,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        prune=args.prune,
+        table=tagging.load_keywords(args.keywords) if args.keywords else None,
+    )
+    print(f"Re-tagged {stats.changed} of {stats.entries} entries in {stats.seconds:.1f}s")
@@ -0,0 +1,193 @@
+# westmarch/core/routing.py
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from westmarch.core.logging import ERROR, WARNING, log
+from westmarch.core.resilience import ProviderError
+
+# Agents whose calls may be hedged onto, or fail over to, the alternate
+# provider (comma-separated, "*" for all). Off by default: each persona is
+# tuned to its own model, so an unlisted agent only retries its provider.
+FALLBACK_ENV_VAR = "WESTMARCH_FALLBACK_AGENTS"
+
+# Where a request goes when its own provider is slow or down
+ALTERNATES: Dict[str, Tuple[str, str]] = {
+    "gemini": ("openai", "gpt-4.1-mini"),
+    "openai": ("gemini", "gemini-2.5-flash"),
+}
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    Rolling latencies of successful calls per (provider, model), plus
+    counts of routing events (hedges fired, backup wins, failovers).
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.events: Counter = Counter()
+
+    def record(self, provider: str, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get((provider, model))
+            if samples is None:
+                samples = self._samples[(provider, model)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, provider: str, model: str) -> int:
+        with self._lock:
+            return len(self._samples.get((provider, model), ()))
+
+    def percentile(self, provider: str, model: str, q: float) -> Optional[float]:
+        """The q-th percentile (0-100) of recent latencies, or None if there are none."""
+        with self._lock:
+            samples = sorted(self._samples.get((provider, model), ()))
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, round(q / 100 * len(samples)) - 1))
+        return samples[rank]
+
+    def note(self, event: str) -> None:
+        with self._lock:
+            self.events[event] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """{"provider/model": {"count", "p50", "p95"}, "events": {...}} for monitoring."""
+        with self._lock:
+            routes = list(self._samples)
+            events = dict(self.events)
+        stats: Dict[str, Dict[str, float]] = {}
+        for provider, model in routes:
+            stats[f"{provider}/{model}"] = {
+                "count": self.count(provider, model),
+                "p50": self.percentile(provider, model, 50),
+                "p95": self.percentile(provider, model, 95),
+            }
+        stats["events"] = events
+        return stats
+
+
+@dataclass
+class RoutingPolicy:
+    """
+    How one agent's calls may be routed.
+
+    - fallback: the alternate provider may answer, either as a hedge when
+      the primary is slow or as a failover when it is down
+    - hedge: fire the backup once the primary has taken longer than its
+      `percentile` latency (floored at `min_hedge_after`); until
+      `min_samples` calls have been timed, `default_hedge_after` is used
+    """
+
+    fallback: bool = False
+    hedge: bool = True
+    percentile: float = 95.0
+    min_hedge_after: float = 1.0
+    default_hedge_after: float = 8.0
+    min_samples: int = 20
+
+    def hedge_after(self, tracker: LatencyTracker, provider: str, model: str) -> Optional[float]:
+        """Seconds to wait on the primary before hedging, or None to never hedge."""
+        if not (self.fallback and self.hedge):
+            return None
+        if tracker.count(provider, model) < self.min_samples:
+            return self.default_hedge_after
+        return max(self.min_hedge_after, tracker.percentile(provider, model, self.percentile))
+
+
+PINNED = RoutingPolicy(fallback=False)
+
+
+def policy_for(agent_name: str) -> RoutingPolicy:
+    """
+    The default policy for an agent: hedging and failover if it is listed
+    in WESTMARCH_FALLBACK_AGENTS, otherwise pinned to its own provider.
+    """
+    names = os.getenv(FALLBACK_ENV_VAR, "")
+    allowed = {n.strip().lower().replace("_", " ") for n in names.split(",") if n.strip()}
+    if "*" in allowed or agent_name.lower().replace("_", " ") in allowed:
+        return RoutingPolicy(fallback=True)
+    return PINNED
+
+
+_default_tracker = LatencyTracker()
+
+
+def latency_tracker() -> LatencyTracker:
+    """The process-wide tracker shared by every ModelClient."""
+    return _default_tracker
+
+
+async def arace(
+    primary: Callable[[], Awaitable[T]],
+    backup: Optional[Callable[[], Awaitable[T]]],
+    hedge_after: Optional[float],
+    tracker: Optional[LatencyTracker] = None,
+) -> Tuple[T, bool]:
+    """
+    Await `primary`, falling back to `backup` when it is slow or down.
+    Returns (result, primary_won).
+
+    - a transient ProviderError from the primary fails over to the backup
+    - if the primary is still running after `hedge_after` seconds (None:
+      never hedge) the backup is started too; the first success wins and
+      the losing request is cancelled
+    """
+    if backup is None:
+        return await primary(), True
+    tracker = tracker or latency_tracker()
+
+    first = asyncio.ensure_future(primary())
+    second: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            try:
+                return first.result(), True
+            except ProviderError as error:
+                return await _afailover(error, backup, tracker), False
+
+        tracker.note("hedged")
+        log("ROUTING: primary still running after %.2fs, hedging", hedge_after)
+        second = asyncio.ensure_future(backup())
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except ProviderError as e:
+                    error = error or e
+                    continue
+                if task is second:
+                    tracker.note("backup_won")
+                return result, task is first
+        raise error
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def _afailover(
+    error: ProviderError, backup: Callable[[], Awaitable[T]], tracker: LatencyTracker
+) -> T:
+    if not error.transient:
+        raise error
+    tracker.note("failover")
+    log("ROUTING: failing over after '%s'", error, level=WARNING)
+    try:
+        return await backup()
+    except ProviderError as backup_error:
+        log("ROUTING: backup failed too → %s", backup_error, level=ERROR)
+        raise error
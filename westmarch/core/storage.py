@@ -0,0 +1,788 @@
+# westmarch/core/storage.py
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from westmarch.core.logging import WARNING, log
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows: locking stays in-process
+    fcntl = None
+
+
+# Environment override for the storage engine behind MemoryBank.
+BACKEND_ENV_VAR = "WESTMARCH_MEMORY_BACKEND"
+
+DEFAULT_BACKEND = "json"
+
+
+class LedgerCorruptError(ValueError):
+    """Raised when a ledger file cannot be parsed and must not be overwritten."""
+
+
+class FileLock:
+    """
+    Advisory lock shared by every process using the same ledger.
+
+    Takes an exclusive `fcntl.flock` on `<ledger>.lock`, so concurrent
+    Streamlit sessions and worker processes serialise their
+    read-modify-write cycles. Re-entrant within a thread, and threads of
+    one process queue on an RLock before touching the file lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        self._rlock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._rlock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._rlock.release()
+
+
+class JsonArrayStore:
+    """
+    The original ledger format: a single JSON array, rewritten on every save.
+    Kept as the default so existing memory.json files work unchanged.
+    """
+
+    name = "json"
+
+    # Appending means rewriting the whole array, so MemoryBank hands us
+    # its already-parsed entries instead of having us reparse the file.
+    rewrites_on_append = True
+
+    def __init__(self, filepath: str, fsync: bool = True):
+        self.filepath = filepath
+        self.fsync = fsync
+        self.lock = FileLock(f"{filepath}.lock")
+        _ensure_parent_dir(filepath)
+
+        with self.lock:
+            if not os.path.exists(filepath):
+                _atomic_write(filepath, "[]", fsync=fsync)
+
+    def locked(self) -> FileLock:
+        """Hold the ledger lock across a read-modify-write cycle."""
+        return self.lock
+
+    def load(self) -> List[Dict]:
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError as e:
+                raise LedgerCorruptError(f"{self.filepath} cannot be parsed: {e}") from e
+
+    def signature(self):
+        return _file_signature(self.filepath)
+
+    def append(self, entry: Dict) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> None:
+        # load() raises on a damaged file, so it is never overwritten here
+        with self.lock:
+            data = self.load()
+            data.extend(entries)
+            self.rewrite(data)
+
+    def rewrite(self, entries: List[Dict]) -> None:
+        """Write the whole array to a temp file, then swap it into place."""
+        with self.lock:
+            _atomic_write(self.filepath, json.dumps(entries, indent=2), fsync=self.fsync)
+
+    def recover(self) -> int:
+        """
+        Salvage a damaged ledger: every entry that still parses is kept,
+        the damaged file is moved aside as `<name>.corrupt-<timestamp>`.
+        Returns the number of entries salvaged, or -1 if nothing was wrong.
+        """
+        with self.lock:
+            try:
+                self.load()
+                return -1
+            except LedgerCorruptError:
+                pass
+
+            with open(self.filepath, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            entries = _salvage_array(text)
+
+            stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+            damaged_copy = f"{self.filepath}.corrupt-{stamp}"
+            os.replace(self.filepath, damaged_copy)
+            self.rewrite(entries)
+
+        log("MEMORY: Recovered %d entries; damaged file kept at %s", len(entries), damaged_copy, level=WARNING)
+        return len(entries)
+
+    def close(self) -> None:
+        pass
+
+
+class JournalStore:
+    """
+    Append-only JSONL journal: one JSON record per line.
+
+    - save is a single appended line (optionally fsync'd), independent of
+      ledger size
+    - lines left half-written by an interrupted append are skipped on load
+    - every `compact_every` appends, or as soon as a damaged line is seen,
+      a background thread rewrites the journal in clean form
+    """
+
+    name = "journal"
+
+    def __init__(
+        self,
+        filepath: str,
+        fsync: bool = False,
+        compact_every: int = 500,
+        legacy_path: Optional[str] = None,
+    ):
+        self.filepath = filepath
+        self.fsync = fsync
+        self.compact_every = compact_every
+
+        self._lock = FileLock(f"{filepath}.lock")
+        self._appends_since_compaction = 0
+        self._compactor: Optional[threading.Thread] = None
+
+        _ensure_parent_dir(filepath)
+
+        with self._lock:
+            if not os.path.exists(filepath):
+                # One-shot migration from the old array format, if present
+                if legacy_path and os.path.exists(legacy_path):
+                    migrate_ledger(legacy_path, filepath, backend="journal")
+                else:
+                    open(filepath, "a", encoding="utf-8").close()
+
+    def locked(self) -> FileLock:
+        """Hold the journal lock (shared with compaction and other processes)."""
+        return self._lock
+
+    def load(self) -> List[Dict]:
+        entries, damaged = self._read()
+
+        if damaged:
+            log("MEMORY: Journal has %d damaged line(s) — skipping them", damaged, level=WARNING)
+            self._schedule_compaction()
+
+        return entries
+
+    def signature(self):
+        return _file_signature(self.filepath)
+
+    def append(self, entry: Dict) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> None:
+        payload = "".join(json.dumps(e) + "\n" for e in entries)
+
+        with self._lock:
+            with open(self.filepath, "a+b") as f:
+                self._repair_tail(f)
+                f.write(payload.encode("utf-8"))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._appends_since_compaction += len(entries)
+            due = self._appends_since_compaction >= self.compact_every
+
+        if due:
+            self._schedule_compaction()
+
+    def rewrite(self, entries: Iterable[Dict]) -> None:
+        with self._lock:
+            self._rewrite_locked(entries)
+
+    def recover(self) -> int:
+        """Drop damaged lines now rather than in the background."""
+        self.compact()
+        return len(self._read()[0])
+
+    def compact(self) -> None:
+        """
+        Rewrite the journal without damaged lines. Safe to call directly;
+        the file lock keeps other processes from appending meanwhile.
+        """
+        with self._lock:
+            entries, _ = self._read()
+            self._rewrite_locked(entries)
+            self._appends_since_compaction = 0
+        log("MEMORY: Journal compacted (%d entries)", len(entries))
+
+    def close(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def _read(self):
+        entries: List[Dict] = []
+        damaged = 0
+
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    damaged += 1
+
+        return entries, damaged
+
+    @staticmethod
+    def _repair_tail(f) -> None:
+        """
+        Deal with a last line left without its newline by an interrupted
+        append, so the next record starts on a line of its own instead of
+        being glued onto (and lost with) it: a complete record just gets
+        its newline, a torn one is cut off. Caller holds the lock.
+        """
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+
+        # Find where the torn line starts
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        f.seek(pos)
+        try:
+            json.loads(f.read())
+        except ValueError:
+            pass
+        else:
+            f.write(b"\n")
+            return
+        f.truncate(pos)
+        log("MEMORY: Dropped a torn line at the end of the journal (%d bytes)", end - pos, level=WARNING)
+
+    def _rewrite_locked(self, entries: Iterable[Dict]) -> None:
+        _write_jsonl(self.filepath, entries, fsync=self.fsync)
+
+    def _schedule_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(
+            target=self.compact,
+            name="westmarch-journal-compactor",
+            daemon=True,
+        )
+        self._compactor.start()
+
+
+class SqliteStore:
+    """
+    SQLite ledger (stdlib sqlite3, WAL mode).
+
+    - entries      : one row per note, the full entry kept as JSON
+    - entries_fts  : FTS5 trigram index over content, so substring search
+                     is an index lookup instead of a scan
+    - tags         : tag vocabulary
+    - entry_tags   : (tag, entry) postings, so search() can match tags
+
+    Results are always rebuilt from the stored JSON, so callers receive the
+    same dicts the array ledger would give them. Only search() runs here;
+    tag queries and recall ranking use MemoryBank's in-memory indexes, as
+    they do for every other engine.
+    """
+
+    name = "sqlite"
+
+    # FTS5 trigram queries need at least three characters.
+    MIN_FTS_TERM = 3
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id        INTEGER PRIMARY KEY,
+            timestamp TEXT,
+            content   TEXT NOT NULL,
+            record    TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tags (
+            id   INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS entry_tags (
+            tag_id   INTEGER NOT NULL REFERENCES tags(id),
+            entry_id INTEGER NOT NULL REFERENCES entries(id),
+            PRIMARY KEY (tag_id, entry_id)
+        ) WITHOUT ROWID;
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            content,
+            content='entries',
+            content_rowid='id',
+            tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END;
+    """
+
+    def __init__(self, filepath: str, legacy_path: Optional[str] = None):
+        self.filepath = filepath
+        _ensure_parent_dir(filepath)
+
+        is_new = not os.path.exists(filepath)
+
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(f"{filepath}.lock")
+        self._conn = sqlite3.connect(filepath, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+        # One-shot migration from the old array format, if present
+        if is_new and legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                self.rewrite(json.load(f))
+            log("MEMORY: Migrated %s into %s", legacy_path, filepath)
+
+    # ---------- core API ----------
+
+    def locked(self) -> FileLock:
+        """
+        Hold the ledger lock. SQLite serialises writers itself, but
+        whole-ledger jobs (retag_ledger) take this lock to keep app saves
+        waiting until they have finished.
+        """
+        return self._file_lock
+
+    def load(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT record FROM entries ORDER BY id").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def signature(self):
+        # Changes whenever another connection commits; our own writes are
+        # tracked by MemoryBank itself.
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def append(self, entry: Dict) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> None:
+        with self._file_lock, self._lock, self._conn:
+            for e in entries:
+                self._insert(e)
+
+    def rewrite(self, entries: Iterable[Dict]) -> None:
+        """
+        Replace every entry in one write transaction, in place: connections
+        other processes hold open stay valid, and readers see the old
+        ledger until it commits.
+        """
+        with self._file_lock, self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM entry_tags")
+            self._conn.execute("DELETE FROM entries")
+            for e in entries:
+                self._insert(e)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- indexed queries ----------
+
+    def search(self, query: str) -> List[Dict]:
+        """Case-insensitive substring match on content or any tag."""
+        q = query.lower()
+
+        with self._lock:
+            ids = set(self._content_matches(q))
+            tag_ids = self._tag_ids_matching(lambda name: q in name.lower())
+            ids.update(self._entries_with_tag_ids(tag_ids))
+            return self._records(sorted(ids))
+
+    # ---------- internals (caller holds the lock) ----------
+
+    def _insert(self, entry: Dict) -> None:
+        cur = self._conn.execute(
+            "INSERT INTO entries (timestamp, content, record) VALUES (?, ?, ?)",
+            (entry.get("timestamp"), entry.get("content", ""), json.dumps(entry)),
+        )
+        entry_id = cur.lastrowid
+
+        for tag in dict.fromkeys(entry.get("tags") or []):
+            self._conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag,))
+            self._conn.execute(
+                "INSERT OR IGNORE INTO entry_tags (tag_id, entry_id) "
+                "SELECT id, ? FROM tags WHERE name = ?",
+                (entry_id, tag),
+            )
+
+    def _content_matches(self, q: str) -> List[int]:
+        if len(q) >= self.MIN_FTS_TERM:
+            phrase = '"' + q.replace('"', '""') + '"'
+            rows = self._conn.execute(
+                "SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?", (phrase,)
+            )
+        else:
+            # Too short for the trigram index: fall back to a scan
+            pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self._conn.execute(
+                "SELECT id FROM entries WHERE content LIKE ? ESCAPE '\\'", (pattern,)
+            )
+        return [r[0] for r in rows]
+
+    def _tag_ids_matching(self, predicate) -> List[int]:
+        # The tag vocabulary is tiny compared to the ledger
+        rows = self._conn.execute("SELECT id, name FROM tags").fetchall()
+        return [tag_id for tag_id, name in rows if predicate(name)]
+
+    def _entries_with_tag_ids(self, tag_ids: List[int]) -> List[int]:
+        if not tag_ids:
+            return []
+        marks = ",".join("?" * len(tag_ids))
+        rows = self._conn.execute(
+            f"SELECT DISTINCT entry_id FROM entry_tags WHERE tag_id IN ({marks})",
+            tag_ids,
+        )
+        return [r[0] for r in rows]
+
+    def _records(self, ids: List[int]) -> List[Dict]:
+        records: List[Dict] = []
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT record FROM entries WHERE id IN ({marks}) ORDER BY id", chunk
+            )
+            records.extend(json.loads(r[0]) for r in rows)
+        return records
+
+
+# -----------------------------------------
+#   Backend selection & migration
+# -----------------------------------------
+
+def resolve_backend(filepath: str, backend: Optional[str] = None) -> str:
+    """
+    Pick the storage engine: explicit argument, then the environment,
+    then the file extension, then the JSON array default.
+    """
+    chosen = backend or os.getenv(BACKEND_ENV_VAR)
+    if chosen:
+        return chosen.lower()
+    if filepath.endswith(".jsonl"):
+        return "journal"
+    if filepath.endswith((".sqlite3", ".sqlite", ".db")):
+        return "sqlite"
+    return DEFAULT_BACKEND
+
+
+def open_store(filepath: str, backend: Optional[str] = None, **options):
+    """
+    Open the storage engine for a ledger path.
+
+    For non-array backends given a legacy `.json` path, the engine keeps
+    its own file next to it (memory.json → memory.jsonl / memory.sqlite3)
+    and migrates the array file across on first use.
+    """
+    kind = resolve_backend(filepath, backend)
+
+    if kind == "json":
+        return JsonArrayStore(filepath)
+
+    if kind == "journal":
+        root, ext = os.path.splitext(filepath)
+        if ext == ".jsonl":
+            return JournalStore(filepath, **options)
+        return JournalStore(f"{root}.jsonl", legacy_path=filepath, **options)
+
+    if kind == "sqlite":
+        root, ext = os.path.splitext(filepath)
+        if ext in (".sqlite3", ".sqlite", ".db"):
+            return SqliteStore(filepath, **options)
+        return SqliteStore(f"{root}.sqlite3", legacy_path=filepath, **options)
+
+    raise ValueError(f"Unknown memory backend: {kind!r}")
+
+
+def migrate_ledger(src_path: str, dst_path: str, backend: str = "journal") -> int:
+    """
+    One-shot copy of a JSON array ledger into another storage engine.
+    The source file is left untouched. Returns the number of entries moved.
+    """
+    with open(src_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    if backend == "journal":
+        _ensure_parent_dir(dst_path)
+        _write_jsonl(dst_path, entries)
+    else:
+        store = open_store(dst_path, backend)
+        store.rewrite(entries)
+        store.close()
+
+    log("MEMORY: Migrated %d entries from %s to %s", len(entries), src_path, dst_path)
+    return len(entries)
+
+
+def ledger_file(path: str, backend: Optional[str] = None) -> str:
+    """The file the chosen backend keeps for `path` (see open_store)."""
+    kind = resolve_backend(path, backend)
+    root, ext = os.path.splitext(path)
+    if kind == "journal" and ext != ".jsonl":
+        return f"{root}.jsonl"
+    if kind == "sqlite" and ext not in (".sqlite3", ".sqlite", ".db"):
+        return f"{root}.sqlite3"
+    return path
+
+
+def iter_ledger(path: str, backend: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Read a ledger entry by entry without opening a store. The journal and
+    SQLite ledgers are streamed; a JSON array has to be parsed whole.
+    """
+    kind = resolve_backend(path, backend)
+    target = ledger_file(path, backend)
+
+    if kind == "json":
+        with open(target, "r", encoding="utf-8") as f:
+            try:
+                entries = json.load(f)
+            except json.JSONDecodeError as e:
+                raise LedgerCorruptError(f"{target} cannot be parsed: {e}") from e
+        yield from entries
+
+    elif kind == "journal":
+        with open(target, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    elif kind == "sqlite":
+        conn = sqlite3.connect(target)
+        try:
+            cursor = conn.execute("SELECT record FROM entries ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for (record,) in rows:
+                    yield json.loads(record)
+        finally:
+            conn.close()
+
+    else:
+        raise ValueError(f"Unknown memory backend: {kind!r}")
+
+
+def write_ledger(
+    path: str,
+    entries: Iterable[Dict],
+    backend: Optional[str] = None,
+    overwrite: bool = False,
+) -> Tuple[str, int]:
+    """
+    Stream `entries` into a complete ledger in the backend's own format:
+    the JSON array exactly as JsonArrayStore writes it, one line per entry
+    for the journal, or a SqliteStore database with its FTS and tag
+    indexes. The file is built aside and swapped into place, so an
+    existing ledger (overwrite=True) is replaced whole or not at all.
+    Returns (file written, entries written).
+    """
+    kind = resolve_backend(path, backend)
+    if kind not in ("json", "journal", "sqlite"):
+        raise ValueError(f"Unknown memory backend: {kind!r}")
+    target = ledger_file(path, backend)
+    if os.path.exists(target) and not overwrite:
+        raise FileExistsError(f"{target} already exists")
+    _ensure_parent_dir(target)
+
+    count = 0
+
+    def counted():
+        nonlocal count
+        for entry in entries:
+            count += 1
+            yield entry
+
+    directory = os.path.dirname(target) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(target) + ".", suffix=".tmp", dir=directory)
+    try:
+        if kind == "sqlite":
+            os.close(fd)
+            os.unlink(tmp_path)
+            store = SqliteStore(tmp_path)
+            try:
+                store.rewrite(counted())
+            finally:
+                store.close()
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp_path + ".lock")
+            # A write-ahead log left by the old database must not be replayed into the new one
+            for suffix in ("-wal", "-shm"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(target + suffix)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                if kind == "journal":
+                    for entry in counted():
+                        f.write(json.dumps(entry) + "\n")
+                else:
+                    # json.dumps(entries, indent=2), one element at a time
+                    f.write("[")
+                    for entry in counted():
+                        f.write(",\n  " if count > 1 else "\n  ")
+                        f.write(json.dumps(entry, indent=2).replace("\n", "\n  "))
+                    f.write("\n]" if count else "]")
+        _copy_mode(tmp_path, target)
+        os.replace(tmp_path, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    return target, count
+
+
+def _write_jsonl(path: str, entries: Iterable[Dict], fsync: bool = False) -> None:
+    """Write a complete journal to a temp file, then swap it into place."""
+    _atomic_write(path, "".join(json.dumps(e) + "\n" for e in entries), fsync=fsync)
+
+
+def _atomic_write(path: str, text: str, fsync: bool = False) -> None:
+    """
+    Write `text` to a temp file in the same directory, then os.replace it
+    over `path`: readers see the old file or the new one, never a torn one.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        _copy_mode(tmp_path, path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _copy_mode(tmp_path: str, target: str) -> None:
+    """
+    Give a temp file about to replace `target` the target's permissions
+    (mkstemp creates it 0600), or those a plain open() would have given
+    a new file.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_umask()
+    os.chmod(tmp_path, mode)
+
+
+def _umask() -> int:
+    # os.umask can only be read by setting it
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def _salvage_array(text: str) -> List[Dict]:
+    """Decode the leading run of intact objects from a damaged JSON array."""
+    decoder = json.JSONDecoder()
+    entries: List[Dict] = []
+    pos = text.find("[") + 1
+    while pos > 0:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            obj, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(obj, dict):
+            entries.append(obj)
+    return entries
+
+
+def _file_signature(path: str):
+    """Cheap change marker for a ledger file: (mtime_ns, size)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _ensure_parent_dir(filepath: str) -> None:
+    parent = os.path.dirname(filepath)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate or repair a memory.json ledger.")
+    parser.add_argument("src", help="existing JSON array ledger")
+    parser.add_argument("dst", nargs="?", help="destination ledger path")
+    parser.add_argument("--backend", default="journal")
+    parser.add_argument(
+        "--recover",
+        action="store_true",
+        help="salvage a damaged ledger in place (the damaged file is kept aside)",
+    )
+    args = parser.parse_args()
+
+    if args.recover:
+        JsonArrayStore(args.src).recover()
+    elif args.dst:
+        migrate_ledger(args.src, args.dst, backend=args.backend)
+    else:
+        parser.error("a destination path is required unless --recover is given")
@@ -0,0 +1,178 @@
+# westmarch/core/tag_index.py
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, Iterator, List
+
+
+class TagQueryError(ValueError):
+    """Raised when a tag query cannot be parsed."""
+
+
+class TagIndex:
+    """
+    Posting bitmaps over ledger positions, one per tag.
+
+    Bit i of a tag's bitmap is set when entry i carries that tag. Python
+    ints serve as the bitmaps, so AND / OR / NOT across the whole ledger are
+    single C-level operations, whatever its size.
+
+    Query syntax (keywords are case-insensitive):
+
+        domain:gnome AND type:research NOT type:parlour
+        (domain:poetry OR domain:critique) AND auto
+        domain:*                      # any tag with that prefix
+
+    Adjacent terms are ANDed, and `A NOT B` reads as `A AND NOT B`.
+    """
+
+    def __init__(self):
+        self._bitmaps: Dict[str, int] = {}
+        self.size = 0
+
+    @classmethod
+    def build(cls, entries: Iterable[Dict]) -> "TagIndex":
+        # Set bits in mutable byte buffers first: OR-ing into a growing int
+        # per entry would copy the whole bitmap every time.
+        buffers: Dict[str, bytearray] = {}
+        size = 0
+        for position, entry in enumerate(entries):
+            byte, bit = divmod(position, 8)
+            for tag in entry.get("tags") or []:
+                buf = buffers.get(tag)
+                if buf is None:
+                    buf = buffers[tag] = bytearray()
+                if len(buf) <= byte:
+                    buf.extend(bytes(byte - len(buf) + 1))
+                buf[byte] |= 1 << bit
+            size = position + 1
+
+        index = cls()
+        index._bitmaps = {tag: int.from_bytes(buf, "little") for tag, buf in buffers.items()}
+        index.size = size
+        return index
+
+    def add(self, position: int, tags: Iterable[str]) -> None:
+        """Record the tags of the entry stored at `position`."""
+        bit = 1 << position
+        for tag in tags:
+            self._bitmaps[tag] = self._bitmaps.get(tag, 0) | bit
+        self.size = max(self.size, position + 1)
+
+    # ---------- lookups ----------
+
+    @property
+    def universe(self) -> int:
+        return (1 << self.size) - 1
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted(self._bitmaps)
+
+    def bitmap(self, tag: str) -> int:
+        if tag.endswith("*"):
+            prefix = tag[:-1]
+            result = 0
+            for name, bits in self._bitmaps.items():
+                if name.startswith(prefix):
+                    result |= bits
+            return result
+        return self._bitmaps.get(tag, 0)
+
+    def any_of(self, tags: Iterable[str]) -> int:
+        result = 0
+        for tag in tags:
+            result |= self.bitmap(tag)
+        return result
+
+    def query(self, expression: str) -> int:
+        """Evaluate a tag query to a bitmap of matching positions."""
+        return _Parser(self, expression).parse()
+
+    @staticmethod
+    def positions(bitmap: int) -> Iterator[int]:
+        """Yield the set bit positions of a bitmap in ascending order."""
+        bits = format(bitmap, "b")[::-1]
+        i = bits.find("1")
+        while i != -1:
+            yield i
+            i = bits.find("1", i + 1)
+
+
+# -----------------------------------------
+#   Query parser
+# -----------------------------------------
+
+_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+
+class _Parser:
+    """
+    Recursive-descent evaluator:
+
+        expr  := term ("OR" term)*
+        term  := unary (["AND"] unary | "NOT" unary)*
+        unary := "NOT" unary | "(" expr ")" | TAG
+    """
+
+    def __init__(self, index: TagIndex, expression: str):
+        self.index = index
+        self.tokens = _TOKEN.findall(expression)
+        self.pos = 0
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise TagQueryError("empty tag query")
+        result = self._expr()
+        if self.pos != len(self.tokens):
+            raise TagQueryError(f"unexpected {self.tokens[self.pos]!r} in tag query")
+        return result
+
+    def _peek(self):
+        if self.pos < len(self.tokens):
+            tok = self.tokens[self.pos]
+            return tok.upper() if tok.upper() in _KEYWORDS else tok
+        return None
+
+    def _take(self):
+        tok = self._peek()
+        self.pos += 1
+        return tok
+
+    def _expr(self) -> int:
+        result = self._term()
+        while self._peek() == "OR":
+            self._take()
+            result |= self._term()
+        return result
+
+    def _term(self) -> int:
+        result = self._unary()
+        while True:
+            tok = self._peek()
+            if tok == "AND":
+                self._take()
+                result &= self._unary()
+            elif tok == "NOT":
+                self._take()
+                result &= ~self._unary() & self.index.universe
+            elif tok is not None and tok not in (")", "OR"):
+                result &= self._unary()
+            else:
+                return result
+
+    def _unary(self) -> int:
+        tok = self._take()
+        if tok is None:
+            raise TagQueryError("tag query ends unexpectedly")
+        if tok == "NOT":
+            return ~self._unary() & self.index.universe
+        if tok == "(":
+            result = self._expr()
+            if self._take() != ")":
+                raise TagQueryError("missing ')' in tag query")
+            return result
+        if tok in (")", "AND", "OR"):
+            raise TagQueryError(f"unexpected {tok!r} in tag query")
+        return self.index.bitmap(tok)
@@ -1,7 +1,23 @@
 # westmarch/core/tagging.py
 from __future__ import annotations
 
-from typing import List, Optional, Set
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from westmarch.core import tracing
+from westmarch.core.logging import WARNING, log
+
+KEYWORDS_ENV_VAR = "WESTMARCH_DOMAIN_KEYWORDS"
+
+# How often (seconds) the keyword file is checked for changes
+RELOAD_INTERVAL = 2.0
+
+# Above this many phrases one compiled pass beats a substring test per phrase
+PHRASE_AUTOMATON_MIN = 100
 
 
 DOMAIN_KEYWORDS = {
@@ -70,39 +86,154 @@ DOMAIN_KEYWORDS = {
     ]
 }
 
-def infer_domains(text: str) -> set[str]:
+
+def trie_pattern(phrases: Iterable[str]) -> str:
     """
-    Infer semantic domains from a block of text.
+    One regex alternation shaped like a trie of the phrases: branches split
+    on distinct characters, so at most one is live at any point, and a
+    greedy optional tail makes the longest phrase at a position win.
+    """
+    root: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(root)
+
 
-    Improvements:
-    - Handles multi-word phrases cleanly.
-    - Uses whole-word matching for single tokens.
-    - Normalizes text for consistent comparisons.
+class DomainMatcher:
     """
-    t = text.lower()
+    A keyword table compiled for infer_domains.
 
-    # Normalized token set for whole-word matching
-    tokens = set(t.replace(",", " ").replace(".", " ").split())
+    - single words go into a token → domains hash map, so a text costs one
+      set intersection with its tokens however large the table
+    - phrases ("garden gnome") are substring tests, one per phrase of a
+      domain not yet found; past PHRASE_AUTOMATON_MIN phrases they are
+      compiled into one trie regex that finds them all in a single pass
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]]):
+        self.table: Dict[str, List[str]] = {domain: list(words) for domain, words in table.items()}
+
+        tokens: Dict[str, Set[str]] = {}
+        phrases: Dict[str, Set[str]] = {}
+        for domain, words in self.table.items():
+            for word in words:
+                word = word.lower()
+                (phrases if " " in word else tokens).setdefault(word, set()).add(domain)
+        self._tokens: Dict[str, FrozenSet[str]] = {w: frozenset(d) for w, d in tokens.items()}
+        self._token_set = frozenset(self._tokens)
+
+        self._phrases: List[Tuple[str, FrozenSet[str]]] = [(p, frozenset(d)) for p, d in phrases.items()]
+        self._automaton = None
+        if len(phrases) > PHRASE_AUTOMATON_MIN:
+            # The automaton reports the longest phrase at each position;
+            # every phrase inside it is in the text too
+            self._within = {
+                longest: frozenset(d for p, ds in phrases.items() if p in longest for d in ds)
+                for longest in phrases
+            }
+            self._automaton = re.compile(f"(?=({trie_pattern(phrases)}))")
+
+    def infer(self, text: str) -> Set[str]:
+        t = text.lower()
+        tokens = set(t.replace(",", " ").replace(".", " ").split())
+
+        found: Set[str] = set()
+        for token in tokens & self._token_set:
+            found |= self._tokens[token]
+
+        if self._automaton is not None:
+            for phrase in set(self._automaton.findall(t)):
+                found |= self._within[phrase]
+        else:
+            for phrase, domains in self._phrases:
+                if not domains <= found and phrase in t:
+                    found |= domains
+        return found
+
+
+def load_keywords(path: str) -> Dict[str, List[str]]:
+    """A keyword table from a JSON file: {"domain": ["keyword", ...], ...}."""
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    if not isinstance(table, dict) or not all(
+        isinstance(words, list) and all(isinstance(w, str) for w in words) for words in table.values()
+    ):
+        raise ValueError(f"{path} must map each domain to a list of keywords")
+    return table
+
+
+_matcher = DomainMatcher(DOMAIN_KEYWORDS)
+_reload_lock = threading.Lock()
+_keywords_path: Optional[str] = None
+_keywords_signature = None
+_next_check = 0.0
+
+
+def use_keywords(table: Mapping[str, Iterable[str]]) -> None:
+    """
+    Swap in a new keyword table. DOMAIN_KEYWORDS is updated in place so
+    code holding a reference to it sees the change.
+    """
+    global _matcher
+    matcher = DomainMatcher(table)
+    DOMAIN_KEYWORDS.clear()
+    DOMAIN_KEYWORDS.update(matcher.table)
+    _matcher = matcher
 
-    found: set[str] = set()
 
-    for domain, keywords in DOMAIN_KEYWORDS.items():
-        for kw in keywords:
-            kw_lower = kw.lower()
+def domain_matcher() -> DomainMatcher:
+    """
+    The compiled keyword table. When WESTMARCH_DOMAIN_KEYWORDS names a JSON
+    keyword file it replaces the built-in table, and edits to the file are
+    picked up (checked every RELOAD_INTERVAL seconds) without a restart.
+    A file that fails to load leaves the current table in place.
+    """
+    global _keywords_path, _keywords_signature, _next_check
+    path = os.getenv(KEYWORDS_ENV_VAR)
+    if not path or (path == _keywords_path and time.monotonic() < _next_check):
+        return _matcher
+
+    with _reload_lock:
+        _next_check = time.monotonic() + RELOAD_INTERVAL
+        try:
+            st = os.stat(path)
+            signature = (st.st_mtime_ns, st.st_size)
+            if path != _keywords_path or signature != _keywords_signature:
+                use_keywords(load_keywords(path))
+                log("TAGGING: Loaded %d keyword domains from %s", len(DOMAIN_KEYWORDS), path)
+                _keywords_signature = signature
+        except (OSError, ValueError) as e:
+            log("TAGGING: Keeping the current keyword table; %s could not be loaded → %s", path, e, level=WARNING)
+        _keywords_path = path
+    return _matcher
 
-            # Case 1: multi-word phrase (“garden gnome”)
-            if " " in kw_lower:
-                if kw_lower in t:       # non-fuzzy exact phrase match
-                    found.add(domain)
-                    break
 
-            # Case 2: single word (“gnome”, “fund”)
-            else:
-                if kw_lower in tokens:
-                    found.add(domain)
-                    break
+def infer_domains(text: str) -> set[str]:
+    """
+    Infer semantic domains from a block of text.
+
+    - Multi-word phrases match anywhere in the text ("garden gnome").
+    - Single words match whole tokens only (“gnome”, “fund”).
+    - Matching is case-insensitive; see DomainMatcher.
+    """
+    if not tracing.enabled():
+        return domain_matcher().infer(text)
+    with tracing.span("tagging.infer_domains", chars=len(text)) as span:
+        domains = domain_matcher().infer(text)
+        span.set(domains=sorted(domains))
+    return domains
 
-    return found
 
 def infer_tags_from_user_input(user_input: str | None) -> list[str]:
     """
@@ -0,0 +1,390 @@
+# westmarch/core/telemetry.py
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from westmarch.core import tracing
+
+LEDGER_ENV_VAR = "WESTMARCH_CALL_LEDGER"
+DEFAULT_LEDGER_PATH = "westmarch/data/llm_calls.jsonl"
+
+# List prices in USD per million tokens (input, output). Estimates only;
+# update as the providers change them.
+PRICES_PER_MTOK: Dict[str, Tuple[float, float]] = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+_workflow: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "westmarch_workflow", default=None
+)
+_call: contextvars.ContextVar[Optional["CallRecord"]] = contextvars.ContextVar(
+    "westmarch_call", default=None
+)
+
+
+@dataclass
+class CallRecord:
+    """
+    One ModelClient call as seen by the caller.
+
+    outcome is "ok", "cached" (answered by the ResponseCache), "backup"
+    (answered by the alternate provider, whose own call is recorded
+    separately with role "backup"), "error", or "cancelled" (a hedge's
+    losing request, or a stream the reader stopped early).
+    """
+
+    agent: str
+    provider: str
+    model: str
+    kind: str                      # "call", "acall" or "stream"
+    workflow: Optional[str] = None
+    role: str = "primary"
+    started_at: float = field(default_factory=time.time)
+    wall_time: float = 0.0
+    ttft: Optional[float] = None   # streams only: seconds to the first chunk
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
+    outcome: str = "ok"
+    error: Optional[str] = None
+
+
+def estimate_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    if model not in PRICES_PER_MTOK or prompt_tokens is None or completion_tokens is None:
+        return None
+    price_in, price_out = PRICES_PER_MTOK[model]
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1e6
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (0-1)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}s" for b in self.bounds] + [f">{self.bounds[-1]:g}s"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _Totals:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cached = 0
+        self.latency = Histogram()
+        self.ttft = Histogram()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        self.errors += record.outcome == "error"
+        self.cached += record.outcome == "cached"
+        # A hedge's backup overlaps its primary: count its spend, not its time
+        if record.role == "primary":
+            self.latency.observe(record.wall_time)
+            if record.ttft is not None:
+                self.ttft.observe(record.ttft)
+        self.prompt_tokens += record.prompt_tokens or 0
+        self.completion_tokens += record.completion_tokens or 0
+        self.cost_usd += record.cost_usd or 0.0
+
+    def merge(self, other: "_Totals") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.cached += other.cached
+        self.latency.merge(other.latency)
+        self.ttft.merge(other.ttft)
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cost_usd += other.cost_usd
+
+
+class Telemetry:
+    """
+    Collects CallRecords: aggregated in memory per (workflow, agent) and
+    appended to a JSONL call ledger that rotates at `max_bytes`, keeping
+    `backups` old files (llm_calls.jsonl.1, .2, ...). path=None keeps the
+    in-memory aggregates only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_LEDGER_PATH,
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 3,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[Optional[str], str], _Totals] = {}
+
+    def emit(self, record: CallRecord) -> None:
+        with self._lock:
+            key = (record.workflow, record.agent)
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = _Totals()
+            totals.add(record)
+            if self.path is not None:
+                self._append(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    def _append(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(line) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def summary(self, by: str = "workflow") -> List[Dict[str, Any]]:
+        """
+        Aggregates grouped by "workflow", "agent" or "both", most total
+        latency first.
+        """
+        with self._lock:
+            groups: Dict[Any, List[_Totals]] = {}
+            for (flow, agent), totals in self._totals.items():
+                key = {"workflow": flow, "agent": agent, "both": (flow, agent)}[by]
+                groups.setdefault(key, []).append(totals)
+
+            rows = []
+            for key, parts in groups.items():
+                merged = _Totals()
+                for part in parts:
+                    merged.merge(part)
+                rows.append({
+                    by: key,
+                    "calls": merged.calls,
+                    "errors": merged.errors,
+                    "cached": merged.cached,
+                    "prompt_tokens": merged.prompt_tokens,
+                    "completion_tokens": merged.completion_tokens,
+                    "cost_usd": merged.cost_usd,
+                    "latency": merged.latency.as_dict(),
+                    "ttft": merged.ttft.as_dict(),
+                })
+        return sorted(rows, key=lambda r: r["latency"]["total"], reverse=True)
+
+    def report(self, by: str = "workflow") -> str:
+        """Plain-text table of summary(by)."""
+        rows = self.summary(by)
+        labels = [" / ".join(map(str, r[by])) if by == "both" else str(r[by]) for r in rows]
+        width = max([len(by)] + [len(label) for label in labels])
+        lines = [f"{by:<{width}} {'calls':>5} {'err':>4} {'total s':>8} {'p95 s':>6} {'tokens':>8} {'cost $':>9}"]
+        for label, row in zip(labels, rows):
+            p95 = row["latency"]["p95"]
+            lines.append(
+                f"{label:<{width}} {row['calls']:>5} {row['errors']:>4} "
+                f"{row['latency']['total']:>8.2f} {'-' if p95 is None else f'{p95:g}':>6} "
+                f"{row['prompt_tokens'] + row['completion_tokens']:>8} {row['cost_usd']:>9.5f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+_default_telemetry: Optional[Telemetry] = None
+_default_lock = threading.Lock()
+
+
+def default_telemetry() -> Telemetry:
+    """
+    The process-wide collector. WESTMARCH_CALL_LEDGER overrides the ledger
+    path; "off" keeps the in-memory aggregates but writes no ledger.
+    """
+    global _default_telemetry
+    with _default_lock:
+        if _default_telemetry is None:
+            setting = os.getenv(LEDGER_ENV_VAR, "")
+            if setting.lower() in {"off", "0", "false", "no"}:
+                path = None
+            else:
+                path = setting or DEFAULT_LEDGER_PATH
+            _default_telemetry = Telemetry(path)
+        return _default_telemetry
+
+
+# ------- Tagging calls with their workflow -------
+
+def current_workflow() -> Optional[str]:
+    return _workflow.get()
+
+
+@contextmanager
+def workflow_scope(name: str):
+    """Tag every model call made inside the block with workflow `name`."""
+    token = _workflow.set(name)
+    try:
+        yield
+    finally:
+        _workflow.reset(token)
+
+
+def _scoped(var: contextvars.ContextVar, value: Any, iterator: Iterator) -> Iterator:
+    """Re-enter `var = value` around each step of a lazily consumed iterator."""
+    try:
+        while True:
+            token = var.set(value)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                var.reset(token)
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def workflow(name: str) -> Callable:
+    """
+    Decorator for orchestrator workflows: calls made while the method runs,
+    or while the stream it returns is consumed, are tagged with `name`,
+    and the whole of it is traced as a "workflow.<name>" span.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span = tracing.open_span(f"workflow.{name}", workflow=name)
+            try:
+                with workflow_scope(name), tracing.use(span):
+                    result = func(*args, **kwargs)
+            except BaseException as e:
+                tracing.finish(span, e)
+                raise
+            if isinstance(result, Iterator):
+                return _scoped(_workflow, name, tracing.bind(span, result))
+            tracing.finish(span)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+# ------- Recording calls -------
+
+def begin(client: Any, kind: str) -> CallRecord:
+    return CallRecord(
+        agent=client.agent_name,
+        provider=client.provider,
+        model=client.model_name,
+        kind=kind,
+        workflow=current_workflow(),
+        role=getattr(client, "role", "primary"),
+    )
+
+
+def end(record: CallRecord, started: float, error: Optional[BaseException] = None) -> None:
+    record.wall_time = time.perf_counter() - started
+    if error is not None:
+        stopped = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+        record.outcome = "cancelled" if stopped else "error"
+        record.error = str(error)
+    record.cost_usd = estimate_cost(record.model, record.prompt_tokens, record.completion_tokens)
+    default_telemetry().emit(record)
+
+
+@contextmanager
+def track(client: Any, kind: str):
+    """Record one call/acall; usage reported by note_usage() lands in the record."""
+    record = begin(client, kind)
+    started = time.perf_counter()
+    token = _call.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        end(record, started, e)
+        raise
+    else:
+        end(record, started)
+    finally:
+        _call.reset(token)
+
+
+def bind(record: CallRecord, iterator: Iterator) -> Iterator:
+    """Make `record` the current call while each item of `iterator` is produced."""
+    return _scoped(_call, record, iterator)
+
+
+def note_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    """Called by provider code with the token counts the API reported."""
+    record = _call.get()
+    if record is not None:
+        record.prompt_tokens = prompt_tokens
+        record.completion_tokens = completion_tokens
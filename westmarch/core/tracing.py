@@ -0,0 +1,417 @@
+# westmarch/core/tracing.py
+from __future__ import annotations
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Set to a file path to trace the whole process and write the trace there
+# at exit: "*.otlp.json" as OTLP JSON, anything else as Chrome trace events
+TRACE_ENV_VAR = "WESTMARCH_TRACE"
+
+# Finished spans kept per Tracer; later ones are counted in `dropped`
+MAX_SPANS = 200_000
+
+SERVICE_NAME = "westmarch"
+
+# Unix time in ns = this + perf_counter_ns(): wall-clock anchored, monotonic within the run
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "westmarch_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """
+    One timed operation. Spans opened while another is current become its
+    children and share its trace_id; the current span follows contextvars,
+    so it carries over into asyncio tasks and into threads started with
+    contextvars.copy_context().run (as the DAG executor and hedged calls do).
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    thread_id: int = 0
+    thread_name: str = ""
+    task: Optional[str] = None     # the asyncio task it ran in, if any
+    error: Optional[str] = None
+    tracer: Optional["Tracer"] = field(default=None, repr=False, compare=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        """Seconds, or 0.0 while still open."""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else 0.0
+
+
+class _NullSpan:
+    """What span() yields while tracing is off: accepts attributes, keeps nothing."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects finished spans and exports them."""
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+
+    def finished(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda s: s.start_ns)
+
+    # ---------- Chrome trace events (chrome://tracing, Perfetto) ----------
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Trace-event JSON: one complete ("X") event per span, on a track per
+        thread, or per asyncio task, so concurrent work shows side by side.
+        A child started on another track is joined to its parent by a flow
+        arrow.
+        """
+        spans = self.finished()
+        pid = os.getpid()
+        origin = min((s.start_ns for s in spans), default=0)
+        tracks: Dict[Tuple[int, Optional[str]], int] = {}
+        events: List[Dict[str, Any]] = []
+
+        def track(span: Span) -> int:
+            key = (span.thread_id, span.task)
+            if key not in tracks:
+                tid = tracks[key] = len(tracks) + 1
+                label = span.thread_name + (f" / {span.task}" if span.task else "")
+                events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": label}})
+                events.append(
+                    {"ph": "M", "name": "thread_sort_index", "pid": pid, "tid": tid, "args": {"sort_index": tid}}
+                )
+            return tracks[key]
+
+        def us(ns: int) -> float:
+            return (ns - origin) / 1e3
+
+        by_id = {s.span_id: s for s in spans}
+        events.append({"ph": "M", "name": "process_name", "pid": pid, "args": {"name": SERVICE_NAME}})
+        for flow, span in enumerate(spans, start=1):
+            tid = track(span)
+            args = {**span.attributes, "span_id": span.span_id, "trace_id": span.trace_id}
+            if span.error:
+                args["error"] = span.error
+            end_ns = span.end_ns if span.end_ns is not None else span.start_ns
+            events.append({
+                "ph": "X", "name": span.name, "cat": span.name.split(".")[0], "pid": pid, "tid": tid,
+                "ts": us(span.start_ns), "dur": (end_ns - span.start_ns) / 1e3, "args": args,
+            })
+            parent = by_id.get(span.parent_id)
+            if parent is not None and track(parent) != tid:
+                common = {"name": "spawn", "cat": "flow", "id": flow, "pid": pid, "ts": us(span.start_ns)}
+                events.append({**common, "ph": "s", "tid": track(parent)})
+                events.append({**common, "ph": "f", "bp": "e", "tid": tid})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}
+
+    # ---------- OTLP JSON (the OpenTelemetry protocol's JSON encoding) ----------
+
+    def otlp(self) -> Dict[str, Any]:
+        """An ExportTraceServiceRequest, as an OTLP/HTTP JSON collector would receive it."""
+        otlp_spans = []
+        for span in self.finished():
+            attributes = {**span.attributes, "thread.id": span.thread_id, "thread.name": span.thread_name}
+            if span.task:
+                attributes["asyncio.task"] = span.task
+            entry = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 3 if span.name.startswith(("model.", "provider.")) else 1,  # CLIENT / INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns if span.end_ns is not None else span.start_ns),
+                "attributes": [_otlp_attribute(k, v) for k, v in attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                entry["parentSpanId"] = span.parent_id
+            otlp_spans.append(entry)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "westmarch.core.tracing"}, "spans": otlp_spans}],
+            }]
+        }
+
+    def write(self, path: str, fmt: Optional[str] = None) -> str:
+        """
+        Write the trace to `path` as "chrome" or "otlp"; by default OTLP if
+        the name ends in .otlp.json, Chrome trace events otherwise.
+        """
+        fmt = fmt or ("otlp" if path.endswith(".otlp.json") else "chrome")
+        if fmt not in ("chrome", "otlp"):
+            raise ValueError(f"Unknown trace format '{fmt}' (expected 'chrome' or 'otlp')")
+        payload = self.chrome_trace() if fmt == "chrome" else self.otlp()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        return path
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    return {"key": key, "value": _otlp_value(value)}
+
+
+# ------- The active tracer -------
+
+_tracer: Optional[Tracer] = None
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def start(tracer: Optional[Tracer] = None) -> Tracer:
+    """Begin recording spans (into `tracer`, or a new one)."""
+    global _tracer
+    _tracer = tracer or Tracer()
+    return _tracer
+
+
+def stop() -> Optional[Tracer]:
+    """Stop recording; returns the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+@contextmanager
+def recording(tracer: Optional[Tracer] = None):
+    """Record spans for the duration of the block: with recording() as tracer: ..."""
+    global _tracer
+    previous = _tracer
+    tracer = start(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+
+
+# ------- Spans -------
+
+def _task_name() -> Optional[str]:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return None
+    return task.get_name() if task is not None else None
+
+
+def open_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Start a span as a child of the current one without making it current;
+    pair with finish(). None while tracing is off.
+    """
+    if _tracer is None:
+        return None
+    parent = _current.get()
+    thread = threading.current_thread()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}",
+        span_id=f"{random.getrandbits(64):016x}",
+        parent_id=parent.span_id if parent is not None else None,
+        start_ns=_EPOCH_NS + time.perf_counter_ns(),
+        attributes=attributes,
+        thread_id=thread.ident or 0,
+        thread_name=thread.name,
+        task=_task_name(),
+        tracer=_tracer,
+    )
+
+
+def finish(span: Optional[Span], error: Optional[BaseException] = None) -> None:
+    if span is None or span.end_ns is not None:
+        return
+    span.end_ns = _EPOCH_NS + time.perf_counter_ns()
+    if error is not None:
+        if isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            span.attributes["cancelled"] = True
+        else:
+            span.error = f"{type(error).__name__}: {error}"
+    if span.tracer is not None:
+        span.tracer.record(span)
+
+
+@contextmanager
+def use(span: Optional[Span]):
+    """Make an open span current for the block (spans opened inside become its children)."""
+    if span is None:
+        yield NULL_SPAN
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, **attributes: Any) -> "_SpanScope":
+    """
+    with span("memory.save", notes=3) as s: ...; s.set(bytes=...)
+
+    Times the block as a child of the current span, and as the parent of
+    spans opened inside it. While tracing is off `s` is NULL_SPAN and
+    nothing is recorded.
+    """
+    return _SpanScope(name, attributes)
+
+
+class _SpanScope:
+    __slots__ = ("name", "attributes", "_span", "_token")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self._span: Optional[Span] = None
+
+    def __enter__(self):
+        if _tracer is None:
+            return NULL_SPAN
+        self._span = open_span(self.name, **self.attributes)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._span is not None:
+            _current.reset(self._token)
+            finish(self._span, exc)
+
+
+def current() -> Any:
+    """The current span, or NULL_SPAN; current().set(...) annotates it either way."""
+    active = _current.get() if _tracer is not None else None
+    return active if active is not None else NULL_SPAN
+
+
+def bind(span: Optional[Span], iterator: Iterator) -> Iterator:
+    """
+    Keep `span` current while each item of a lazily consumed iterator is
+    produced, and finish it once the iterator is exhausted, fails or is
+    closed, so a streamed reply is timed until its last chunk.
+    """
+    if span is None:
+        return iterator
+    return _bound(span, iterator)
+
+
+def _bound(span: Span, iterator: Iterator) -> Iterator:
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            token = _current.set(span)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield item
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        finish(span, error)
+
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """Decorator: run each call of the function (sync or async) in a span."""
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def awrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with span(name, **attributes):
+                    return await func(*args, **kwargs)
+
+            return awrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ------- Whole-process tracing from the environment -------
+
+def _write_at_exit(path: str) -> None:
+    tracer = stop()
+    if tracer is not None and tracer.spans:
+        tracer.write(path)
+
+
+if os.getenv(TRACE_ENV_VAR):
+    start()
+    atexit.register(_write_at_exit, os.environ[TRACE_ENV_VAR])
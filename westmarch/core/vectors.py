@@ -0,0 +1,379 @@
+# westmarch/core/vectors.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from westmarch.core.ann import IVFIndex
+from westmarch.core.ranking import tokenize
+from westmarch.core.tagging import DOMAIN_KEYWORDS
+
+
+# Words that point at a household topic without naming it. Together with
+# the single-word DOMAIN_KEYWORDS they become shared "concept" features, so
+# "that nocturnal ornament business" lands near the gnome notes even though
+# it has no word in common with them.
+RELATED_TERMS: Dict[str, List[str]] = {
+    "gnome": [
+        "ornament", "figurine", "statue", "statuette", "garden", "lawn",
+        "hedge", "flowerbed", "nocturnal", "night", "midnight", "moonlit",
+        "wander", "wandering", "moved", "neighbour", "neighbours",
+    ],
+    "poetry": ["poem", "poet", "rhyme", "lyric", "ode", "moon", "literature"],
+    "finance": ["money", "savings", "shares", "bond", "bonds", "dividend", "wealth"],
+    "weather": ["storm", "drizzle", "fog", "snow", "sunshine", "umbrella"],
+    "schedule": ["tomorrow", "today", "morning", "afternoon", "errand", "diary"],
+    "drafting": ["reply", "message", "invitation", "memo", "neighbours"],
+    "research": ["study", "findings", "evidence", "comparison", "examine"],
+    "history": ["ancestor", "ancestral", "manor", "century", "records", "lineage"],
+    "parlour": ["tea", "chatter", "gossip", "pleasantries"],
+    "critique": ["review", "verdict", "feedback", "criticism"],
+    "sports": ["game", "racket", "cricket", "player", "champion"],
+}
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def _concept_lexicon() -> Dict[str, List[str]]:
+    lexicon: Dict[str, List[str]] = {}
+    for domain, words in DOMAIN_KEYWORDS.items():
+        for word in words + RELATED_TERMS.get(domain, []):
+            if " " not in word:
+                lexicon.setdefault(_stem(word), []).append(domain)
+    return lexicon
+
+
+class HashingEmbedder:
+    """
+    Offline text → vector mapping: signed feature hashing of words,
+    character trigrams (so "ornaments" still meets "ornamental") and domain
+    concepts. crc32 keeps bucket choice stable across processes, which
+    matters once vectors are persisted.
+    """
+
+    def __init__(
+        self,
+        dim: int = 256,
+        trigram_weight: float = 0.25,
+        concept_weight: float = 2.0,
+    ):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+        self.concept_weight = concept_weight
+        self._lexicon = _concept_lexicon()
+        # Words repeat endlessly across a ledger, so each word's hashed
+        # features are worked out once: (bucket indices, signed weights).
+        self._word_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def features(self, word: str) -> Dict[str, float]:
+        stem = _stem(word)
+        padded = f"<{stem}>"
+        feats: Dict[str, float] = {"w:" + stem: 1.0}
+        for i in range(len(padded) - 2):
+            key = "c:" + padded[i:i + 3]
+            feats[key] = feats.get(key, 0.0) + self.trigram_weight
+        for domain in self._lexicon.get(stem, ()):
+            feats["d:" + domain] = self.concept_weight
+        return feats
+
+    def _hashed(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        hashed = self._word_cache.get(word)
+        if hashed is None:
+            indices, weights = [], []
+            for feature, weight in self.features(word).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                indices.append(h % self.dim)
+                weights.append(weight if h & 0x80000000 else -weight)
+            hashed = self._word_cache[word] = (
+                np.array(indices, dtype=np.int64),
+                np.array(weights, dtype=np.float64),
+            )
+        return hashed
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        One row per text, not yet normalised. Each distinct word counts
+        1 + log(tf) times its features, accumulated with a single bincount.
+        """
+        indices, weights, scales, lengths = [], [], [], []
+        rows = 0
+        for row, text in enumerate(texts):
+            rows = row + 1
+            for word, tf in Counter(tokenize(text)).items():
+                idx, w = self._hashed(word)
+                indices.append(idx + row * self.dim)
+                weights.append(w)
+                scales.append(1.0 + math.log(tf))
+                lengths.append(len(idx))
+
+        if not indices:
+            return np.zeros((rows, self.dim), dtype=np.float32)
+
+        flat = np.concatenate(indices)
+        values = np.concatenate(weights) * np.repeat(scales, lengths)
+        summed = np.bincount(flat, weights=values, minlength=rows * self.dim)
+        return summed.astype(np.float32).reshape(rows, self.dim)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+
+class VectorIndex:
+    """
+    Semantic candidate generator over the memory ledger.
+
+    - one float32 row per entry in a single contiguous matrix (grown by
+      doubling), L2-normalised when the entry is written
+    - document frequencies are kept per hash bucket; IDF is applied to the
+      query only, so earlier rows never need re-weighting
+    - a query is one matrix-vector product plus argpartition for top-k
+    - rows are persisted next to the ledger as raw float32 (`.vec`) plus a
+      small JSON header (`.vec.json`); new rows are appended to the file
+      rather than rewriting it
+    - from `ann_threshold` rows up, queries go through an IVF index
+      (ann.py) probing `nprobe` clusters instead of scanning every row
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        embedder: Optional[HashingEmbedder] = None,
+        ann_threshold: int = 50_000,
+        nprobe: int = 32,
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self._matrix = np.zeros((64, self.dim), dtype=np.float32)
+        self._df = np.zeros(self.dim, dtype=np.int64)
+        self._count = 0
+        self._saved = 0  # rows known to be in the vector file
+        self._ivf: Optional[IVFIndex] = None
+        self._ivf_saved = True
+
+    @property
+    def size(self) -> int:
+        return self._count
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self._count]
+
+    @staticmethod
+    def _text(entry: Dict) -> str:
+        return " ".join([entry.get("content", "") or ""] + list(entry.get("tags") or []))
+
+    def _rows(self, entries: List[Dict]) -> np.ndarray:
+        rows = self.embedder.embed_many(self._text(e) for e in entries)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        np.divide(rows, norms, out=rows, where=norms > 0)
+        return rows
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= len(self._matrix):
+            return
+        capacity = max(rows, 2 * len(self._matrix))
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self._count] = self._matrix[:self._count]
+        self._matrix = grown
+
+    def _append_rows(self, rows: np.ndarray) -> None:
+        self._reserve(self._count + len(rows))
+        self._matrix[self._count:self._count + len(rows)] = rows
+        self._df += np.count_nonzero(rows, axis=0)
+        self._count += len(rows)
+        if self._ivf is not None:
+            self._ivf.extend(rows)
+
+    @classmethod
+    def build(
+        cls,
+        entries: Iterable[Dict],
+        ann_threshold: int = 50_000,
+        nprobe: int = 32,
+        **options,
+    ) -> "VectorIndex":
+        index = cls(HashingEmbedder(**options), ann_threshold=ann_threshold, nprobe=nprobe)
+        index.extend(entries)
+        return index
+
+    def extend(self, entries: Iterable[Dict], batch: int = 2048) -> None:
+        entries = list(entries)
+        for start in range(0, len(entries), batch):
+            self._append_rows(self._rows(entries[start:start + batch]))
+
+    def add(self, position: int, entry: Dict) -> None:
+        """Embed and store the entry at `position` (positions arrive in order)."""
+        if position != self._count:
+            raise ValueError(f"VectorIndex expected position {self._count}, got {position}")
+        self._append_rows(self._rows([entry]))
+
+    def query_vector(self, text: str) -> np.ndarray:
+        vec = self.embedder.embed(text)
+        if self._count:
+            vec *= np.log1p(self._count / (self._df + 1.0)).astype(np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    @property
+    def ann(self) -> Optional[IVFIndex]:
+        return self._ivf
+
+    def refresh_ann(self) -> None:
+        """
+        Train the IVF index once the ledger reaches `ann_threshold` rows,
+        and retrain it after the ledger has quadrupled since (new rows are
+        filed under existing clusters in between).
+        """
+        if self._count < self.ann_threshold:
+            self._ivf = None
+            return
+        if self._ivf is None or self._count > 4 * self._ivf.trained_size:
+            self._ivf = IVFIndex.train(self.matrix, nprobe=self.nprobe)
+            self._ivf_saved = False
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        min_score: float = 0.05,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[float, int]]:
+        """
+        Return up to k (cosine, position) pairs, best first. Large indexes
+        answer approximately through IVF unless `exact` is set; `nprobe`
+        overrides how many clusters are searched.
+        """
+        if not self._count:
+            return []
+        q = self.query_vector(query)
+        if not q.any():
+            return []
+
+        if self._ivf is not None and not exact:
+            top, scores = self._ivf.search(q, k=k, nprobe=nprobe or self.nprobe)
+            return [(float(s), int(i)) for i, s in zip(top, scores) if s >= min_score]
+
+        scores = self.matrix @ q
+        k = min(k, self._count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[i]), int(i)) for i in top if scores[i] >= min_score]
+
+    # ---------- persistence ----------
+
+    @staticmethod
+    def paths(ledger_path: str) -> Tuple[str, str]:
+        base = os.path.splitext(ledger_path)[0]
+        return base + ".vec", base + ".vec.json"
+
+    def _header(self, entries: List[Dict]) -> Dict:
+        last = entries[self._count - 1] if self._count else {}
+        return {
+            "version": self.VERSION,
+            "dim": self.dim,
+            "trigram_weight": self.embedder.trigram_weight,
+            "concept_weight": self.embedder.concept_weight,
+            "rows": self._count,
+            "last": _fingerprint(last),
+        }
+
+    def persist(self, ledger_path: str, entries: List[Dict]) -> None:
+        """
+        Bring the vector file up to date: rows not yet on disk are appended,
+        or the whole file is rewritten if it no longer lines up.
+        """
+        data_path, header_path = self.paths(ledger_path)
+        if self._ivf is not None and not self._ivf_saved:
+            self._ivf.save(ledger_path, self.matrix)
+            self._ivf_saved = True
+        if self._saved == self._count and os.path.exists(header_path):
+            return
+
+        row_bytes = 4 * self.dim
+        try:
+            on_disk = os.path.getsize(data_path)
+        except OSError:
+            on_disk = -1
+
+        if 0 < self._saved and on_disk == self._saved * row_bytes:
+            with open(data_path, "ab") as f:
+                self._matrix[self._saved:self._count].tofile(f)
+        else:
+            tmp = data_path + ".tmp"
+            self.matrix.tofile(tmp)
+            os.replace(tmp, data_path)
+        self._saved = self._count
+        _write_header(header_path, self._header(entries))
+
+    @classmethod
+    def load(
+        cls,
+        ledger_path: str,
+        entries: List[Dict],
+        ann_threshold: int = 50_000,
+        nprobe: int = 32,
+        **options,
+    ) -> Optional["VectorIndex"]:
+        """
+        Load persisted vectors for `entries` and embed any entries saved
+        since. Returns None when there is nothing usable on disk (missing,
+        different settings, or the ledger was rewritten underneath it).
+        """
+        data_path, header_path = cls.paths(ledger_path)
+        try:
+            with open(header_path, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            rows = np.fromfile(data_path, dtype=np.float32)
+        except (OSError, ValueError):
+            return None
+
+        embedder = HashingEmbedder(**options)
+        wanted = {
+            "version": cls.VERSION,
+            "dim": embedder.dim,
+            "trigram_weight": embedder.trigram_weight,
+            "concept_weight": embedder.concept_weight,
+        }
+        if any(header.get(key) != value for key, value in wanted.items()):
+            return None
+
+        count = header.get("rows", 0)
+        if rows.size != count * embedder.dim or count > len(entries):
+            return None
+        if count and header.get("last") != _fingerprint(entries[count - 1]):
+            return None
+
+        index = cls(embedder, ann_threshold=ann_threshold, nprobe=nprobe)
+        if count:
+            index._append_rows(rows.reshape(count, embedder.dim))
+            index._saved = count
+            if count >= ann_threshold:
+                index._ivf = IVFIndex.load(ledger_path, index.matrix, nprobe=nprobe)
+        index.extend(entries[count:])
+        return index
+
+
+def _fingerprint(entry: Dict) -> str:
+    if not entry:
+        return ""
+    blob = f"{entry.get('timestamp', '')}\x00{entry.get('content', '')}"
+    return format(zlib.crc32(blob.encode("utf-8")), "08x")
+
+
+def _write_header(path: str, header: Dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    os.replace(tmp, path)
@@ -0,0 +1,199 @@
+# westmarch/orchestrator/dag.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from westmarch.core import tracing
+from westmarch.core.logging import DEBUG, enabled, log
+from westmarch.core.models import run_sync
+
+
+@dataclass
+class Step:
+    """
+    One node of a Workflow. `func` is called with the results of its
+    `inputs` as keyword arguments; it may be a plain function (run on the
+    default thread pool) or a coroutine function (awaited on the loop).
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+
+
+@dataclass
+class WorkflowRun:
+    """Results and timings of one Workflow execution."""
+
+    workflow: str
+    results: Dict[str, Any] = field(default_factory=dict)
+    # step name -> (start, end), seconds since the run began
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    inputs: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    @property
+    def sequential_time(self) -> float:
+        """What the run would have taken with every step in series."""
+        return sum(end - start for start, end in self.timings.values())
+
+    def critical_path(self) -> List[str]:
+        """
+        The chain of steps that bounded the wall-clock time: start from the
+        step that finished last and keep following whichever input finished
+        last.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            deps = [d for d in self.inputs.get(name, ()) if d in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def trace(self) -> str:
+        """Human-readable timeline with the critical path marked '*'."""
+        critical = set(self.critical_path())
+        order = sorted(self.timings, key=lambda n: self.timings[n])
+        width = max((len(n) for n in order), default=4)
+        lines = [f"{self.workflow}: {len(order)} steps"]
+        for name in order:
+            start, end = self.timings[name]
+            mark = "*" if name in critical else " "
+            lines.append(
+                f" {mark} {name:<{width}}  {start * 1e3:8.1f}ms → {end * 1e3:8.1f}ms  ({(end - start) * 1e3:7.1f}ms)"
+            )
+        saving = self.sequential_time - self.wall_time
+        lines.append(
+            f"wall {self.wall_time * 1e3:.1f}ms vs sequential {self.sequential_time * 1e3:.1f}ms "
+            f"(saved {saving * 1e3:.1f}ms); critical path: {' → '.join(self.critical_path())}"
+        )
+        return "\n".join(lines)
+
+
+class Workflow:
+    """
+    A small dependency-graph executor.
+
+    Steps declare the names of the results they need; those are either
+    other steps or the initial values passed to `run()`. Every step whose
+    inputs are ready is started at once, so independent branches overlap,
+    and each step runs exactly once per run however many steps consume it.
+    `max_concurrency=1` reproduces a strictly sequential execution.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps: Dict[str, Step] = {}
+
+    def step(self, name: str, func: Callable[..., Any], inputs: Tuple[str, ...] = ()) -> "Workflow":
+        if name in self.steps:
+            raise ValueError(f"Workflow '{self.name}' already has a step named '{name}'")
+        self.steps[name] = Step(name, func, tuple(inputs))
+        return self
+
+    def run(
+        self,
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        **initial: Any,
+    ) -> WorkflowRun:
+        return run_sync(self.arun(max_concurrency=max_concurrency, on_result=on_result, **initial))
+
+    async def arun(
+        self,
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        **initial: Any,
+    ) -> WorkflowRun:
+        """
+        Execute every step. `on_result(name, result)` is called as each
+        step finishes, for callers that want results before the whole run.
+        """
+        self._check(initial)
+
+        run = WorkflowRun(self.name, results=dict(initial))
+        run.inputs = {name: step.inputs for name, step in self.steps.items()}
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(step: Step) -> Any:
+            for dep in step.inputs:
+                if dep in tasks:
+                    await tasks[dep]
+            kwargs = {dep: run.results[dep] for dep in step.inputs}
+
+            if limit is not None:
+                await limit.acquire()
+            try:
+                begin = time.perf_counter() - started
+                if inspect.iscoroutinefunction(step.func):
+                    with tracing.span(f"step.{step.name}", workflow=self.name):
+                        result = await step.func(**kwargs)
+                else:
+                    # Run in a copy of this context so the step keeps its telemetry tags
+                    # and its span is a child of the workflow's
+                    context = contextvars.copy_context()
+                    result = await loop.run_in_executor(None, lambda: context.run(self._call_step, step, kwargs))
+                run.timings[step.name] = (begin, time.perf_counter() - started)
+            finally:
+                if limit is not None:
+                    limit.release()
+
+            run.results[step.name] = result
+            if on_result is not None:
+                on_result(step.name, result)
+            return result
+
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.ensure_future(execute(step))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        run.wall_time = time.perf_counter() - started
+        if enabled(DEBUG):
+            for line in run.trace().splitlines():
+                log("WORKFLOW: %s", line, level=DEBUG)
+        return run
+
+    def _call_step(self, step: Step, kwargs: Dict[str, Any]) -> Any:
+        with tracing.span(f"step.{step.name}", workflow=self.name):
+            return step.func(**kwargs)
+
+    def _check(self, initial: Dict[str, Any]) -> None:
+        """Reject unknown inputs and cycles before anything runs."""
+        for step in self.steps.values():
+            for dep in step.inputs:
+                if dep not in self.steps and dep not in initial:
+                    raise ValueError(f"Step '{step.name}' needs '{dep}', which nothing provides")
+
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Workflow '{self.name}' has a cycle through '{name}'")
+            state[name] = 1
+            for dep in self.steps[name].inputs:
+                if dep in self.steps:
+                    visit(dep)
+            state[name] = 2
+
+        for name in self.steps:
+            visit(name)
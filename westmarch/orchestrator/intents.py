@@ -0,0 +1,158 @@
+# westmarch/orchestrator/intents.py
+from __future__ import annotations
+
+import functools
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Set
+
+from westmarch.core.tagging import trie_pattern
+
+# Routing cues for classify_task, highest priority first
+TASK_CUES: Dict[str, List[str]] = {
+    "conversation": [
+        "jeeves", "old chap", "my good man", "my dear fellow", "hello", "hi there",
+        "good morning", "good evening", "let us discuss", "i wonder", "i say",
+    ],
+    "planning": ["plan my day", "schedule"],
+    "research": ["research", "difference", "compare", "investigate"],
+    "drafting": ["email", "rewrite", "draft", "compose"],
+    "critique": ["critique", "review", "opinion on", "how does this read"],
+    "mixed": ["project", "trip", "itinerary", "plan a trip"],
+}
+
+# Phrases that close each workflow without a new model call
+CLOSURE_PHRASES: Dict[str, List[str]] = {
+    "parlour_discussion": [
+        "thank you", "that will do", "that will be all", "that will suffice", "you may go",
+        "very good", "excellent, thank you", "splendid, thank you", "most helpful",
+        "quite helpful", "much obliged", "carry on", "as you were", "that's all jeeves",
+        "thank you jeeves", "dismissed",
+    ],
+    "daily_planning": [
+        "thank you", "that will be all", "this will do nicely", "that will do nicely",
+        "this looks good", "that looks good", "perfect", "excellent", "very good",
+        "that will do", "this will do", "thank you, jeeves",
+    ],
+    "quick_research": [
+        "thank you", "that will do", "that will be all", "that will suffice", "you may go",
+        "very good", "excellent, thank you", "splendid, thank you", "most helpful",
+        "quite helpful", "much obliged", "carry on", "as you were", "that's all perkins",
+        "thank you, perkins", "dismissed",
+    ],
+    "draft_short_text": [
+        "thank you", "that will do", "that will be all", "that will suffice", "you may go",
+        "very good", "excellent, thank you", "splendid, thank you", "most helpful",
+        "quite helpful", "much obliged", "carry on", "as you were",
+        "that's all miss pennington", "thank you, miss pennington", "dismissed",
+    ],
+    "query_archive": [
+        "that will suffice", "that will do nicely", "this will do nicely", "splendid",
+        "excellent, thank you", "my compliments", "that will be all",
+    ],
+    "critique_text": [
+        "thank you", "that will do", "that will suffice", "very well", "fine, thank you",
+        "fine thank you", "excellent, thank you", "alright then", "okay then", "appreciated",
+        "much obliged",
+    ],
+    "whole_household": [
+        "thank you", "my thanks", "that will do", "that will suffice", "very well",
+        "fine, thank you", "fine thank you", "excellent, thank you", "alright then",
+        "okay then", "appreciated", "much obliged",
+    ],
+    "recall_memory": [
+        "thank you", "my thanks", "that will do", "that will suffice", "that will be all",
+        "very well", "fine, thank you", "fine thank you", "excellent, thank you",
+        "alright then", "okay then", "appreciated", "much obliged",
+    ],
+}
+
+# Drafting requests often carry closure words ("a thank you note to the
+# vicar"), so there only a message that *is* a closure phrase counts
+EXACT_CLOSURE = {"draft_short_text"}
+
+# Cues that a drafting request is a rewrite of the user's own text
+REWRITE_CUES = [
+    "rewrite", "polish", "improve", "edit", "revise", "tidy", "fix this", "clean this",
+    "turn this", "rework",
+]
+
+
+def normalize(text: str) -> str:
+    return text.lower().replace("’", "'")
+
+
+class IntentEngine:
+    """
+    Every phrase of every intent compiled into a single automaton.
+
+    scan() finds, in one pass over the text, every phrase starting at a
+    word boundary ("edit" matches "editing" but not "credit"), and returns
+    the names of all intents owning one. match() is scan() memoized, so
+    the router and the workflow it picks share a single pass. view() gives
+    a workflow its own predicate over one intent.
+    """
+
+    def __init__(self, intents: Mapping[str, Iterable[str]], cache_size: int = 1024):
+        self.phrases: Dict[str, FrozenSet[str]] = {
+            name: frozenset(normalize(p) for p in phrases) for name, phrases in intents.items()
+        }
+        owners: Dict[str, Set[str]] = {}
+        for name, phrases in self.phrases.items():
+            for phrase in phrases:
+                owners.setdefault(phrase, set()).add(name)
+
+        # The automaton reports the longest phrase at each position; every
+        # shorter phrase starting on a word inside it occurs in the text too
+        self._intents_within: Dict[str, FrozenSet[str]] = {
+            longest: frozenset(
+                name
+                for phrase, names in owners.items()
+                if re.search(rf"(?<!\w){re.escape(phrase)}", longest)
+                for name in names
+            )
+            for longest in owners
+        }
+        self._pattern = re.compile(rf"(?<!\w)(?=({trie_pattern(owners)}))")
+        self.match = functools.lru_cache(maxsize=cache_size)(self.scan)
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Names of every intent with a phrase in `text`."""
+        found: Set[str] = set()
+        for phrase in set(self._pattern.findall(normalize(text))):
+            found |= self._intents_within[phrase]
+        return frozenset(found)
+
+    def view(self, intent: str, exact: bool = False) -> "IntentView":
+        if intent not in self.phrases:
+            raise KeyError(f"Unknown intent '{intent}'")
+        return IntentView(self, intent, exact)
+
+
+class IntentView:
+    """
+    One intent of an engine as a predicate. With exact=True only a message
+    that is itself one of the phrases matches.
+    """
+
+    def __init__(self, engine: IntentEngine, intent: str, exact: bool = False):
+        self.engine = engine
+        self.intent = intent
+        self.exact = exact
+
+    def matches(self, text: str) -> bool:
+        if self.exact:
+            return normalize(text).strip() in self.engine.phrases[self.intent]
+        return self.intent in self.engine.match(text)
+
+
+INTENTS = IntentEngine({
+    **{f"task:{task}": cues for task, cues in TASK_CUES.items()},
+    **{f"closure:{flow}": phrases for flow, phrases in CLOSURE_PHRASES.items()},
+    "rewrite": REWRITE_CUES,
+})
+
+CLOSURES: Dict[str, IntentView] = {
+    flow: INTENTS.view(f"closure:{flow}", exact=flow in EXACT_CLOSURE) for flow in CLOSURE_PHRASES
+}
+
+REWRITE = INTENTS.view("rewrite")
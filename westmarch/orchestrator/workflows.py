@@ -2,17 +2,30 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+import contextvars
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Union
 
 from westmarch.core.messages import AgentMessage, Context, TaskType, Constraints
 from westmarch.agents.jeeves import JeevesAgent
 from westmarch.agents.perkins import PerkinsAgent
 from westmarch.agents.miss_pennington import MissPenningtonAgent
 from westmarch.agents.lady_hawthorne import LadyHawthorneAgent
-from westmarch.core.logging import log
+from westmarch.core import telemetry
+from westmarch.core.logging import (
+    DEBUG, ERROR, WARNING, bind_context, enabled, log, log_context, new_request_id,
+)
+from westmarch.core.memory import SEMANTIC_MIN_SCORE
+from westmarch.core.resilience import ProviderError, ProviderUnavailable
 from westmarch.core.tagging import infer_domains
+from westmarch.orchestrator.dag import Workflow, WorkflowRun
+from westmarch.orchestrator.intents import CLOSURES, REWRITE
 
 class WestmarchOrchestrator:
+    # Tasks that can return their reply as a stream of chunks
+    STREAMING_TASKS = {"parlour_discussion", "research", "drafting", "critique"}
+
     def __init__(
         self,
         jeeves: JeevesAgent,
@@ -25,6 +38,11 @@ class WestmarchOrchestrator:
         self.pennington = pennington
         self.hawthorne = hawthorne
 
+        # Timings of the most recent graph-executed workflow (see dag.py);
+        # workflow_concurrency=1 runs those graphs one step at a time
+        self.last_workflow_run: Optional[WorkflowRun] = None
+        self.workflow_concurrency: Optional[int] = None
+
     def _context(self, user_input: str, previous_outputs=None, selected_mode: str = None) -> Context:
         return Context(
             original_user_request=user_input,
@@ -32,44 +50,80 @@ class WestmarchOrchestrator:
             selected_mode=selected_mode,
         )
 
+    def _reply(self, agent, msg: AgentMessage, archive: Callable[[str], None], stream: bool):
+        """
+        Get an agent's reply to `msg` and hand the finished text to `archive`.
+
+        With stream=True this returns an iterator of chunks instead, and
+        `archive` runs once the last chunk has been consumed.
+        """
+        if stream:
+            return self._stream_then_archive(agent, msg, archive)
+        reply = agent.run(msg)
+        archive(reply)
+        return reply
+
+    @staticmethod
+    def _stream_then_archive(agent, msg: AgentMessage, archive: Callable[[str], None]) -> Iterator[str]:
+        parts = []
+        for chunk in agent.stream(msg):
+            parts.append(chunk)
+            yield chunk
+        archive("".join(parts))
+
+    @staticmethod
+    def provider_apology(error: ProviderError) -> str:
+        """Jeeves's account of a model call that could not be completed."""
+        who = error.agent.title()
+        if isinstance(error, ProviderUnavailable):
+            why = "the line has been so unreliable of late that I have not troubled it again just yet"
+        elif error.transient:
+            why = "the line remained engaged despite several attempts"
+        else:
+            why = "the request was declined outright"
+        return (
+            f"*Clears throat apologetically* \n\nI regret to report, sir, that {who} could not be "
+            f"reached: {why}. Nothing has been entered in the archive. Perhaps we might try again "
+            f"in a little while."
+        )
+
+    def _guard_stream(self, chunks: Iterator[str]) -> Iterator[str]:
+        """Pass a reply stream through, ending it with an apology if the provider fails."""
+        try:
+            yield from chunks
+        except ProviderError as e:
+            log("ORCHESTRATOR: %s", e, level=ERROR)
+            yield "\n\n" + self.provider_apology(e)
+
+    @staticmethod
+    def _canned(text: str, stream: bool):
+        """A fixed reply, shaped like _reply()'s result."""
+        return iter([text]) if stream else text
+
     # ------- Tier 1 Workflows -------
 
-    def parlour_discussion(self, user_input: str, selected_mode: str = None) -> str:
+    @telemetry.workflow("parlour_discussion")
+    def parlour_discussion(
+        self, user_input: str, selected_mode: str = None, stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         General conversation in the parlour.
 
         - Jeeves responds as conversational butler.
         - Context includes recent memory (parlour notes, staff roster, etc.).
         - Miss Pennington archives a short note in long-term memory.
+
+        With stream=True the reply comes back as an iterator of chunks and
+        is archived once fully read.
         """
         log("WORKFLOW: Parlour discussion initiated")
 
         # Approval / closure detection
-        lower = user_input.strip().lower()
-
-        closure_phrases = [
-            "thank you",
-            "that will do",
-            "that will be all",
-            "that will suffice",
-            "you may go",
-            "very good",
-            "excellent, thank you",
-            "splendid, thank you",
-            "most helpful",
-            "quite helpful",
-            "much obliged",
-            "carry on",
-            "as you were",
-            "that's all jeeves",
-            "thank you jeeves",
-            "dismissed",
-        ]
-
-        if any(p in lower for p in closure_phrases):
-            return (
+        if CLOSURES["parlour_discussion"].matches(user_input):
+            return self._canned(
                 "Certainly, sir. I shall retire to the wing, "
-                "but will attend instantly if called."
+                "but will attend instantly if called.",
+                stream,
             )
 
         # Build context that includes recent exchanges + memory
@@ -101,37 +155,38 @@ class WestmarchOrchestrator:
             ),
         )
 
-        jeeves_reply = self.jeeves.run(msg)
-        log("WORKFLOW: Parlour discussion reply generated")
+        def archive(jeeves_reply: str) -> None:
+            log("WORKFLOW: Parlour discussion reply generated")
 
-        # --- NEW: Attach only workflow-specific tags ---
-        # Domain tags will now be inferred *only* inside Miss Pennington’s save_note()
-        # based on the user_input tracked there.
-        # Here we add ONLY the workflow label, never domain labels.
-        extra_tags = ["type:parlour"]
+            # --- NEW: Attach only workflow-specific tags ---
+            # Domain tags will now be inferred *only* inside Miss Pennington’s save_note()
+            # based on the user_input tracked there.
+            # Here we add ONLY the workflow label, never domain labels.
+            extra_tags = ["type:parlour"]
 
-        # Archive the exchange via Miss Pennington as a parlour log entry
-        # Pennington will:
-        #   - infer domain tags from the user's original request,
-        #   - add "auto",
-        #   - append these workflow-specific tags,
-        # resulting in clean, deduplicated metadata.
-        try:
-            self.pennington.save_note(
-                content=(
-                    "Parlour discussion entry:\n\n"
-                    f"USER SAID:\n{user_input}\n\n"
-                    f"JEEVES REPLIED:\n{jeeves_reply}"
-                ),
-                raw_user_input=user_input,
-                extra_tags=extra_tags,
-            )
+            # Archive the exchange via Miss Pennington as a parlour log entry
+            # Pennington will:
+            #   - infer domain tags from the user's original request,
+            #   - add "auto",
+            #   - append these workflow-specific tags,
+            # resulting in clean, deduplicated metadata.
+            try:
+                self.pennington.save_note(
+                    content=(
+                        "Parlour discussion entry:\n\n"
+                        f"USER SAID:\n{user_input}\n\n"
+                        f"JEEVES REPLIED:\n{jeeves_reply}"
+                    ),
+                    raw_user_input=user_input,
+                    extra_tags=extra_tags,
+                )
 
-        except Exception as e:
-            log(f"WORKFLOW: Warning – could not save parlour note to memory → {e}")
+            except Exception as e:
+                log("WORKFLOW: Could not save parlour note to memory → %s", e, level=WARNING)
 
-        return jeeves_reply
+        return self._reply(self.jeeves, msg, archive, stream)
 
+    @telemetry.workflow("daily_planning")
     def daily_planning(self, user_input: str, selected_mode: str = None) -> str:
         """
         Jeeves plans the day based on user input. Behavior is conditional:
@@ -153,24 +208,7 @@ class WestmarchOrchestrator:
         # -------------------------------------------------------------
         # 1. Detect approval (stop condition)
         # -------------------------------------------------------------
-        approval_phrases = [
-            "thank you",
-            "that will be all",
-            "this will do nicely",
-            "that will do nicely",
-            "this looks good",
-            "that looks good",
-            "perfect",
-            "excellent",
-            "very good",
-            "that will do",
-            "this will do",
-            "thank you, jeeves"
-        ]
-
-        lower_input = user_input.lower()
-
-        if any(phrase in lower_input for phrase in approval_phrases):
+        if CLOSURES["daily_planning"].matches(user_input):
             confirmation = (
                 "Very good, sir. I shall see that everything is arranged accordingly. "
                 "Do let me know if you require any further adjustments."
@@ -187,7 +225,7 @@ class WestmarchOrchestrator:
                     extra_tags=["type:planning"],         # <-- WORKFLOW TAG
                 )
             except Exception as e:
-                log(f"WORKFLOW: Warning – could not save finalized plan → {e}")
+                log("WORKFLOW: Could not save finalized plan → %s", e, level=WARNING)
 
             return confirmation
 
@@ -268,11 +306,14 @@ class WestmarchOrchestrator:
                 extra_tags=["type:planning"],          # <-- WORKFLOW TAG
             )
         except Exception as e:
-            log(f"WORKFLOW: Warning – could not save plan to memory → {e}")
+            log("WORKFLOW: Could not save plan to memory → %s", e, level=WARNING)
 
         return plan
 
-    def quick_research(self, user_input: str, selected_mode: str = None) -> str:
+    @telemetry.workflow("quick_research")
+    def quick_research(
+        self, user_input: str, selected_mode: str = None, stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Hybrid approach:
         - Perkins performs the research and replies in his own voice.
@@ -285,36 +326,19 @@ class WestmarchOrchestrator:
           (e.g. “nothing further”, “this is excellent”), we do NOT
           trigger a new research run. Instead Jeeves returns a brief,
           courteous acknowledgement and the workflow stops.
+        - stream=True returns Perkins's reply as an iterator of chunks;
+          it is archived once fully read.
         """
 
         log("WORKFLOW: Quick research pipeline initiated")
 
         # ---- 0. Detect “this is fine, we’re done here” ----
-        lower = user_input.lower().strip()
-        approval_phrases = [
-            "thank you",
-            "that will do",
-            "that will be all",
-            "that will suffice",
-            "you may go",
-            "very good",
-            "excellent, thank you",
-            "splendid, thank you",
-            "most helpful",
-            "quite helpful",
-            "much obliged",
-            "carry on",
-            "as you were",
-            "that's all perkins",
-            "thank you, perkins",
-            "dismissed",
-        ]
-
-        if any(phrase in lower for phrase in approval_phrases):
+        if CLOSURES["quick_research"].matches(user_input):
             log("WORKFLOW: Detected approval/closure in research mode; no new research call")
-            return (
+            return self._canned(
                 "At once, sir. I shall retire this matter in the household ledger. "
-                "If ever you desire supplementary findings, I am wholly at your disposal."
+                "If ever you desire supplementary findings, I am wholly at your disposal.",
+                stream,
             )
 
         # ---- 1. Ask Perkins to perform the research ----
@@ -332,29 +356,31 @@ class WestmarchOrchestrator:
             ),
         )
 
-        log("WORKFLOW: Passing research task to Perkins")
-        research = self.perkins.run(research_msg)
-
         # ---- 2. Archive the research in memory via Miss Pennington ----
-        log("WORKFLOW: Research completed, archiving in memory")
-        try:
-            self.pennington.save_note(
-                content=(
-                    "Research performed for user request:\n\n"
-                    f"REQUEST:\n{user_input}\n\n"
-                    f"RESEARCH SUMMARY:\n{research}"
-                ),
-                raw_user_input=user_input,           # <-- CRUCIAL for domain tagging
-                extra_tags=["type:research"],        # <-- WORKFLOW TAG
-            )
-            log("WORKFLOW: Research note archived successfully")
-        except Exception as e:
-            log(f"WORKFLOW: Warning – could not save research note to memory → {e}")
+        def archive(research: str) -> None:
+            log("WORKFLOW: Research completed, archiving in memory")
+            try:
+                self.pennington.save_note(
+                    content=(
+                        "Research performed for user request:\n\n"
+                        f"REQUEST:\n{user_input}\n\n"
+                        f"RESEARCH SUMMARY:\n{research}"
+                    ),
+                    raw_user_input=user_input,           # <-- CRUCIAL for domain tagging
+                    extra_tags=["type:research"],        # <-- WORKFLOW TAG
+                )
+                log("WORKFLOW: Research note archived successfully")
+            except Exception as e:
+                log("WORKFLOW: Could not save research note to memory → %s", e, level=WARNING)
 
         # ---- 3. Hybrid behaviour: return Perkins’s own words directly ----
-        return research
+        log("WORKFLOW: Passing research task to Perkins")
+        return self._reply(self.perkins, research_msg, archive, stream)
 
-    def draft_short_text(self, user_input: str, selected_mode: str = None) -> str:
+    @telemetry.workflow("draft_short_text")
+    def draft_short_text(
+        self, user_input: str, selected_mode: str = None, stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Hybrid approach:
         - Miss Pennington transforms the user's rough notes into polished prose,
@@ -362,45 +388,23 @@ class WestmarchOrchestrator:
         - The resulting draft is archived in memory.
         - Jeeves remains the orchestrator (he frames the task and context),
         but does not rewrite the draft.
+        - stream=True returns the draft as an iterator of chunks; it is
+        archived once fully read.
         """
 
         log("WORKFLOW: Drafting workflow initiated")
 
         # ---- 0. Closure detection ----
-        lower = user_input.lower().strip()
-
-        approval_phrases = [
-            "thank you",
-            "that will do",
-            "that will be all",
-            "that will suffice",
-            "you may go",
-            "very good",
-            "excellent, thank you",
-            "splendid, thank you",
-            "most helpful",
-            "quite helpful",
-            "much obliged",
-            "carry on",
-            "as you were",
-            "that's all miss pennington",
-            "thank you, miss pennington",
-            "dismissed",
-        ]
-
-        if lower in approval_phrases:
+        if CLOSURES["draft_short_text"].matches(user_input):
             log("WORKFLOW: Detected closure in drafting mode; no new drafting call")
-            return (
+            return self._canned(
                 "Certainly, sir. I will set this matter gently to rest within the ledger. "
-                "Whenever fresh words or tidy records are needed, I shall attend at once."
+                "Whenever fresh words or tidy records are needed, I shall attend at once.",
+                stream,
             )
 
         # ---- 1. Determine whether input is a rewrite ----
-        user_lower = user_input.lower()
-        is_rewrite = any(keyword in user_lower for keyword in [
-            "rewrite", "polish", "improve", "edit", "revise",
-            "tidy", "fix this", "clean this", "turn this", "rework"
-        ])
+        is_rewrite = REWRITE.matches(user_input)
 
         if is_rewrite:
             drafting_instruction = (
@@ -427,36 +431,36 @@ class WestmarchOrchestrator:
             ),
         )
 
-        log("WORKFLOW: Sending drafting task to Miss Pennington")
-        draft = self.pennington.run(draft_msg)
-
         # ---- 3. Archive the drafted text ----
-        log("WORKFLOW: Draft completed, archiving in memory")
+        def archive(draft: str) -> None:
+            log("WORKFLOW: Draft completed, archiving in memory")
 
-        try:
-            self.pennington.save_note(
-                content=(
-                    "Drafted text based on user request:\n\n"
-                    f"REQUEST:\n{user_input}\n\nDRAFT:\n{draft}"
-                ),
+            try:
+                self.pennington.save_note(
+                    content=(
+                        "Drafted text based on user request:\n\n"
+                        f"REQUEST:\n{user_input}\n\nDRAFT:\n{draft}"
+                    ),
 
-                # NEW: pass raw_user_input for domain inference
-                raw_user_input=user_input,
+                    # NEW: pass raw_user_input for domain inference
+                    raw_user_input=user_input,
 
-                # NEW: correct workflow tag
-                extra_tags=["type:drafting"],
-            )
+                    # NEW: correct workflow tag
+                    extra_tags=["type:drafting"],
+                )
 
-            log("WORKFLOW: Draft note archived successfully")
+                log("WORKFLOW: Draft note archived successfully")
 
-        except Exception as e:
-            log(f"WORKFLOW: Warning – could not save drafted text to memory → {e}")
+            except Exception as e:
+                log("WORKFLOW: Could not save drafted text to memory → %s", e, level=WARNING)
 
         # ---- 4. Return draft in Pennington’s voice ----
-        return draft
+        log("WORKFLOW: Sending drafting task to Miss Pennington")
+        return self._reply(self.pennington, draft_msg, archive, stream)
 
     # ------- Memory-centric Workflow -------
 
+    @telemetry.workflow("query_archive")
     def query_archive(self, user_input: str, selected_mode: str = None) -> str:
         """
         Query the archive (memory.json) for any notes relevant to the user's request.
@@ -467,46 +471,40 @@ class WestmarchOrchestrator:
         log("WORKFLOW: Archive query initiated")
 
         # Approval / closure detection
-        closing_phrases = [
-            "that will suffice",
-            "that will do nicely",
-            "this will do nicely",
-            "splendid",
-            "excellent, thank you",
-            "my compliments",
-            "that will be all"
-        ]
-
-        if any(phrase in user_input.lower() for phrase in closing_phrases):
+        if CLOSURES["query_archive"].matches(user_input):
             return (
                 "Very good, sir. The archives shall remain at your disposal. "
                 "Do let me know if you require anything further."
             )
 
         domains = infer_domains(user_input)
-        log(f"MEMORY-RECALL: Jeeves infers query domains → {domains}")
-
-        # Load all memory
-        all_notes = self.pennington.load_all_notes()
+        log("MEMORY-RECALL: Jeeves infers query domains → %s", domains)
 
         # Domain-based matching first, year-based fallback second
         import re
 
         matches = []
 
-        # Primary search: domain-tagged notes
+        # Primary search: domain-tagged notes, via the tag index
         if domains:
             log("MEMORY-RECALL: Searching for domain-tagged matches...")
-            for note in all_notes:
-                tags = note.get("tags", [])
-                if any(f"domain:{d}" in tags for d in domains):
-                    matches.append(note)
+            matches = self.pennington.query_notes(
+                " OR ".join(f"domain:{d}" for d in sorted(domains))
+            )
+
+        # Secondary search: notes that are about the same thing, whether or
+        # not they share its words (offline vector index)
+        if not matches:
+            log("MEMORY-RECALL: Searching for semantically similar notes...")
+            matches = [
+                note for _, note in self.pennington.similar_notes(user_input, k=5, min_score=SEMANTIC_MIN_SCORE)
+            ]
 
         # Fallback to historical year-based notes
         if not matches:
             log("MEMORY-RECALL: Falling back to historical year-based search...")
             matches = [
-                note for note in all_notes
+                note for note in self.pennington.load_all_notes()
                 if re.search(r"\b(1[0-9]{3})\b", note["content"])
             ]
 
@@ -514,11 +512,14 @@ class WestmarchOrchestrator:
         if not matches:
             log("WORKFLOW: Archive query found NO historical matches")
         else:
-            log(f"WORKFLOW: Archive query found {len(matches)} historical matches")
-            for idx, note in enumerate(matches, start=1):
-                preview = note.get("content", "")[:200].replace("\n", " ")
-                tags = note.get("tags", [])
-                log(f"WORKFLOW: Historical Match #{idx} | tags={tags} | preview={preview}...")
+            log("WORKFLOW: Archive query found %d historical matches", len(matches))
+            if enabled(DEBUG):
+                for idx, note in enumerate(matches, start=1):
+                    preview = note.get("content", "")[:200].replace("\n", " ")
+                    log(
+                        "WORKFLOW: Historical Match #%d | tags=%s | preview=%s...",
+                        idx, note.get("tags", []), preview, level=DEBUG,
+                    )
 
         # No matches? Inform the patron politely
         if not matches:
@@ -561,6 +562,7 @@ class WestmarchOrchestrator:
 
         return self.jeeves.run(final_msg)
 
+    @telemetry.workflow("memory_summary")
     def summarize_user_memory(self, user_input: str | None = None) -> str:
         """
         Ask Miss Pennington to summarize everything she knows so far,
@@ -592,7 +594,10 @@ class WestmarchOrchestrator:
         """
         return self.summarize_user_memory(user_input)
 
-    def critique_text(self, text_to_critique: str, selected_mode: str = None) -> str:
+    @telemetry.workflow("critique_text")
+    def critique_text(
+        self, text_to_critique: str, selected_mode: str = None, stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Sends ONLY the target text to Lady Hawthorne for critique,
         ensuring she critiques exactly what is provided — whether it
@@ -602,31 +607,18 @@ class WestmarchOrchestrator:
         - Lady Hawthorne replies in her own voice directly to the user.
         - Jeeves orchestrates the call and memory archiving but does not
         rephrase or wrap her critique.
+        - stream=True returns the critique as an iterator of chunks; it is
+        archived once fully read.
         """
 
         log("WORKFLOW: Critique workflow initiated")
 
         # --- 0. Approval / closure detection ---
-        lower = text_to_critique.strip().lower()
-
-        closure_phrases = [
-            "thank you",
-            "that will do",
-            "that will suffice",
-            "very well",
-            "fine, thank you",
-            "fine thank you",
-            "excellent, thank you",
-            "alright then",
-            "okay then",
-            "appreciated",
-            "much obliged"
-        ]
-
-        if any(p in lower for p in closure_phrases):
-            return (
+        if CLOSURES["critique_text"].matches(text_to_critique):
+            return self._canned(
                 "As you wish, sir. Should further literary agonies ever require my lantern, "
-                "I shall of course remain available."
+                "I shall of course remain available.",
+                stream,
             )
 
         # --- 1. Ask Lady Hawthorne to critique the raw text ---
@@ -648,27 +640,27 @@ class WestmarchOrchestrator:
                 ),
         )
 
-        log("WORKFLOW: Sending raw text directly to Lady Hawthorne")
-        critique_output = self.hawthorne.run(critique_msg)
-
         # --- 2. Archive the critique in memory (via Pennington) ---
-        try:
-            self.pennington.save_note(
-                content=(
-                    "Critique requested from Lady Hawthorne:\n\n"
-                    f"TEXT:\n{text_to_critique}\n\n"
-                    f"CRITIQUE:\n{critique_output}"
-                ),
-                raw_user_input=text_to_critique,     # <-- CRUCIAL: domain inference happens here
-                extra_tags=["type:critique"],        # <-- WORKFLOW TAG ONLY
-            )
-            log("WORKFLOW: Critique note archived successfully")
-        except Exception as e:
-            log(f"WORKFLOW: Warning – could not save critique note to memory → {e}")
+        def archive(critique_output: str) -> None:
+            try:
+                self.pennington.save_note(
+                    content=(
+                        "Critique requested from Lady Hawthorne:\n\n"
+                        f"TEXT:\n{text_to_critique}\n\n"
+                        f"CRITIQUE:\n{critique_output}"
+                    ),
+                    raw_user_input=text_to_critique,     # <-- CRUCIAL: domain inference happens here
+                    extra_tags=["type:critique"],        # <-- WORKFLOW TAG ONLY
+                )
+                log("WORKFLOW: Critique note archived successfully")
+            except Exception as e:
+                log("WORKFLOW: Could not save critique note to memory → %s", e, level=WARNING)
 
         # --- 3. Hybrid: return Her Ladyship’s own words directly ---
-        return critique_output
+        log("WORKFLOW: Sending raw text directly to Lady Hawthorne")
+        return self._reply(self.hawthorne, critique_msg, archive, stream)
     
+    @telemetry.workflow("whole_household")
     def whole_household(self, user_input: str, selected_mode: str = None) -> str:
         """
         Full multi-agent orchestration workflow.
@@ -679,24 +671,7 @@ class WestmarchOrchestrator:
         # -------------------------------------------------------
         # 0. Approval / Closure Detection
         # -------------------------------------------------------
-        lower = user_input.strip().lower()
-
-        closure_phrases = [
-            "thank you",
-            "my thanks",
-            "that will do",
-            "that will suffice",
-            "very well",
-            "fine, thank you",
-            "fine thank you",
-            "excellent, thank you",
-            "alright then",
-            "okay then",
-            "appreciated",
-            "much obliged"
-        ]
-
-        if any(p in lower for p in closure_phrases):
+        if CLOSURES["whole_household"].matches(user_input):
             return (
                 "Indeed, sir. If another garden ornament develops ambitions of nocturnal adventure, "
                 "we shall of course investigate with all due diligence."
@@ -722,193 +697,233 @@ class WestmarchOrchestrator:
             ),
         )
 
-        perkins_output = self.perkins.run(research_msg)
+        async def investigate():
+            return await self.perkins.arun(research_msg)
 
         # -------------------------------------------------------
         # 2. Lady Hawthorne — Interjects
         # -------------------------------------------------------
-        hawthorne_output = self.hawthorne.run(
-            AgentMessage(
-                sender="System",
-                recipient=self.hawthorne.name,
-                task_type=TaskType.CRITIQUE,
-                content=(
-                    "Please offer a brief, aristocratic interjection commenting on Perkins’s investigation. "
-                    "Your response must be a SINGLE PARAGRAPH of no more than 80–100 words. "
-                    "You may include ONE specific suggested improvement at the end, introduced with the phrase "
-                    "'Suggested refinement:' "
-                    "Avoid numbered lists, lengthy analysis, or multi-paragraph commentary. "
-                    "Maintain Lady Hawthorne’s witty, aristocratic tone but remain concise.\n\n"
-                    f"{perkins_output}"
-                ),
-                context=Context(
-                    original_user_request=user_input,
-                    metadata={"selected_mode": selected_mode},
-                ),
+        async def interject(perkins_output):
+            return await self.hawthorne.arun(
+                AgentMessage(
+                    sender="System",
+                    recipient=self.hawthorne.name,
+                    task_type=TaskType.CRITIQUE,
+                    content=(
+                        "Please offer a brief, aristocratic interjection commenting on Perkins’s investigation. "
+                        "Your response must be a SINGLE PARAGRAPH of no more than 80–100 words. "
+                        "You may include ONE specific suggested improvement at the end, introduced with the phrase "
+                        "'Suggested refinement:' "
+                        "Avoid numbered lists, lengthy analysis, or multi-paragraph commentary. "
+                        "Maintain Lady Hawthorne’s witty, aristocratic tone but remain concise.\n\n"
+                        f"{perkins_output}"
+                    ),
+                    context=Context(
+                        original_user_request=user_input,
+                        metadata={"selected_mode": selected_mode},
+                    ),
+                )
             )
-        )
 
         # -------------------------------------------------------
-        # 3. Miss Pennington — Initial Draft
+        # 3. Miss Pennington — Initial Draft (needs only the request,
+        #    so it runs alongside Perkins and Lady Hawthorne)
         # -------------------------------------------------------
-        pennington_output = self.pennington.run(
-            AgentMessage(
-                sender="Jeeves",
-                recipient="Miss Pennington",
-                task_type=TaskType.DRAFTING,
-                content=(
-                    "Please draft a very short, extremely polite note to the neighbours "
-                    "about the unusual movement of the garden gnome. "
-                    "Your letter must be no more than 80–100 words total, "
-                    "written in 4–5 sentences. "
-                    "Avoid flourishes, avoid digressions, and do not include commentary "
-                    "outside the letter itself. "
-                    "End with a single warm closing line, followed by a signature (“Miss Pennington”).\n\n"
-                    "Write only the letter."
-                ),
-                context=Context(
-                    original_user_request=user_input,
-                    metadata={"selected_mode": selected_mode},
-                ),
+        async def draft():
+            return await self.pennington.arun(
+                AgentMessage(
+                    sender="Jeeves",
+                    recipient="Miss Pennington",
+                    task_type=TaskType.DRAFTING,
+                    content=(
+                        "Please draft a very short, extremely polite note to the neighbours "
+                        "about the unusual movement of the garden gnome. "
+                        "Your letter must be no more than 80–100 words total, "
+                        "written in 4–5 sentences. "
+                        "Avoid flourishes, avoid digressions, and do not include commentary "
+                        "outside the letter itself. "
+                        "End with a single warm closing line, followed by a signature (“Miss Pennington”).\n\n"
+                        "Write only the letter."
+                    ),
+                    context=Context(
+                        original_user_request=user_input,
+                        metadata={"selected_mode": selected_mode},
+                    ),
+                )
             )
-        )
 
         # -------------------------------------------------------
         # 4. Lady Hawthorne critiques Miss Pennington’s letter
         # -------------------------------------------------------
-        hawthorne_letter_feedback = self.hawthorne.run(
-            AgentMessage(
-                sender="System",
-                recipient=self.hawthorne.name,
-                task_type=TaskType.CRITIQUE,
-                content=(
-                    "Please critique Miss Pennington’s drafted letter. "
-                    "Your critique must be extremely brief: no more than 40–60 words, "
-                    "written in 3–5 sentences total. "
-                    "Provide exactly ONE specific improvement. "
-                    "Do not include lists, rewrites, or lengthy commentary. "
-                    "Maintain your aristocratic tone.\n\n"
-                    f"{pennington_output}"
-                ),
-                context=Context(
-                    original_user_request=user_input,
-                    metadata={"selected_mode": selected_mode},
-                ),
+        async def critique_draft(pennington_output):
+            return await self.hawthorne.arun(
+                AgentMessage(
+                    sender="System",
+                    recipient=self.hawthorne.name,
+                    task_type=TaskType.CRITIQUE,
+                    content=(
+                        "Please critique Miss Pennington’s drafted letter. "
+                        "Your critique must be extremely brief: no more than 40–60 words, "
+                        "written in 3–5 sentences total. "
+                        "Provide exactly ONE specific improvement. "
+                        "Do not include lists, rewrites, or lengthy commentary. "
+                        "Maintain your aristocratic tone.\n\n"
+                        f"{pennington_output}"
+                    ),
+                    context=Context(
+                        original_user_request=user_input,
+                        metadata={"selected_mode": selected_mode},
+                    ),
+                )
             )
-        )
 
         # -------------------------------------------------------
         # 5. Miss Pennington revises the letter
         # -------------------------------------------------------
-        pennington_revision = self.pennington.run(
-            AgentMessage(
-                sender="System",
-                recipient="Miss Pennington",
-                task_type=TaskType.DRAFTING,
-                content=(
-                    "Lady Hawthorne has critiqued your draft. Please revise the letter using her "
-                    "single suggested improvement. The revised letter must be concise, no more "
-                    "than 80–100 words. End the revised letter with a warm closing line and your "
-                    "signature (“Miss Pennington”). Avoid ornamentation, ensure the request for "
-                    "neighbour observations is clear, and do not add new ideas or repeat content "
-                    "from the original draft.\n\n"
-                    "Your original draft:\n"
-                    f"{pennington_output}\n\n"
-                    "Lady Hawthorne said:\n"
-                    f"{hawthorne_letter_feedback}"
-                ),
-                context=Context(
-                    original_user_request=user_input,
-                    metadata={"selected_mode": selected_mode},
-                ),
+        async def revise(pennington_output, hawthorne_letter_feedback):
+            return await self.pennington.arun(
+                AgentMessage(
+                    sender="System",
+                    recipient="Miss Pennington",
+                    task_type=TaskType.DRAFTING,
+                    content=(
+                        "Lady Hawthorne has critiqued your draft. Please revise the letter using her "
+                        "single suggested improvement. The revised letter must be concise, no more "
+                        "than 80–100 words. End the revised letter with a warm closing line and your "
+                        "signature (“Miss Pennington”). Avoid ornamentation, ensure the request for "
+                        "neighbour observations is clear, and do not add new ideas or repeat content "
+                        "from the original draft.\n\n"
+                        "Your original draft:\n"
+                        f"{pennington_output}\n\n"
+                        "Lady Hawthorne said:\n"
+                        f"{hawthorne_letter_feedback}"
+                    ),
+                    context=Context(
+                        original_user_request=user_input,
+                        metadata={"selected_mode": selected_mode},
+                    ),
+                )
             )
-        )
 
         # -------------------------------------------------------
         # 6A. Miss Pennington summarises all steps AND archive
         # -------------------------------------------------------
-        pennington_summary = self.pennington.run(
-            AgentMessage(
+        async def summarise(
+            perkins_output,
+            hawthorne_output,
+            pennington_output,
+            hawthorne_letter_feedback,
+            pennington_revision,
+        ):
+            return await self.pennington.arun(
+                AgentMessage(
+                    sender="System",
+                    recipient="Miss Pennington",
+                    task_type=TaskType.DRAFTING,
+                    content=(
+                        "Please produce a concise, elegant summary of the entire multi-agent "
+                        "workflow that has just occurred. Your summary must:\n"
+                        "• be 180–240 words long\n"
+                        "• use ONLY the information explicitly provided below\n"
+                        "• include a brief reference to, and a single short quote from, each participant's contribution\n"
+                        "• reproduce the FULL TEXT of your revised letter exactly as written, "
+                        "  as its own paragraph or block, without paraphrasing or altering any words\n"
+                        "• be structured using a separate paragraph for each participant:\n"
+                        "     - Perkins’ investigation\n"
+                        "     - Lady Hawthorne’s first interjection\n"
+                        "     - your initial draft\n"
+                        "     - Lady Hawthorne’s critique\n"
+                        "     - your revised letter\n"
+                        "• maintain your refined, archivist tone (calm, clear, lightly wry)\n"
+                        "• avoid adding new theories, invented details, or interpretations\n\n"
+                        "Here is the complete record of agent outputs:\n\n"
+                        "==== PERKINS' INVESTIGATION ====\n"
+                        f"{perkins_output}\n\n"
+                        "==== LADY HAWTHORNE'S FIRST REMARK ====\n"
+                        f"{hawthorne_output}\n\n"
+                        "==== MISS PENNINGTON'S FIRST DRAFT ====\n"
+                        f"{pennington_output}\n\n"
+                        "==== LADY HAWTHORNE'S CRITIQUE ====\n"
+                        f"{hawthorne_letter_feedback}\n\n"
+                        "==== MISS PENNINGTON'S REVISION ====\n"
+                        f"{pennington_revision}\n\n"
+                        "Please now produce your final archival summary."
+                    ),
+                    context=Context(
+                        original_user_request=user_input,
+                        metadata={"selected_mode": selected_mode},
+                    ),
+                )
+            )
+
+        # Archive the entire workflow in memory
+        def archive(pennington_summary):
+            try:
+                self.pennington.save_note(
+                    content=(
+                        "[Whole Household Workflow Summary]\n\n"
+                        f"USER REQUEST:\n{user_input}\n\n"
+                        f"FINAL SUMMARY:\n{pennington_summary}"
+                    ),
+                    raw_user_input=user_input,
+                    extra_tags=["type:whole-household"],
+                )
+                log("WORKFLOW: Whole-household summary archived successfully")
+            except Exception as e:
+                log("WORKFLOW: Could not save whole-household summary → %s", e, level=WARNING)
+
+        # -------------------------------------------------------
+        # 6B. Jeeves presents Miss Pennington's summary
+        # -------------------------------------------------------
+        async def present(pennington_summary):
+            final_msg = AgentMessage(
                 sender="System",
-                recipient="Miss Pennington",
-                task_type=TaskType.DRAFTING,
+                recipient="Jeeves",
+                task_type=TaskType.CONVERSATION,
                 content=(
-                    "Please produce a concise, elegant summary of the entire multi-agent "
-                    "workflow that has just occurred. Your summary must:\n"
-                    "• be 180–240 words long\n"
-                    "• use ONLY the information explicitly provided below\n"
-                    "• include a brief reference to, and a single short quote from, each participant's contribution\n"
-                    "• reproduce the FULL TEXT of your revised letter exactly as written, "
-                    "  as its own paragraph or block, without paraphrasing or altering any words\n"
-                    "• be structured using a separate paragraph for each participant:\n"
-                    "     - Perkins’ investigation\n"
-                    "     - Lady Hawthorne’s first interjection\n"
-                    "     - your initial draft\n"
-                    "     - Lady Hawthorne’s critique\n"
-                    "     - your revised letter\n"
-                    "• maintain your refined, archivist tone (calm, clear, lightly wry)\n"
-                    "• avoid adding new theories, invented details, or interpretations\n\n"
-                    "Here is the complete record of agent outputs:\n\n"
-                    "==== PERKINS' INVESTIGATION ====\n"
-                    f"{perkins_output}\n\n"
-                    "==== LADY HAWTHORNE'S FIRST REMARK ====\n"
-                    f"{hawthorne_output}\n\n"
-                    "==== MISS PENNINGTON'S FIRST DRAFT ====\n"
-                    f"{pennington_output}\n\n"
-                    "==== LADY HAWTHORNE'S CRITIQUE ====\n"
-                    f"{hawthorne_letter_feedback}\n\n"
-                    "==== MISS PENNINGTON'S REVISION ====\n"
-                    f"{pennington_revision}\n\n"
-                    "Please now produce your final archival summary."
+                    "Miss Pennington has prepared the final archival summary of the "
+                    "household’s coordinated investigation. Please present her summary to "
+                    "the Patron in your polished, understated butler’s voice.\n\n"
+                    "Guidelines:\n"
+                    "• Do NOT add new information.\n"
+                    "• Do NOT reinterpret or expand on the events.\n"
+                    "• You may introduce her summary with a single courteous line.\n"
+                    "• Then reproduce her summary verbatim.\n"
+                    "• Then close with one brief, dignified concluding remark.\n\n"
+                    f"Here is Miss Pennington’s summary:\n\n{pennington_summary}"
                 ),
                 context=Context(
                     original_user_request=user_input,
                     metadata={"selected_mode": selected_mode},
                 ),
             )
-        )
-
-        # Archive the entire workflow in memory
-        try:
-            self.pennington.save_note(
-                content=(
-                    "[Whole Household Workflow Summary]\n\n"
-                    f"USER REQUEST:\n{user_input}\n\n"
-                    f"FINAL SUMMARY:\n{pennington_summary}"
-                ),
-                raw_user_input=user_input,
-                extra_tags=["type:whole-household"],
-            )
-            log("WORKFLOW: Whole-household summary archived successfully")
-        except Exception as e:
-            log(f"WORKFLOW: Warning – could not save whole-household summary → {e}")
+            return await self.jeeves.arun(final_msg)
 
         # -------------------------------------------------------
-        # 6B. Jeeves presents Miss Pennington's summary
+        # 7. Run the graph: Perkins → Hawthorne overlaps with the
+        #    Pennington draft → critique → revision chain
         # -------------------------------------------------------
-        final_msg = AgentMessage(
-            sender="System",
-            recipient="Jeeves",
-            task_type=TaskType.CONVERSATION,
-            content=(
-                "Miss Pennington has prepared the final archival summary of the "
-                "household’s coordinated investigation. Please present her summary to "
-                "the Patron in your polished, understated butler’s voice.\n\n"
-                "Guidelines:\n"
-                "• Do NOT add new information.\n"
-                "• Do NOT reinterpret or expand on the events.\n"
-                "• You may introduce her summary with a single courteous line.\n"
-                "• Then reproduce her summary verbatim.\n"
-                "• Then close with one brief, dignified concluding remark.\n\n"
-                f"Here is Miss Pennington’s summary:\n\n{pennington_summary}"
-            ),
-            context=Context(
-                original_user_request=user_input,
-                metadata={"selected_mode": selected_mode},
-            ),
-        )
-
-        return self.jeeves.run(final_msg)
+        household = (
+            Workflow("whole_household")
+            .step("perkins_output", investigate)
+            .step("hawthorne_output", interject, inputs=("perkins_output",))
+            .step("pennington_output", draft)
+            .step("hawthorne_letter_feedback", critique_draft, inputs=("pennington_output",))
+            .step("pennington_revision", revise,
+                  inputs=("pennington_output", "hawthorne_letter_feedback"))
+            .step("pennington_summary", summarise, inputs=(
+                "perkins_output",
+                "hawthorne_output",
+                "pennington_output",
+                "hawthorne_letter_feedback",
+                "pennington_revision",
+            ))
+            .step("archived", archive, inputs=("pennington_summary",))
+            .step("final", present, inputs=("pennington_summary",))
+        )
+
+        self.last_workflow_run = household.run(max_concurrency=self.workflow_concurrency)
+        return self.last_workflow_run.results["final"]
 
     # -------------------------
     # Memory Recall – Helpers
@@ -1052,6 +1067,7 @@ class WestmarchOrchestrator:
 
         return best_entry
 
+    @telemetry.workflow("recall_memory")
     def recall_memory(self, user_input: str, selected_mode: str = None) -> str:
         """
         Jeeves retrieves past notes from Miss Pennington’s memory ledger
@@ -1063,25 +1079,7 @@ class WestmarchOrchestrator:
         # -----------------------------------------------------
         # 0. Closure / approval detection
         # -----------------------------------------------------
-        lower = user_input.strip().lower()
-
-        closure_phrases = [
-            "thank you",
-            "my thanks",
-            "that will do",
-            "that will suffice",
-            "that will be all",
-            "very well",
-            "fine, thank you",
-            "fine thank you",
-            "excellent, thank you",
-            "alright then",
-            "okay then",
-            "appreciated",
-            "much obliged",
-        ]
-
-        if any(p in lower for p in closure_phrases):
+        if CLOSURES["recall_memory"].matches(user_input):
             log("MEMORY-RECALL: Closure phrase detected — Jeeves retires gracefully.")
             return (
                 "Indeed, sir. Miss Pennington and I remain prepared "
@@ -1091,65 +1089,51 @@ class WestmarchOrchestrator:
         # -----------------------------------------------------
         # 1. Infer domain(s) of the user query
         # -----------------------------------------------------
-        log(f"MEMORY-RECALL: Jeeves notes the user's inquiry → '{lower}'")
-        log("MEMORY-RECALL: Extracting keywords from query…")
+        lower = user_input.strip().lower()
+        log("MEMORY-RECALL: Jeeves notes the user's inquiry → '%s'", lower, level=DEBUG)
+        log("MEMORY-RECALL: Extracting keywords from query…", level=DEBUG)
         user_domains = infer_domains(lower)
-        log(f"MEMORY-RECALL: Jeeves infers query domains → {user_domains}")
-
-        # -----------------------------------------------------
-        # 2. Ask Miss Pennington for all notes
-        # -----------------------------------------------------
-        log("MEMORY-RECALL: Consulting Miss Pennington’s ledger for candidate entries…")
-        all_notes = self.pennington.load_all_notes()
-        log(f"MEMORY: Loaded {len(all_notes)} notes from the ledger")
+        log("MEMORY-RECALL: Jeeves infers query domains → %s", user_domains)
 
         # -----------------------------------------------------
-        # 3. Score each note against the query (keyword overlap)
+        # 2–3. Ask Miss Pennington for the best candidate entries:
+        #      BM25-ranked (rare words weigh more than common ones, with a
+        #      boost for recent and domain-matching notes), fused with
+        #      semantically similar notes from the vector index
         # -----------------------------------------------------
-        def score_entry(content: str, query: str) -> int:
-            q_words = set(query.split())
-            score = 0
-            for w in q_words:
-                if w and w in content.lower():
-                    score += 1
-            return score
-
-        candidates: list[tuple[int, dict]] = []
-        for entry in all_notes:
-            content = entry.get("content", "") or ""
-            s = score_entry(content, lower)
-            if s > 0:
-                candidates.append((s, entry))
+        log("MEMORY-RECALL: Consulting Miss Pennington’s ledger for candidate entries…", level=DEBUG)
+        candidates: list[tuple[float, dict]] = self.pennington.rank_notes(
+            lower, k=10, domains=user_domains, semantic=True
+        )
+        log("MEMORY: %d candidate notes ranked against the query", len(candidates))
 
         if not candidates:
-            log("MEMORY-RECALL: Alas — no entries contained any of the keywords.")
+            log("MEMORY-RECALL: Alas — no entries resembled the query.")
             return (
                 "I have consulted Miss Pennington’s meticulously kept ledger, sir, "
                 "but I fear no relevant recollection appears recorded under that description. "
                 "If you recall even a fragment more, I should be delighted to search again."
             )
 
-        # Sort top → bottom
-        candidates.sort(key=lambda pair: pair[0], reverse=True)
-
         # -----------------------------------------------------
         # 4. Log top 10 candidates
         # -----------------------------------------------------
         top_candidates = candidates[:10]
         top_best_score = top_candidates[0][0]
-        log(f"MEMORY-RECALL: Highest scoring entry achieves → {top_best_score}")
-        log("MEMORY-RECALL: Showing top 10 candidates by score:")
+        log("MEMORY-RECALL: Highest scoring entry achieves → %.2f", top_best_score)
 
-        for score, entry in top_candidates:
-            snippet = (entry.get("content", "") or "").replace("\n", " ")
-            if len(snippet) > 80:
-                snippet = snippet[:80] + "…"
-            log(f"MEMORY-RECALL: • score {score:2d} → {snippet}")
+        if enabled(DEBUG):
+            log("MEMORY-RECALL: Showing top 10 candidates by score:", level=DEBUG)
+            for score, entry in top_candidates:
+                snippet = (entry.get("content", "") or "").replace("\n", " ")
+                if len(snippet) > 80:
+                    snippet = snippet[:80] + "…"
+                log("MEMORY-RECALL: • score %5.2f → %s", score, snippet, level=DEBUG)
 
         # -----------------------------------------------------
         # 5. Domain filtering (correct tag-based extraction)
         # -----------------------------------------------------
-        log("MEMORY-RECALL: Checking for domain coherence using TAGS…")
+        log("MEMORY-RECALL: Checking for domain coherence using TAGS…", level=DEBUG)
 
         def extract_domains_from_tags(entry):
             tags = entry.get("tags", [])
@@ -1163,7 +1147,7 @@ class WestmarchOrchestrator:
 
         for score, entry in top_candidates:
             entry_domains = extract_domains_from_tags(entry)
-            log(f"MEMORY-RECALL: Ledger entry domains (tag-based) → {entry_domains}")
+            log("MEMORY-RECALL: Ledger entry domains (tag-based) → %s", entry_domains, level=DEBUG, every=5)
 
             if user_domains:
                 # Require domain overlap
@@ -1182,7 +1166,7 @@ class WestmarchOrchestrator:
             _, chosen_entry = top_candidates[0]
             log("MEMORY-RECALL: No domain-coherent candidate found; using top-scoring entry.")
 
-        log("MEMORY-RECALL: --- END OF MEMORY RECALL WORKFLOW ---")
+        log("MEMORY-RECALL: --- END OF MEMORY RECALL WORKFLOW ---", level=DEBUG)
 
         # -----------------------------------------------------
         # 6. Produce Jeeves's reply
@@ -1230,6 +1214,63 @@ class WestmarchOrchestrator:
         """
         Demo 9 – Stage 1 Test
         Using REAL AgentMessage objects, no system_message hacks.
+
+        Returns the whole transcript once every model call has finished;
+        iter_archive_mystery() hands it over message by message instead.
+        """
+        return list(self.iter_archive_mystery())
+
+    @telemetry.workflow("archive_mystery")
+    def iter_archive_mystery(self) -> Iterator[dict]:
+        """
+        Yield Demo 9's UI messages in script order, each as soon as it is
+        ready. All model calls start at once on a background thread, so
+        the first message arrives after a single call and the rest follow
+        as their replies land.
+        """
+        messages, batch, pending = self._archive_mystery_script()
+        slots = {id(entry): (step, prefix) for entry, step, prefix in pending}
+        results: "queue.Queue[tuple[str, Any]]" = queue.Queue()
+        failure: list[BaseException] = []
+
+        def fire():
+            try:
+                self.last_workflow_run = batch.run(
+                    max_concurrency=self.workflow_concurrency,
+                    on_result=lambda step, reply: results.put((step, reply)),
+                )
+            except BaseException as e:
+                failure.append(e)
+                results.put(("", None))
+
+        worker = threading.Thread(
+            target=contextvars.copy_context().run, args=(fire,), name="westmarch-demo9", daemon=True
+        )
+        worker.start()
+
+        replies: Dict[str, Any] = {}
+        for entry in messages:
+            if id(entry) in slots:
+                step, prefix = slots[id(entry)]
+                while step not in replies:
+                    done, reply = results.get()
+                    if failure:
+                        raise failure[0]
+                    replies[done] = reply
+                entry["content"] = f"{prefix}{replies[step]}"
+            yield entry
+
+        # Every reply is in; let the run finish recording its trace
+        worker.join()
+        if failure:
+            raise failure[0]
+
+    def _archive_mystery_script(self) -> tuple[list[dict], Workflow, list[tuple[dict, str, str]]]:
+        """
+        Lay out Demo 9. Every instruction in the script is fixed in advance,
+        so no reply feeds another: each agent reply gets a placeholder in
+        `messages` and a step in the returned batch, to be filled in once
+        the batch runs.
         """
 
         from westmarch.core.messages import AgentMessage, TaskType, Context, Constraints
@@ -1261,6 +1302,22 @@ class WestmarchOrchestrator:
                 }
             )
 
+        # Helper: reserve a UI slot for an agent's reply; the call itself
+        # is queued on the batch and made once the whole script is laid out
+        batch = Workflow("archive_mystery")
+        pending: list[tuple[dict, str, str]] = []
+
+        def add_reply(agent, message: AgentMessage, speaker: str, prefix: str):
+            entry = {"role": "assistant", "speaker": speaker, "content": None}
+            messages.append(entry)
+
+            async def reply():
+                return await agent.arun(message)
+
+            step = f"{len(pending) + 1:02d} {speaker}"
+            batch.step(step, reply)
+            pending.append((entry, step, prefix))
+
         # -----------------------------
         # NARRATOR STYLE STANDARD
         # -----------------------------
@@ -1292,12 +1349,11 @@ class WestmarchOrchestrator:
             task=TaskType.DRAFTING,
             content=pennington_intro_instruction,
         )
-        pennington_intro = self.pennington.run(pennington_intro_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_intro_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington: {pennington_intro}",
+            prefix="✒️ Pennington: ",
         )
 
         # 2. Scripted user reply
@@ -1318,12 +1374,11 @@ class WestmarchOrchestrator:
             task=TaskType.DRAFTING,
             content=pennington_follow_instruction,
         )
-        pennington_follow = self.pennington.run(pennington_follow_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_follow_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington: {pennington_follow}",
+            prefix="✒️ Pennington: ",
         )
 
         # 4. Jeeves reaction
@@ -1337,12 +1392,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,  # conversational tone for Jeeves
             content=jeeves_instruction,
         )
-        jeeves_reply = self.jeeves.run(jeeves_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves: {jeeves_reply}",
+            prefix="🎩 Jeeves: ",
         )
 
         # -----------------------------
@@ -1362,12 +1416,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=pennington_to_perkins_instruction,
         )
-        pennington_to_perkins = self.pennington.run(pennington_to_perkins_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_to_perkins_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington → 📚 Perkins:\n{pennington_to_perkins}",
+            prefix="✒️ Pennington → 📚 Perkins:\n",
         )
 
         # 6. Perkins receives Pennington's request and analyzes the parchment
@@ -1382,12 +1435,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=perkins_reply_instruction,
         )
-        perkins_reply = self.perkins.run(perkins_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.perkins,
+            perkins_msg,
             speaker="Perkins",
-            content=f"📚 Perkins: {perkins_reply}",
+            prefix="📚 Perkins: ",
         )
 
         # 7. Pennington acknowledges Perkins’s findings (brief)
@@ -1400,12 +1452,11 @@ class WestmarchOrchestrator:
             task=TaskType.DRAFTING,
             content=pennington_ack_instruction,
         )
-        pennington_ack = self.pennington.run(pennington_ack_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_ack_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington: {pennington_ack}",
+            prefix="✒️ Pennington: ",
         )
 
         # -----------------------------
@@ -1428,12 +1479,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=perkins_scanner_instruction,
         )
-        perkins_scanner_reply = self.perkins.run(perkins_scanner_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.perkins,
+            perkins_scanner_msg,
             speaker="Perkins",
-            content=f"📚 Perkins → 🎩 Jeeves:\n{perkins_scanner_reply}",
+            prefix="📚 Perkins → 🎩 Jeeves:\n",
         )
 
         # 9. Jeeves receives Perkins's findings and seeks Hawthorne's critique
@@ -1449,12 +1499,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_to_hawthorne_instruction,
         )
-        jeeves_to_hawthorne_reply = self.jeeves.run(jeeves_to_hawthorne_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_to_hawthorne_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → 🕯️ Lady Hawthorne:\n{jeeves_to_hawthorne_reply}",
+            prefix="🎩 Jeeves → 🕯️ Lady Hawthorne:\n",
         )
 
         # 10. Lady Hawthorne critiques Perkins's report (biting, theatrical)
@@ -1470,12 +1519,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,  # conversational critique
             content=hawthorne_critique_instruction,
         )
-        hawthorne_reply = self.hawthorne.run(hawthorne_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.hawthorne,
+            hawthorne_msg,
             speaker="Lady Hawthorne",
-            content=f"🕯️ Lady Hawthorne → 📚 Perkins:\n{hawthorne_reply}",
+            prefix="🕯️ Lady Hawthorne → 📚 Perkins:\n",
         )
 
         # 11. Jeeves re-coordinates: assigns archival research + soothes Perkins
@@ -1493,12 +1541,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_coord_instruction,
         )
-        jeeves_coord_reply = self.jeeves.run(jeeves_coord_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_coord_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → ✒️ Pennington & 📚 Perkins:\n{jeeves_coord_reply}",
+            prefix="🎩 Jeeves → ✒️ Pennington & 📚 Perkins:\n",
         )
 
         # 12. Stage-ending atmospheric beat (system voice)
@@ -1544,12 +1591,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_summon_instruction,
         )
-        jeeves_summon_reply = self.jeeves.run(jeeves_summon_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_summon_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → 📚 Perkins:\n{jeeves_summon_reply}",
+            prefix="🎩 Jeeves → 📚 Perkins:\n",
         )
 
         # 15. Perkins gives the updated scanner report
@@ -1566,12 +1612,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=perkins_scan_instruction,
         )
-        perkins_scan_reply = self.perkins.run(perkins_scan_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.perkins,
+            perkins_scan_msg,
             speaker="Perkins",
-            content=f"📚 Perkins → ✒️ Pennington:\n{perkins_scan_reply}",
+            prefix="📚 Perkins → ✒️ Pennington:\n",
         )
 
         # 16. Pennington checks architectural ledgers
@@ -1588,12 +1633,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=pennington_ledger_instruction,
         )
-        pennington_ledger_reply = self.pennington.run(pennington_ledger_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_ledger_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington → 🎩 Jeeves:\n{pennington_ledger_reply}",
+            prefix="✒️ Pennington → 🎩 Jeeves:\n",
         )
 
         # 17. Jeeves invites Hawthorne’s critique
@@ -1608,12 +1652,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_invite_instruction,
         )
-        jeeves_invite_reply = self.jeeves.run(jeeves_invite_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_invite_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → 🕯️ Lady Hawthorne:\n{jeeves_invite_reply}",
+            prefix="🎩 Jeeves → 🕯️ Lady Hawthorne:\n",
         )
 
         # 18. Lady Hawthorne critiques the door (theatrical disdain)
@@ -1628,12 +1671,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=hawthorne_stage4_instruction,
         )
-        hawthorne_stage4_reply = self.hawthorne.run(hawthorne_stage4_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.hawthorne,
+            hawthorne_stage4_msg,
             speaker="Lady Hawthorne",
-            content=f"🕯️ Lady Hawthorne → 🎩 Jeeves:\n{hawthorne_stage4_reply}",
+            prefix="🕯️ Lady Hawthorne → 🎩 Jeeves:\n",
         )
 
         # 19. Jeeves coordinates the aftermath & defers to the user
@@ -1650,12 +1692,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_coord4_instruction,
         )
-        jeeves_coord4_reply = self.jeeves.run(jeeves_coord4_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_coord4_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → Patron:\n{jeeves_coord4_reply}",
+            prefix="🎩 Jeeves → Patron:\n",
         )
 
         # 20. Atmospheric outro
@@ -1699,12 +1740,11 @@ class WestmarchOrchestrator:
             content=jeeves_stage5_instruction,
         )
 
-        jeeves_stage5_reply = self.jeeves.run(jeeves_stage5_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_stage5_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves: {jeeves_stage5_reply}",
+            prefix="🎩 Jeeves: ",
         )
 
         #-----------------------------
@@ -1725,12 +1765,11 @@ class WestmarchOrchestrator:
             task=TaskType.CONVERSATION,
             content=jeeves_parallel_instruction,
         )
-        jeeves_parallel_reply = self.jeeves.run(jeeves_parallel_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_parallel_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves → 📚 Perkins & ✒️ Pennington:\n{jeeves_parallel_reply}",
+            prefix="🎩 Jeeves → 📚 Perkins & ✒️ Pennington:\n",
         )
 
         # 24. Perkins calls the Archival Metadata Scrutinizer v3.2 (custom tool)
@@ -1751,12 +1790,11 @@ class WestmarchOrchestrator:
             task=TaskType.RESEARCH,
             content=perkins_tool_instruction,
         )
-        perkins_tool_reply = self.perkins.run(perkins_tool_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.perkins,
+            perkins_tool_msg,
             speaker="Perkins",
-            content=f"📚 Perkins (Tool Report):\n{perkins_tool_reply}",
+            prefix="📚 Perkins (Tool Report):\n",
         )
 
         # 25. Pennington prepares a Discrepancy Report Addendum (parallel track)
@@ -1773,12 +1811,11 @@ class WestmarchOrchestrator:
             task=TaskType.DRAFTING,
             content=pennington_addendum_instruction,
         )
-        pennington_addendum_reply = self.pennington.run(pennington_addendum_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.pennington,
+            pennington_addendum_msg,
             speaker="Miss Pennington",
-            content=f"✒️ Pennington (Report Addendum):\n{pennington_addendum_reply}",
+            prefix="✒️ Pennington (Report Addendum):\n",
         )
 
         # 26. Atmospheric beat
@@ -1825,12 +1862,11 @@ class WestmarchOrchestrator:
             content=jeeves_prompt_instruction,
             context=Context(original_user_request=""),  # IMPORTANT: explicitly pass empty context
         )
-        jeeves_prompt_reply = self.jeeves.run(jeeves_prompt_msg)
-
-        add_ui(
-            role="assistant",
+        add_reply(
+            self.jeeves,
+            jeeves_prompt_msg,
             speaker="Jeeves",
-            content=f"🎩 Jeeves: {jeeves_prompt_reply}",
+            prefix="🎩 Jeeves: ",
         )
 
         # 29. Narrator: Provide a final atmospheric nudge
@@ -1947,25 +1983,44 @@ class WestmarchOrchestrator:
             ),
         )
 
-        return messages
+        return messages, batch, pending
 
 
     # ------- Phase 3 UI Dispatcher -------
     
-    def run(self, task: str, user_input: str, selected_mode: str = None) -> str:
+    def run(self, task: str, user_input: str, selected_mode: str = None, stream: bool = False):
+        """
+        Dispatch a UI task. With stream=True the single-agent workflows
+        (parlour, research, drafting, critique) return an iterator of reply
+        chunks; every other task returns its usual result.
+
+        A model call that fails for good (ProviderError) stops the workflow
+        before anything is archived, and the reply becomes Jeeves's apology.
+        """
+        with log_context(request_id=new_request_id()):
+            try:
+                result = self._dispatch(task, user_input, selected_mode, stream)
+            except ProviderError as e:
+                log("ORCHESTRATOR: %s", e, level=ERROR)
+                return self._canned(self.provider_apology(e), stream and task.lower() in self.STREAMING_TASKS)
+            if stream and not isinstance(result, str) and task.lower() in self.STREAMING_TASKS:
+                return bind_context(self._guard_stream(result))
+        return result
+
+    def _dispatch(self, task: str, user_input: str, selected_mode: str, stream: bool):
         task = task.lower()
 
         if task == "parlour_discussion":
-            return self.parlour_discussion(user_input, selected_mode=selected_mode)
+            return self.parlour_discussion(user_input, selected_mode=selected_mode, stream=stream)
       
         elif task == "daily_planning":
             return self.daily_planning(user_input, selected_mode=selected_mode)
         
         elif task == "research":
-            return self.quick_research(user_input, selected_mode=selected_mode)
+            return self.quick_research(user_input, selected_mode=selected_mode, stream=stream)
 
         elif task == "drafting":
-            return self.draft_short_text(user_input, selected_mode=selected_mode)
+            return self.draft_short_text(user_input, selected_mode=selected_mode, stream=stream)
         
         elif task == "archive":
             return self.query_archive(user_input, selected_mode=selected_mode)
@@ -1975,7 +2030,7 @@ class WestmarchOrchestrator:
             return self.memory_summary()
   
         elif task == "critique":
-            return self.critique_text(user_input, selected_mode=selected_mode)
+            return self.critique_text(user_input, selected_mode=selected_mode, stream=stream)
 
         elif task == "whole_household":
             return self.whole_household(user_input)